@@ -1,69 +1,221 @@
+# ai_engine/alert_engine.py
+#
+# Incremental, idempotent alert generation (Postgres).
+#
+# Each run only looks at raw_osint rows above the persisted watermark in
+# alert_state and at clusters whose rollup changed since the last run.
+# Every alert carries a dedup_key (rule:subject:window) with a unique
+# index, and alerts are written with one INSERT ... SELECT ... ON
+# CONFLICT DO NOTHING per rule, so re-running never duplicates them.
+
+from datetime import datetime, timedelta
+
 from sqlalchemy import text
 from database import SessionLocal
-from models import RawOSINT
+from ingestion.work_queue import MAX_ENRICH_ATTEMPTS
+
+
+# calculate_risk_score is 0..1; 0.9 is the base of a severity-3 type
+# (cyber_attack / border_tension), which location hits can only raise
+RISK_THRESHOLD = 0.9
+
+# Cluster sizes that raise a growth alert when first reached
+CLUSTER_GROWTH_LEVELS = [3, 10, 25, 50, 100, 250, 500, 1000]
+
+# Re-scan clusters touched slightly before the last run, in case a
+# clustering transaction committed after it. Safe: inserts are idempotent.
+CLUSTER_LOOKBACK = timedelta(minutes=5)
+
+# Rows still unenriched / unclustered after this long (a row that keeps
+# failing, say) stop holding the watermark back; they are not alerted on
+PENDING_GRACE = timedelta(hours=6)
+
+STATE_NAME = "alert_engine"
+
+
+# -----------------------------------------------------
+# WATERMARK
+# -----------------------------------------------------
+
+def _lock_state(db):
+    """
+    Load (and lock) the engine's row in alert_state. The row lock keeps
+    two overlapping runs from evaluating the same range.
+    """
+
+    db.execute(
+        text("""
+            INSERT INTO alert_state (name, last_record_id)
+            VALUES (:name, 0)
+            ON CONFLICT (name) DO NOTHING
+        """),
+        {"name": STATE_NAME}
+    )
+
+    return db.execute(
+        text("""
+            SELECT last_record_id, last_run_at
+            FROM alert_state
+            WHERE name = :name
+            FOR UPDATE
+        """),
+        {"name": STATE_NAME}
+    ).one()
+
+
+def settled_watermark(db):
+    """
+    Highest id such that every row at or below it, collected within
+    PENDING_GRACE and not parked by the pipeline, is enriched and, if it
+    has an embedding, clustered.
+    Both lookups walk partial indexes in id order.
+    """
+
+    pending = db.execute(
+        text("""
+            SELECT LEAST(
+                (SELECT MIN(id) FROM raw_osint
+                 WHERE processed = false
+                   AND enrich_attempts < :max_attempts
+                   AND collected_at >= NOW() - :grace),
+                (SELECT MIN(id) FROM raw_osint
+                 WHERE cluster_id IS NULL AND embedding IS NOT NULL
+                   AND collected_at >= NOW() - :grace)
+            )
+        """),
+        {"grace": PENDING_GRACE, "max_attempts": MAX_ENRICH_ATTEMPTS}
+    ).scalar()
+
+    if pending is not None:
+        return pending - 1
+
+    return db.execute(text("SELECT COALESCE(MAX(id), 0) FROM raw_osint")).scalar()
+
+
+# -----------------------------------------------------
+# RULES
+# -----------------------------------------------------
 
+def insert_high_risk_alerts(db, after_id, up_to_id):
+    """
+    One HIGH alert per (cluster, hour) among new high-risk rows; rows
+    without a cluster are keyed on their own id.
+    """
 
-RISK_THRESHOLD = 2.5
-CLUSTER_THRESHOLD = 3
+    result = db.execute(
+        text("""
+            INSERT INTO alerts (
+                dedup_key, alert_type, alert_level, cluster_id,
+                incident_type, country, state, confidence, message
+            )
+            SELECT DISTINCT ON (dedup_key)
+                   dedup_key, 'high_risk', 'HIGH', cluster_id,
+                   incident_type, country, state, confidence,
+                   'High risk incident detected (Score: '
+                       || ROUND(risk_score::numeric, 2) || ')'
+            FROM (
+                SELECT id, cluster_id, incident_type, country, state,
+                       confidence, risk_score,
+                       'high_risk:'
+                           || COALESCE('c' || cluster_id, 'r' || id) || ':'
+                           || to_char(date_trunc('hour', COALESCE(collected_at, NOW())),
+                                      'YYYY-MM-DD"T"HH24') AS dedup_key
+                FROM raw_osint
+                WHERE id > :after_id
+                  AND id <= :up_to_id
+                  AND risk_score >= :threshold
+            ) candidates
+            ORDER BY dedup_key, risk_score DESC, id
+            ON CONFLICT (dedup_key) DO NOTHING
+        """),
+        {"after_id": after_id, "up_to_id": up_to_id, "threshold": RISK_THRESHOLD}
+    )
+
+    return result.rowcount
 
 
+def insert_cluster_growth_alerts(db, since):
+    """
+    One MEDIUM alert per (cluster, level): fires once, when a cluster
+    that changed since `since` first reaches a new level.
+    """
+
+    result = db.execute(
+        text("""
+            INSERT INTO alerts (
+                dedup_key, alert_type, alert_level, cluster_id,
+                incident_type, source_count, message
+            )
+            SELECT 'cluster_growth:' || c.cluster_id || ':' || reached.level,
+                   'cluster_growth', 'MEDIUM', c.cluster_id, 'cluster',
+                   c.incident_count,
+                   'Cluster ' || c.cluster_id || ' has grown to '
+                       || c.incident_count || ' incidents.'
+            FROM cluster_rollup c
+            CROSS JOIN LATERAL (
+                SELECT MAX(level) AS level
+                FROM unnest(CAST(:levels AS integer[])) AS level
+                WHERE level <= c.incident_count
+            ) reached
+            WHERE c.updated_at >= :since
+              AND reached.level IS NOT NULL
+            ON CONFLICT (dedup_key) DO NOTHING
+        """),
+        {"levels": CLUSTER_GROWTH_LEVELS, "since": since}
+    )
+
+    return result.rowcount
+
+
+# -----------------------------------------------------
+# RUN
+# -----------------------------------------------------
+
 def generate_alerts():
+    """
+    Evaluate everything new since the last run and advance the
+    watermark in the same transaction. Returns the alerts inserted
+    per rule.
+    """
+
     db = SessionLocal()
 
     try:
-        # ----------------------------
-        # 1️⃣ High Risk Alerts
-        # ----------------------------
-        high_risk_records = db.query(RawOSINT).filter(
-            RawOSINT.risk_score >= RISK_THRESHOLD
-        ).all()
-
-        for record in high_risk_records:
-            db.execute(
-                text("""
-                    INSERT INTO alerts (cluster_id, incident_type, alert_level, message)
-                    VALUES (:cluster_id, :incident_type, :alert_level, :message)
-                """),
-                {
-                    "cluster_id": record.cluster_id,
-                    "incident_type": record.incident_type,
-                    "alert_level": "HIGH",
-                    "message": f"High risk incident detected (Score: {record.risk_score})"
-                }
-            )
+        state = _lock_state(db)
 
-        # ----------------------------
-        # 2️⃣ Cluster Growth Alerts
-        # ----------------------------
-        cluster_counts = db.execute(
+        up_to_id = settled_watermark(db)
+
+        # First run: every cluster
+        since = (
+            state.last_run_at - CLUSTER_LOOKBACK
+            if state.last_run_at else datetime(1970, 1, 1)
+        )
+
+        inserted = {"high_risk": 0, "cluster_growth": 0}
+
+        if up_to_id > state.last_record_id:
+            inserted["high_risk"] = insert_high_risk_alerts(db, state.last_record_id, up_to_id)
+
+        inserted["cluster_growth"] = insert_cluster_growth_alerts(db, since)
+
+        db.execute(
             text("""
-                SELECT cluster_id, COUNT(*) as cnt
-                FROM raw_osint
-                GROUP BY cluster_id
-                HAVING COUNT(*) >= :threshold
+                UPDATE alert_state
+                SET last_record_id = GREATEST(last_record_id, :up_to_id),
+                    last_run_at = NOW()
+                WHERE name = :name
             """),
-            {"threshold": CLUSTER_THRESHOLD}
+            {"up_to_id": up_to_id, "name": STATE_NAME}
         )
 
-        for cluster in cluster_counts:
-            db.execute(
-                text("""
-                    INSERT INTO alerts (cluster_id, incident_type, alert_level, message)
-                    VALUES (:cluster_id, :incident_type, :alert_level, :message)
-                """),
-                {
-                    "cluster_id": cluster.cluster_id,
-                    "incident_type": "cluster",
-                    "alert_level": "MEDIUM",
-                    "message": f"Cluster {cluster.cluster_id} has grown to {cluster.cnt} incidents."
-                }
-            )
-
         db.commit()
 
+        return inserted
+
     except Exception as e:
         db.rollback()
         print("Alert Engine Error:", e)
+        return None
 
     finally:
         db.close()
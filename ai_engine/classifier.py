@@ -1,17 +1,38 @@
-ai_engine/classifier.py
+# ai_engine/classifier.py
 
-def classify_incident(text):
+from ai_engine.keyword_matcher import KeywordMatcher
+
+
+# keyword -> incident type (extend freely; matching cost stays linear)
+INCIDENT_KEYWORDS = {
+    "cyber": "cyber_attack",
+    "border": "border_tension",
+    "infiltration": "border_tension",
+    "military": "military_activity",
+    "army": "military_activity",
+    "protest": "civil_unrest",
+    "violence": "civil_unrest"
+}
 
-    if "cyber" in text:
-        return "cyber_attack"
+# When several types match, the earliest in this list wins
+INCIDENT_PRIORITY = [
+    "cyber_attack",
+    "border_tension",
+    "military_activity",
+    "civil_unrest"
+]
 
-    if "border" in text or "infiltration" in text:
-        return "border_tension"
+# infix=True keeps the old substring scan's hits: clean_text strips
+# hyphens, so "cross-border" arrives as "crossborder"
+_matcher = KeywordMatcher(INCIDENT_KEYWORDS, infix=True)
+
+
+def classify_incident(text):
 
-    if "military" in text or "army" in text:
-        return "military_activity"
+    found = set(_matcher.labels_in(text))
 
-    if "protest" in text or "violence" in text:
-        return "civil_unrest"
+    for incident_type in INCIDENT_PRIORITY:
+        if incident_type in found:
+            return incident_type
 
     return "other"
@@ -1,43 +1,298 @@
+# ai_engine/clustering.py
+#
+# Incremental clustering over incident embeddings.
+#
+# Each record is compared with the current cluster centroids through the
+# vector index (top-1). It joins the closest cluster when the cosine
+# similarity is >= SIMILARITY_THRESHOLD, otherwise it starts a new one.
+# Centroids are updated online and the state is persisted, so cluster IDs
+# are stable across runs and memory grows with clusters, not records.
+#
+# The streaming pipeline and the worker pool's clustering process may both
+# call cluster_new_records(): a Postgres advisory lock lets one run at a
+# time, and each run starts from the state file the previous one saved.
+
+import os
+import threading
+from contextlib import contextmanager
+
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
+from sqlalchemy import func, update
+
+from database import SessionLocal, engine
+from models import RawOSINT
+from ai_engine.rollups import update_cluster_rollups
+from ai_engine.vector_index import ExactIndex, HNSWIndex, EMBEDDING_DIM, VECTOR_INDEX_BACKEND, to_vector
 
 
 SIMILARITY_THRESHOLD = 0.75
 
+CLUSTER_STATE_PATH = os.getenv("CLUSTER_STATE_PATH", ".cluster_state.npz")
+
+CLUSTER_BATCH_SIZE = 1000
+
+# pg_advisory_lock key serialising cluster_new_records() across processes
+CLUSTER_LOCK_KEY = 7315420008
+
+
+class IncrementalClusterer:
+
+    def __init__(self, threshold=SIMILARITY_THRESHOLD, path=CLUSTER_STATE_PATH,
+                 backend=VECTOR_INDEX_BACKEND, dim=EMBEDDING_DIM):
+        self.threshold = threshold
+        self.path = path
+        self.dim = dim
+        self.backend = backend
+
+        self.lock = threading.Lock()
+        self.saved_mtime = None     # state file version held in memory
+        self._reset()
+
+    def _new_index(self):
+        return HNSWIndex(self.dim) if self.backend == "hnsw" else ExactIndex(self.dim)
+
+    def _reset(self):
+        self.index = self._new_index()
+        self.sums = {}          # cluster_id -> running sum of unit vectors
+        self.counts = {}        # cluster_id -> members
+        self.next_cluster_id = 1
+
+    def reserve_ids(self, max_used_id):
+        """
+        Never hand out an id the database already uses (state file lost,
+        restored from an old copy, or written by another host).
+        """
+
+        with self.lock:
+            self.next_cluster_id = max(self.next_cluster_id, (max_used_id or 0) + 1)
+
+    def __len__(self):
+        return len(self.counts)
+
+    def assign(self, vector):
+        """
+        Assign one embedding to a cluster and return its id.
+        """
+
+        vector = to_vector(vector)
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector = vector / norm
+
+        with self.lock:
+            best = self.index.search(vector, 1)
+
+            if best and best[0][1] >= self.threshold:
+                cluster_id = best[0][0]
+                self.sums[cluster_id] += vector
+                self.counts[cluster_id] += 1
+            else:
+                cluster_id = self.next_cluster_id
+                self.next_cluster_id += 1
+                self.sums[cluster_id] = vector.copy()
+                self.counts[cluster_id] = 1
+
+            # Centroid direction = normalised running sum
+            self.index.add([cluster_id], self.sums[cluster_id].reshape(1, -1))
+
+        return cluster_id
+
+    def assign_many(self, vectors):
+        return [self.assign(v) for v in vectors]
+
+    # ----------------- disk -----------------
+
+    def save(self):
+        with self.lock:
+            cluster_ids = np.fromiter(self.counts.keys(), dtype=np.int64, count=len(self.counts))
+
+            sums = (
+                np.stack([self.sums[c] for c in cluster_ids])
+                if len(cluster_ids) else np.empty((0, self.dim), dtype=np.float32)
+            )
+
+            tmp_path = self.path + ".tmp.npz"
+
+            np.savez(
+                tmp_path,
+                cluster_ids=cluster_ids,
+                sums=sums,
+                counts=np.array([self.counts[c] for c in cluster_ids], dtype=np.int64),
+                next_cluster_id=np.int64(self.next_cluster_id)
+            )
+            os.replace(tmp_path, self.path)
+
+            self.saved_mtime = os.stat(self.path).st_mtime_ns
+
+    def load(self):
+        """
+        Replace the in-memory state with the saved one (an empty state
+        when nothing was saved yet).
+        """
+
+        if not os.path.exists(self.path):
+            with self.lock:
+                self._reset()
+                self.saved_mtime = None
+            return False
+
+        with np.load(self.path) as data:
+            with self.lock:
+                self._reset()
+                self.saved_mtime = os.stat(self.path).st_mtime_ns
+
+                for cluster_id, vec_sum, count in zip(data["cluster_ids"], data["sums"], data["counts"]):
+                    self.sums[int(cluster_id)] = vec_sum.astype(np.float32)
+                    self.counts[int(cluster_id)] = int(count)
+
+                if self.counts:
+                    self.index.add(data["cluster_ids"], data["sums"])
+
+                self.next_cluster_id = int(data["next_cluster_id"])
+
+        return True
+
+    def load_if_changed(self):
+        """
+        Pick up a state file another process saved since this one last
+        saved or loaded it.
+        """
+
+        mtime = os.stat(self.path).st_mtime_ns if os.path.exists(self.path) else None
+
+        if mtime != self.saved_mtime:
+            self.load()
+
+
+_clusterer = None
+_clusterer_lock = threading.Lock()
+
+
+def get_clusterer():
+    global _clusterer
+
+    with _clusterer_lock:
+        if _clusterer is None:
+            _clusterer = IncrementalClusterer()
+            _clusterer.load()
+
+    return _clusterer
+
+
+@contextmanager
+def cluster_lock():
+    """
+    Hold CLUSTER_LOCK_KEY (blocking) on a dedicated connection for the
+    duration. No-op on databases without advisory locks (SQLite).
+    """
+
+    if engine.dialect.name != "postgresql":
+        yield
+        return
+
+    raw = engine.raw_connection()
+
+    try:
+        cursor = raw.cursor()
+        cursor.execute("SELECT pg_advisory_lock(%s)", (CLUSTER_LOCK_KEY,))
+        cursor.close()
+        raw.commit()
+
+        try:
+            yield
+        finally:
+            cursor = raw.cursor()
+            cursor.execute("SELECT pg_advisory_unlock(%s)", (CLUSTER_LOCK_KEY,))
+            cursor.close()
+            raw.commit()
+
+    finally:
+        raw.close()
+
 
 def cluster_records(records):
     """
     records: list of RawOSINT objects with embedding
     """
 
-    embeddings = []
-    valid_records = []
+    clusterer = get_clusterer()
 
     for record in records:
         if record.embedding:
-            embeddings.append(record.embedding)
-            valid_records.append(record)
+            record.cluster_id = clusterer.assign(record.embedding)
 
-    if not embeddings:
-        return
+    clusterer.save()
+
+
+def cluster_new_records(batch_size=CLUSTER_BATCH_SIZE):
+    """
+    Assign clusters to every embedded record that has none yet,
+    keyset-paginated on id. Returns the number of records clustered.
+    Runs under cluster_lock(), starting from whatever state the last
+    holder saved, so every process assigns against the same centroids.
+
+    The state file is saved after each committed batch, so it always
+    matches the database; if a batch fails, the state is reloaded and
+    its assignments are forgotten along with the rolled-back rows.
+    """
+
+    with cluster_lock():
+        return _cluster_new_records(batch_size)
+
+
+def _cluster_new_records(batch_size):
+
+    clusterer = get_clusterer()
+    clusterer.load_if_changed()
+
+    clustered = 0
+    last_id = 0
+
+    db = SessionLocal()
+
+    try:
+        clusterer.reserve_ids(db.query(func.max(RawOSINT.cluster_id)).scalar())
+
+        while True:
+            rows = (
+                db.query(RawOSINT.id, RawOSINT.embedding)
+                .filter(
+                    RawOSINT.id > last_id,
+                    RawOSINT.cluster_id == None,
+                    RawOSINT.embedding != None
+                )
+                .order_by(RawOSINT.id)
+                .limit(batch_size)
+                .all()
+            )
+
+            if not rows:
+                break
+
+            last_id = rows[-1].id
 
-    embeddings = np.array(embeddings)
+            updates = [
+                {"id": row.id, "cluster_id": clusterer.assign(row.embedding)}
+                for row in rows
+                if row.embedding
+            ]
 
-    similarity_matrix = cosine_similarity(embeddings)
+            if updates:
+                db.execute(update(RawOSINT), updates)
+                update_cluster_rollups(db, [u["cluster_id"] for u in updates])
+                db.commit()
+                clustered += len(updates)
 
-    cluster_id = 1
-    assigned = set()
+                clusterer.save()
 
-    for i in range(len(valid_records)):
-        if i in assigned:
-            continue
+    except Exception as e:
+        db.rollback()
+        print("Clustering failed:", e)
 
-        valid_records[i].cluster_id = cluster_id
-        assigned.add(i)
+        # Drop the centroid updates of the batch that did not commit
+        clusterer.load()
 
-        for j in range(i + 1, len(valid_records)):
-            if similarity_matrix[i][j] >= SIMILARITY_THRESHOLD:
-                valid_records[j].cluster_id = cluster_id
-                assigned.add(j)
+    finally:
+        db.close()
 
-        cluster_id += 1
+    return clustered
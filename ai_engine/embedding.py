@@ -1,8 +1,108 @@
-from sentence_transformers import SentenceTransformer
+import hashlib
 
-model = SentenceTransformer("all-MiniLM-L6-v2")
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
 
+from models import EmbeddingCache
+from ai_engine.vector_index import to_vector
+from ai_engine.model_registry import get_model
+
+EMBED_BATCH_SIZE = 64
+
+
+# -----------------------------------------------------
+# STORAGE FORMAT (compact float32 bytes)
+# -----------------------------------------------------
+
+def encode_embedding(vector) -> bytes:
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def decode_embedding(value):
+    return to_vector(value)
+
+
+# -----------------------------------------------------
+# ENCODING
+# -----------------------------------------------------
 
 def generate_embedding(text: str):
-    embedding = model.encode(text)
+    embedding = get_model("embedding").encode(text)
     return embedding.tolist()
+
+
+def generate_embeddings(texts, batch_size=EMBED_BATCH_SIZE):
+    """
+    Encode many texts at once. Texts are sorted by length so each
+    batch pads to similar sizes, then returned in input order.
+    """
+
+    model = get_model("embedding")
+
+    if not texts:
+        return np.empty((0, model.get_sentence_embedding_dimension()), dtype=np.float32)
+
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+
+    encoded = model.encode(
+        [texts[i] for i in order],
+        batch_size=batch_size,
+        convert_to_numpy=True
+    ).astype(np.float32)
+
+    result = np.empty_like(encoded)
+    result[order] = encoded
+
+    return result
+
+
+# -----------------------------------------------------
+# CONTENT-HASH CACHE
+# -----------------------------------------------------
+
+def embedding_key(text: str) -> str:
+    # Hash of exactly the text that is encoded, so a hit is always that
+    # text's own embedding (same digest as raw_osint.content_hash)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def embed_texts(db, texts, batch_size=EMBED_BATCH_SIZE):
+    """
+    Embeddings for `texts`, in order, served from the embedding_cache
+    table where possible. Only unseen texts are encoded; new vectors
+    are added to the cache in the caller's transaction.
+    """
+
+    keys = [embedding_key(t) for t in texts]
+
+    vectors = {
+        row.content_hash: decode_embedding(row.embedding)
+        for row in db.execute(
+            select(EmbeddingCache.content_hash, EmbeddingCache.embedding)
+            .where(EmbeddingCache.content_hash.in_(set(keys)))
+        )
+    }
+
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in vectors:
+            missing.setdefault(key, text)
+
+    if missing:
+        encoded = generate_embeddings(list(missing.values()), batch_size=batch_size)
+
+        rows = []
+        for key, vector in zip(missing.keys(), encoded):
+            vectors[key] = vector
+            rows.append({"content_hash": key, "embedding": encode_embedding(vector)})
+
+        dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+
+        db.execute(
+            dialect.insert(EmbeddingCache)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=["content_hash"])
+        )
+
+    return [vectors[key] for key in keys]
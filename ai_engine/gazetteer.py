@@ -0,0 +1,84 @@
+# ai_engine/gazetteer.py
+#
+# Bundled offline coordinates (lat, lon) for the places the pipeline
+# sees most: the states and countries in geo_mapper plus major South
+# Asian cities. Keys are normalised (lower-case, single spaces).
+
+GAZETTEER = {
+    # ---- Indian states / union territories (geo_mapper.INDIAN_STATES) ----
+    "jammu": (32.7266, 74.8570),
+    "kashmir": (34.0837, 74.7973),
+    "jammu and kashmir": (33.7782, 76.5762),
+    "punjab": (31.1471, 75.3412),
+    "rajasthan": (27.0238, 74.2179),
+    "gujarat": (22.2587, 71.1924),
+    "assam": (26.2006, 92.9376),
+    "arunachal pradesh": (28.2180, 94.7278),
+    "nagaland": (26.1584, 94.5624),
+    "manipur": (24.6637, 93.9063),
+    "uttarakhand": (30.0668, 79.0193),
+    "himachal pradesh": (31.1048, 77.1734),
+    "ladakh": (34.2268, 77.5619),
+    "sikkim": (27.5330, 88.5122),
+    "mizoram": (23.1645, 92.9376),
+    "tripura": (23.9408, 91.9882),
+    "meghalaya": (25.4670, 91.3662),
+    "west bengal": (22.9868, 87.8550),
+
+    # ---- Countries (geo_mapper.NEIGHBOR_COUNTRIES + India) ----
+    "india": (20.5937, 78.9629),
+    "pakistan": (30.3753, 69.3451),
+    "china": (35.8617, 104.1954),
+    "bangladesh": (23.6850, 90.3563),
+    "nepal": (28.3949, 84.1240),
+    "sri lanka": (7.8731, 80.7718),
+    "bhutan": (27.5142, 90.4336),
+    "myanmar": (21.9162, 95.9560),
+    "afghanistan": (33.9391, 67.7100),
+
+    # ---- Major cities ----
+    "delhi": (28.6139, 77.2090),
+    "new delhi": (28.6139, 77.2090),
+    "mumbai": (19.0760, 72.8777),
+    "kolkata": (22.5726, 88.3639),
+    "chennai": (13.0827, 80.2707),
+    "bengaluru": (12.9716, 77.5946),
+    "bangalore": (12.9716, 77.5946),
+    "hyderabad": (17.3850, 78.4867),
+    "ahmedabad": (23.0225, 72.5714),
+    "pune": (18.5204, 73.8567),
+    "jaipur": (26.9124, 75.7873),
+    "lucknow": (26.8467, 80.9462),
+    "chandigarh": (30.7333, 76.7794),
+    "amritsar": (31.6340, 74.8723),
+    "srinagar": (34.0837, 74.7973),
+    "leh": (34.1526, 77.5771),
+    "guwahati": (26.1445, 91.7362),
+    "imphal": (24.8170, 93.9368),
+    "shillong": (25.5788, 91.8933),
+    "gangtok": (27.3389, 88.6065),
+    "itanagar": (27.0844, 93.6053),
+    "dehradun": (30.3165, 78.0322),
+    "shimla": (31.1048, 77.1734),
+    "jaisalmer": (26.9157, 70.9083),
+    "bhuj": (23.2420, 69.6669),
+    "pathankot": (32.2643, 75.6421),
+    "poonch": (33.7700, 74.0925),
+    "kargil": (34.5539, 76.1349),
+    "tawang": (27.5860, 91.8594),
+    "islamabad": (33.6844, 73.0479),
+    "rawalpindi": (33.5651, 73.0169),
+    "lahore": (31.5204, 74.3587),
+    "karachi": (24.8607, 67.0011),
+    "peshawar": (34.0151, 71.5249),
+    "quetta": (30.1798, 66.9750),
+    "muzaffarabad": (34.3700, 73.4711),
+    "dhaka": (23.8103, 90.4125),
+    "chittagong": (22.3569, 91.7832),
+    "kathmandu": (27.7172, 85.3240),
+    "colombo": (6.9271, 79.8612),
+    "thimphu": (27.4728, 89.6390),
+    "kabul": (34.5553, 69.2075),
+    "beijing": (39.9042, 116.4074),
+    "lhasa": (29.6520, 91.1721),
+}
@@ -1,5 +1,7 @@
 # ai_engine/geo_mapper.py
 
+from ai_engine.keyword_matcher import KeywordMatcher
+
 INDIAN_STATES = [
     "Jammu", "Kashmir", "Punjab", "Rajasthan",
     "Gujarat", "Assam", "Arunachal Pradesh",
@@ -11,22 +13,25 @@ NEIGHBOR_COUNTRIES = [
     "Pakistan", "China", "Bangladesh", "Nepal", "Sri Lanka"
 ]
 
+# Demonyms the country name is not a prefix of
+COUNTRY_DEMONYMS = {
+    "Chinese": "China"
+}
 
-def detect_country(locations):
+# prefix=True catches "Pakistani", "Bangladeshi", "Nepalese", "Sri Lankan"
+_country_matcher = KeywordMatcher(
+    {**{country: country for country in NEIGHBOR_COUNTRIES}, **COUNTRY_DEMONYMS},
+    prefix=True
+)
+_state_matcher = KeywordMatcher(INDIAN_STATES, prefix=True)
 
-    for loc in locations:
-        for country in NEIGHBOR_COUNTRIES:
-            if country.lower() in loc.lower():
-                return country
 
-    return "India"
+def detect_country(locations, default="India"):
 
+    # One pass over all locations; the first location with a hit wins
+    return _country_matcher.first("\n".join(locations)) or default
 
-def detect_state(locations):
 
-    for loc in locations:
-        for state in INDIAN_STATES:
-            if state.lower() in loc.lower():
-                return state
+def detect_state(locations):
 
-    return None
+    return _state_matcher.first("\n".join(locations))
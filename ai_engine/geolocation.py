@@ -1,15 +1,215 @@
-from geopy.geocoders import Nominatim
-from geopy.exc import GeocoderTimedOut
+# ai_engine/geolocation.py
+#
+# Tiered geocoder:
+#   1. in-memory LRU
+#   2. bundled offline gazetteer (ai_engine.gazetteer)
+#   3. persistent SQLite cache keyed by normalised place name
+#   4. Nominatim, only on a miss, behind a 1 req/sec rate limiter
+# Misses from Nominatim are cached too, so a place is asked for once.
 
-geolocator = Nominatim(user_agent="osnit_shield")
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from ai_engine.gazetteer import GAZETTEER
+
+
+GEOCODE_CACHE_PATH = os.getenv("GEOCODE_CACHE_PATH", ".geocode_cache.sqlite")
+
+LRU_SIZE = 4096
+NOMINATIM_MIN_INTERVAL = 1.0   # seconds between remote calls
+NOMINATIM_TIMEOUT = 5
+
+NOT_FOUND = (None, None)
+
+
+def normalize_place(name):
+    return re.sub(r"\s+", " ", (name or "").strip().lower())
+
+
+# -----------------------------------------------------
+# TIER 1: IN-MEMORY LRU
+# -----------------------------------------------------
+
+_lru = OrderedDict()
+_lru_lock = threading.Lock()
+
+
+def _lru_get(key):
+    with _lru_lock:
+        if key in _lru:
+            _lru.move_to_end(key)
+            return _lru[key]
+    return None
+
+
+def _lru_put(key, value):
+    with _lru_lock:
+        _lru[key] = value
+        _lru.move_to_end(key)
+        if len(_lru) > LRU_SIZE:
+            _lru.popitem(last=False)
+
+
+# -----------------------------------------------------
+# TIER 3: PERSISTENT SQLITE CACHE
+# -----------------------------------------------------
+
+_local = threading.local()
+
+
+def _cache_db():
+    conn = getattr(_local, "conn", None)
+
+    if conn is None:
+        conn = sqlite3.connect(GEOCODE_CACHE_PATH, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS geocode (
+                name TEXT PRIMARY KEY,
+                lat REAL,
+                lon REAL,
+                updated_at REAL
+            )
+        """)
+        _local.conn = conn
+
+    return conn
+
+
+def _disk_get_many(keys):
+    if not keys:
+        return {}
+
+    conn = _cache_db()
+    found = {}
+    keys = list(keys)
+
+    # Stay under SQLite's bound-parameter limit
+    for start in range(0, len(keys), 500):
+        part = keys[start:start + 500]
+        rows = conn.execute(
+            f"SELECT name, lat, lon FROM geocode WHERE name IN ({','.join('?' * len(part))})",
+            part
+        )
+        for name, lat, lon in rows:
+            found[name] = (lat, lon)
+
+    return found
+
+
+def _disk_put(key, value):
+    conn = _cache_db()
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO geocode (name, lat, lon, updated_at) VALUES (?, ?, ?, ?)",
+            (key, value[0], value[1], time.time())
+        )
+
+
+# -----------------------------------------------------
+# TIER 4: NOMINATIM (RATE LIMITED)
+# -----------------------------------------------------
+
+_geolocator = None
+_remote_lock = threading.Lock()
+_last_remote_call = 0.0
+
+
+def _remote_geocode(name):
+    global _geolocator, _last_remote_call
+
+    from geopy.geocoders import Nominatim
+    from geopy.exc import GeopyError
+
+    with _remote_lock:
+        if _geolocator is None:
+            _geolocator = Nominatim(user_agent="osnit_shield")
+
+        wait = NOMINATIM_MIN_INTERVAL - (time.monotonic() - _last_remote_call)
+        if wait > 0:
+            time.sleep(wait)
+
+        try:
+            location = _geolocator.geocode(name, timeout=NOMINATIM_TIMEOUT)
+
+        except GeopyError:
+            # Transient (timeout, unavailable): don't cache, retry later
+            return None
+
+        finally:
+            _last_remote_call = time.monotonic()
+
+    if location:
+        return location.latitude, location.longitude
+
+    return NOT_FOUND
+
+
+# -----------------------------------------------------
+# PUBLIC API
+# -----------------------------------------------------
+
+def geocode_locations(names, allow_remote=True, max_remote=None):
+    """
+    Resolve many place names in one pass. Returns {name: (lat, lon)}
+    with (None, None) for places that could not be resolved.
+    Each distinct normalised name is looked up once; at most
+    `max_remote` of them go to Nominatim.
+    """
+
+    keys = {}
+    for name in names:
+        if name:
+            keys.setdefault(normalize_place(name), []).append(name)
+
+    resolved = {}
+    pending = []
+
+    for key in keys:
+        value = _lru_get(key)
+
+        if value is None and key in GAZETTEER:
+            value = GAZETTEER[key]
+            _lru_put(key, value)
+
+        if value is None:
+            pending.append(key)
+        else:
+            resolved[key] = value
+
+    for key, value in _disk_get_many(pending).items():
+        resolved[key] = value
+        _lru_put(key, value)
+
+    remote_calls = 0
+
+    for key in pending:
+        if key in resolved:
+            continue
+
+        if not allow_remote or (max_remote is not None and remote_calls >= max_remote):
+            continue
+
+        remote_calls += 1
+        value = _remote_geocode(key)
+
+        if value is None:
+            continue
+
+        resolved[key] = value
+        _lru_put(key, value)
+        _disk_put(key, value)
+
+    return {
+        name: resolved.get(key, NOT_FOUND)
+        for key, originals in keys.items()
+        for name in originals
+    }
 
 
 def geocode_location(location_name: str):
-    try:
-        location = geolocator.geocode(location_name, timeout=5)
-        if location:
-            return location.latitude, location.longitude
-    except GeocoderTimedOut:
-        return None, None
-
-    return None, None
+    return geocode_locations([location_name]).get(location_name, NOT_FOUND)
@@ -0,0 +1,112 @@
+# ai_engine/keyword_matcher.py
+#
+# Compiled multi-keyword matcher shared by the classifier, geo_mapper
+# and the collectors' keyword filters.
+#
+# The keyword table is folded into a character trie and emitted as one
+# regex, so at every text position the engine follows a single trie
+# branch: a scan costs O(len(text)) no matter how many keywords there
+# are, and all matches come back from one pass.
+
+import re
+
+
+def _trie_pattern(node):
+    """
+    Turn a trie ({char: child, "": True for end-of-word}) into a
+    regex fragment with no redundant alternation.
+    """
+
+    is_end = "" in node
+    branches = []
+
+    for char in sorted(k for k in node if k):
+        branches.append(re.escape(char) + _trie_pattern(node[char]))
+
+    if not branches:
+        return ""
+
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+
+    if is_end:
+        # Longest match first, but the shorter keyword is valid too
+        return "(?:" + body + ")?"
+
+    return body
+
+
+class KeywordMatcher:
+    """
+    table:  {keyword: label}  (or an iterable of keywords, label = keyword)
+    prefix: True lets a keyword match the start of a longer word
+            ("india" matches "Indian"); False requires whole words.
+    infix:  True matches anywhere, inside words too ("border" in
+            "crossborder"), like a plain substring scan. Implies prefix.
+    """
+
+    def __init__(self, table, prefix=False, infix=False, case_sensitive=False):
+
+        if not isinstance(table, dict):
+            table = {keyword: keyword for keyword in table}
+
+        self.case_sensitive = case_sensitive
+        self.labels = {}
+
+        trie = {}
+
+        for keyword, label in table.items():
+            key = keyword if case_sensitive else keyword.lower()
+            if not key:
+                continue
+
+            self.labels.setdefault(key, label)
+
+            node = trie
+            for char in key:
+                node = node.setdefault(char, {})
+            node[""] = True
+
+        head = r"" if infix else r"\b"
+        tail = r"" if prefix or infix else r"\b"
+        flags = 0 if case_sensitive else re.IGNORECASE
+
+        self.pattern = (
+            re.compile(head + "(" + _trie_pattern(trie) + ")" + tail, flags)
+            if trie else None
+        )
+
+    def __len__(self):
+        return len(self.labels)
+
+    def _key(self, matched):
+        return matched if self.case_sensitive else matched.lower()
+
+    def finditer(self, text):
+        """
+        Yield (keyword, label, start) for every match, left to right.
+        """
+
+        if not text or self.pattern is None:
+            return
+
+        for match in self.pattern.finditer(text):
+            keyword = self._key(match.group(1))
+            yield keyword, self.labels[keyword], match.start(1)
+
+    def find_all(self, text):
+        return list(self.finditer(text))
+
+    def labels_in(self, text):
+        """
+        Distinct labels found in text, in order of first appearance.
+        """
+
+        return list(dict.fromkeys(label for _, label, _ in self.finditer(text)))
+
+    def first(self, text):
+        for _, label, _ in self.finditer(text):
+            return label
+        return None
+
+    def search(self, text):
+        return self.first(text) is not None
@@ -0,0 +1,96 @@
+# ai_engine/ml_classifier.py
+#
+# Vectorised incident classifier over all-MiniLM-L6-v2 embeddings.
+#
+# A linear softmax head (W, b) with a temperature fitted on held-out data,
+# stored as a small .npz artifact (see ai_engine.train_classifier).
+# One predict() call labels a whole chunk: a single matmul + softmax.
+
+import os
+import threading
+
+import numpy as np
+
+
+CLASSIFIER_MODEL_PATH = os.getenv(
+    "CLASSIFIER_MODEL_PATH",
+    os.path.join(os.path.dirname(__file__), "artifacts", "incident_classifier.npz")
+)
+
+
+def softmax(logits):
+    logits = logits - logits.max(axis=1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+class IncidentClassifier:
+
+    def __init__(self, weights, bias, labels, temperature=1.0):
+        self.weights = np.asarray(weights, dtype=np.float32)     # (dim, k)
+        self.bias = np.asarray(bias, dtype=np.float32)           # (k,)
+        self.labels = np.asarray(labels)
+        self.temperature = float(temperature)
+
+    def predict_proba(self, embeddings):
+        """
+        embeddings: (n, dim) -> calibrated class probabilities (n, k)
+        """
+
+        embeddings = np.asarray(embeddings, dtype=np.float32).reshape(-1, self.weights.shape[0])
+        logits = embeddings @ self.weights + self.bias
+        return softmax(logits / self.temperature)
+
+    def predict(self, embeddings):
+        """
+        Returns (labels, confidences) for the whole batch.
+        """
+
+        if len(embeddings) == 0:
+            return [], []
+
+        probs = self.predict_proba(embeddings)
+        best = probs.argmax(axis=1)
+
+        return self.labels[best].tolist(), probs[np.arange(len(best)), best].tolist()
+
+    def save(self, path=CLASSIFIER_MODEL_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez(
+            path,
+            weights=self.weights,
+            bias=self.bias,
+            labels=self.labels.astype(str),
+            temperature=np.float32(self.temperature)
+        )
+
+    @classmethod
+    def load(cls, path=CLASSIFIER_MODEL_PATH):
+        with np.load(path) as data:
+            return cls(
+                data["weights"],
+                data["bias"],
+                data["labels"],
+                float(data["temperature"])
+            )
+
+
+_classifier = None
+_classifier_loaded = False
+_classifier_lock = threading.Lock()
+
+
+def get_classifier():
+    """
+    The trained classifier, or None when no artifact has been trained.
+    """
+
+    global _classifier, _classifier_loaded
+
+    with _classifier_lock:
+        if not _classifier_loaded:
+            if os.path.exists(CLASSIFIER_MODEL_PATH):
+                _classifier = IncidentClassifier.load(CLASSIFIER_MODEL_PATH)
+            _classifier_loaded = True
+
+    return _classifier
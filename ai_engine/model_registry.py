@@ -0,0 +1,70 @@
+# ai_engine/model_registry.py
+#
+# Lazy, thread-safe registry for the heavy NLP models.
+# Nothing is loaded at import time: a model is built on first
+# get_model() call, or ahead of time with preload()/warm_up().
+
+import logging
+import threading
+
+
+def _load_spacy():
+    import spacy
+    return spacy.load("en_core_web_sm")
+
+
+def _load_sentence_transformer():
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer("all-MiniLM-L6-v2")
+
+
+LOADERS = {
+    "ner": _load_spacy,
+    "embedding": _load_sentence_transformer
+}
+
+_models = {}
+_locks = {name: threading.Lock() for name in LOADERS}
+
+
+def get_model(name):
+
+    model = _models.get(name)
+    if model is not None:
+        return model
+
+    with _locks[name]:
+        # Another thread may have finished loading while we waited
+        if name not in _models:
+            logging.info(f"Loading model '{name}'...")
+            _models[name] = LOADERS[name]()
+
+    return _models[name]
+
+
+def is_loaded(name):
+    return name in _models
+
+
+def preload(*names):
+    """
+    Load the given models (default: all) now, blocking.
+    """
+
+    for name in names or LOADERS:
+        get_model(name)
+
+
+def warm_up(*names):
+    """
+    Load models on a background thread and return it.
+    """
+
+    thread = threading.Thread(
+        target=preload,
+        args=names,
+        name="model-warm-up",
+        daemon=True
+    )
+    thread.start()
+    return thread
@@ -1,10 +1,15 @@
-import spacy
+from ai_engine.model_registry import get_model
 
-nlp = spacy.load("en_core_web_sm")
+# Only doc.ents is read: skip the token-attribute components nothing
+# downstream uses. The parser stays, its sentence boundaries are set
+# before ner runs (benchmarks/bench_ner.py checks the two paths agree)
+BATCH_DISABLE = ["attribute_ruler", "lemmatizer"]
 
+NER_BATCH_SIZE = 64
+NER_N_PROCESS = 1
 
-def extract_entities(text: str):
-    doc = nlp(text)
+
+def _group_entities(doc):
 
     persons = []
     organizations = []
@@ -23,3 +28,26 @@ def extract_entities(text: str):
         "organizations": list(set(organizations)),
         "locations": list(set(locations))
     }
+
+
+def extract_entities(text: str):
+    doc = get_model("ner")(text)
+    return _group_entities(doc)
+
+
+def extract_entities_batch(texts, batch_size=NER_BATCH_SIZE, n_process=NER_N_PROCESS):
+    """
+    Batch version of extract_entities built on nlp.pipe.
+    Returns one entity dict per input text, in order.
+    """
+
+    nlp = get_model("ner")
+
+    docs = nlp.pipe(
+        texts,
+        batch_size=batch_size,
+        n_process=n_process,
+        disable=[name for name in BATCH_DISABLE if name in nlp.pipe_names]
+    )
+
+    return [_group_entities(doc) for doc in docs]
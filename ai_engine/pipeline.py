@@ -1,37 +1,71 @@
 # ai_engine/pipeline.py
 
+import time
+
+from sqlalchemy import update
+
 from database import SessionLocal
 from models import RawOSINT
 
 from ai_engine.preprocess import clean_text
-from ai_engine.nlp_engine import extract_entities
+from ai_engine.ner import extract_entities_batch
+from ai_engine.embedding import embed_texts, encode_embedding
 from ai_engine.geo_mapper import detect_country, detect_state
+from ai_engine.geolocation import geocode_locations
 from ai_engine.classifier import classify_incident
+from ai_engine.ml_classifier import get_classifier
 from ai_engine.risk_engine import calculate_severity, calculate_risk_score
 from ai_engine.summarizer import generate_summary
+from ai_engine.rollups import update_incident_rollups
+from ingestion.work_queue import publish, ENRICHED_CHANNEL, MAX_ENRICH_ATTEMPTS
+from metrics import PIPELINE_STAGE_SECONDS, PIPELINE_RECORDS
 
 
-def process_unprocessed_records():
+# Rows claimed and committed together
+PIPELINE_CHUNK_SIZE = 200
 
-    db = SessionLocal()
+# Nominatim allows ~1 req/sec: bound the remote misses one chunk may wait on
+GEOCODE_MAX_REMOTE_PER_CHUNK = 10
 
-    records = db.query(RawOSINT).filter(
-        RawOSINT.processed == False
-    ).all()
 
-    processed_count = 0
+def enrich_records(db, records):
+    """
+    Run the enrichment steps over rows exposing .id, .content and the
+    collector's .geo_lat / .geo_lon. Returns one bulk-update dict per row.
+    """
+
+    updates = []
+    places = []
+
+    # Timed per chunk, so the overhead does not grow with the rows
+    with PIPELINE_STAGE_SECONDS.labels("clean").time():
+        cleaned_texts = [clean_text(record.content) for record in records]
 
-    for record in records:
+    with PIPELINE_STAGE_SECONDS.labels("ner").time():
+        all_entities = extract_entities_batch(cleaned_texts)
 
-        cleaned = clean_text(record.content)
+    with PIPELINE_STAGE_SECONDS.labels("embed").time():
+        embeddings = embed_texts(db, [record.content for record in records])
 
-        entities = extract_entities(cleaned)
+    # One vectorised call labels the whole chunk when a model is trained
+    classifier = get_classifier()
+
+    with PIPELINE_STAGE_SECONDS.labels("classify").time():
+        if classifier is not None and records:
+            predicted_types, confidences = classifier.predict(embeddings)
+        else:
+            predicted_types = [classify_incident(text) for text in cleaned_texts]
+            confidences = [None] * len(records)
+
+    geo_started = time.perf_counter()
+
+    for record, entities, embedding, incident_type, confidence in zip(
+        records, all_entities, embeddings, predicted_types, confidences
+    ):
 
         country = detect_country(entities["locations"])
         state = detect_state(entities["locations"])
 
-        incident_type = classify_incident(cleaned)
-
         severity_level = calculate_severity(incident_type)
         risk_score = calculate_risk_score(
             severity_level,
@@ -44,19 +78,269 @@ def process_unprocessed_records():
             country
         )
 
-        record.country = country
-        record.state = state
-        record.incident_type = incident_type
-        record.severity = ["low", "medium", "high"][severity_level - 1]
-        record.risk_score = risk_score
-        record.confidence = round(0.6 + risk_score * 0.3, 2)
-        record.summary = summary
-        record.keyword_vector = entities
-        record.processed = True
+        updates.append({
+            "id": record.id,
+            "country": country,
+            "state": state,
+            "incident_type": incident_type,
+            "severity": ["low", "medium", "high"][severity_level - 1],
+            "risk_score": risk_score,
+            "confidence": (
+                round(confidence, 3) if confidence is not None
+                # Keyword fallback has no probability: keep the legacy estimate
+                else round(0.6 + risk_score * 0.3, 2)
+            ),
+            "summary": summary,
+            "keyword_vector": entities,
+            "embedding": encode_embedding(embedding),
+            "processed": True
+        })
+
+        if record.geo_lat is not None and record.geo_lon is not None:
+            # The collector supplied coordinates: nothing to resolve
+            places.append([])
+        else:
+            # Most specific first: named locations, then state, then a
+            # country the text names (not the "India" fallback, which
+            # would pin every unlocated story to the country centroid)
+            places.append(
+                sorted(entities["locations"])
+                + [state, detect_country(entities["locations"], default=None)]
+            )
+
+    # Resolve every distinct place in the chunk in one pass
+    coordinates = geocode_locations(
+        {name for candidates in places for name in candidates if name},
+        max_remote=GEOCODE_MAX_REMOTE_PER_CHUNK
+    )
+
+    for record, row, candidates in zip(records, updates, places):
+        lat, lon = next(
+            (coordinates[name] for name in candidates
+             if name and coordinates[name][0] is not None),
+            (record.geo_lat, record.geo_lon)
+        )
+        row["geo_lat"] = lat
+        row["geo_lon"] = lon
+
+    # Country / state detection, scoring and geocoding
+    PIPELINE_STAGE_SECONDS.labels("geo").observe(time.perf_counter() - geo_started)
+
+    return updates
+
+
+def write_enrichment(db, updates):
+    """
+    Bulk UPDATE by primary key (one executemany per chunk).
+    """
+
+    if updates:
+        db.execute(update(RawOSINT), updates)
+
+
+def _claim_query(db):
+    return db.query(
+        RawOSINT.id,
+        RawOSINT.content,
+        RawOSINT.source,
+        RawOSINT.collected_at,
+        RawOSINT.geo_lat,
+        RawOSINT.geo_lon
+    )
+
+
+def claim_chunk(db, after_id, chunk_size):
+    """
+    Keyset page of unprocessed rows (id > after_id), locked with
+    FOR UPDATE SKIP LOCKED so concurrent workers never overlap.
+    """
+
+    return (
+        _claim_query(db)
+        .filter(
+            RawOSINT.processed == False,
+            RawOSINT.enrich_attempts < MAX_ENRICH_ATTEMPTS,
+            RawOSINT.id > after_id
+        )
+        .order_by(RawOSINT.id)
+        .limit(chunk_size)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+
+
+def claim_ids(db, ids):
+    """
+    Lock the given rows that are still unprocessed; rows another
+    worker holds (or already finished) are skipped.
+    """
+
+    return (
+        _claim_query(db)
+        .filter(
+            RawOSINT.id.in_(ids),
+            RawOSINT.processed == False,
+            RawOSINT.enrich_attempts < MAX_ENRICH_ATTEMPTS
+        )
+        .order_by(RawOSINT.id)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+
+
+def process_chunk(db, records):
+    """
+    Enrich claimed rows and stage everything that commits with them.
+    The caller commits.
+    """
+
+    updates = enrich_records(db, records)
+
+    with PIPELINE_STAGE_SECONDS.labels("write").time():
+        write_enrichment(db, updates)
+
+        # Rollups move in the same transaction as the rows they count
+        update_incident_rollups(db, [
+            {**row, "source": record.source, "collected_at": record.collected_at}
+            for record, row in zip(records, updates)
+        ])
+
+        # Wakes the clustering process on commit
+        publish(db, ENRICHED_CHANNEL, [record.id for record in records])
+
+    PIPELINE_RECORDS.inc(len(records))
+
+
+def process_one_by_one(ids, failed=None):
+    """
+    After a chunk failed: enrich its rows one transaction each, so one
+    bad row does not hold back the rest. A row that fails on its own
+    gets an attempt (and the error) recorded, and its id appended to
+    `failed` when given; at MAX_ENRICH_ATTEMPTS it is parked and no
+    longer claimed. Returns the rows enriched.
+    """
+
+    processed_count = 0
+
+    for record_id in ids:
+        db = SessionLocal()
+
+        try:
+            records = claim_ids(db, [record_id])
+
+            if records:
+                process_chunk(db, records)
+                db.commit()
+                processed_count += 1
+
+        except Exception as e:
+            db.rollback()
+            print(f"AI pipeline failed for id {record_id}:", e)
+
+            if failed is not None:
+                failed.append(record_id)
+
+            try:
+                db.execute(
+                    update(RawOSINT)
+                    .where(RawOSINT.id == record_id)
+                    .values(
+                        enrich_attempts=RawOSINT.enrich_attempts + 1,
+                        enrich_error=str(e)[:1000]
+                    )
+                )
+                db.commit()
+            except Exception:
+                db.rollback()
+
+        finally:
+            db.close()
+
+    return processed_count
+
+
+def process_records(ids, chunk_size=PIPELINE_CHUNK_SIZE, failed=None):
+    """
+    Process exactly these ids (as published by ingestion), chunk by
+    chunk. Returns the number of rows this call enriched; ids that
+    failed (and are left for a later sweep) go into `failed` when given.
+    """
+
+    ids = sorted(set(ids))
+    processed_count = 0
+
+    for start in range(0, len(ids), chunk_size):
+
+        chunk = ids[start:start + chunk_size]
+        db = SessionLocal()
+
+        try:
+            records = claim_ids(db, chunk)
+
+            if records:
+                process_chunk(db, records)
+
+                with PIPELINE_STAGE_SECONDS.labels("commit").time():
+                    db.commit()
+
+                processed_count += len(records)
+
+        except Exception as e:
+            db.rollback()
+            print(f"AI pipeline failed for ids {chunk[0]}..{chunk[-1]}, retrying row by row:", e)
+
+            processed_count += process_one_by_one(chunk, failed)
+
+        finally:
+            db.close()
+
+    return processed_count
+
+
+def process_unprocessed_records(chunk_size=PIPELINE_CHUNK_SIZE, max_chunks=None):
+    """
+    Drain the queue chunk by chunk. Each chunk is claimed, enriched and
+    committed on its own, so memory stays flat. A failed chunk is
+    retried row by row (process_one_by_one).
+    """
+
+    processed_count = 0
+    last_id = 0
+    chunks = 0
+
+    while max_chunks is None or chunks < max_chunks:
+
+        db = SessionLocal()
+        records = None
+
+        try:
+            records = claim_chunk(db, last_id, chunk_size)
+
+            if not records:
+                break
+
+            last_id = records[-1].id
+
+            process_chunk(db, records)
+
+            with PIPELINE_STAGE_SECONDS.labels("commit").time():
+                db.commit()
+
+            processed_count += len(records)
+
+        except Exception as e:
+            db.rollback()
+            print(f"AI pipeline chunk ending at id {last_id} failed, retrying row by row:", e)
+
+            # Could not even claim a chunk: give up until the next run
+            if not records:
+                break
+
+            processed_count += process_one_by_one([record.id for record in records])
 
-        processed_count += 1
+        finally:
+            db.close()
 
-    db.commit()
-    db.close()
+        chunks += 1
 
     return processed_count
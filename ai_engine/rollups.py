@@ -0,0 +1,179 @@
+# ai_engine/rollups.py
+#
+# Incrementally maintained analytics rollups.
+#
+# The pipeline adds each enriched chunk to incident_rollup_hourly in the
+# same transaction that marks the rows processed, and clustering adds
+# new members to cluster_rollup. The /intelligence summary, trends and
+# clusters endpoints read these small tables instead of raw_osint.
+#
+# Migration 0002 backfills the tables when it creates them. To recount
+# them from raw_osint later (a database migrated before the backfill
+# existed, or counts suspected of drifting):
+#
+#   python -m ai_engine.rollups --rebuild
+
+import argparse
+import logging
+from collections import Counter, defaultdict
+
+from sqlalchemy import func, text
+from sqlalchemy.dialects import postgresql, sqlite
+
+from models import IncidentRollup, ClusterRollup
+
+
+def _dialect(db):
+    return postgresql if db.bind.dialect.name == "postgresql" else sqlite
+
+
+def hour_bucket(ts):
+    return ts.replace(minute=0, second=0, microsecond=0) if ts else None
+
+
+def update_incident_rollups(db, rows):
+    """
+    rows: dicts with collected_at, incident_type, severity, source, risk_score
+    """
+
+    totals = defaultdict(lambda: [0, 0.0, 0])
+
+    for row in rows:
+        key = (
+            hour_bucket(row["collected_at"]),
+            row["incident_type"] or "other",
+            row["severity"] or "low",
+            row["source"] or "unknown"
+        )
+
+        if key[0] is None:
+            continue
+
+        bucket = totals[key]
+        bucket[0] += 1
+
+        if row.get("risk_score") is not None:
+            bucket[1] += row["risk_score"]
+            bucket[2] += 1
+
+    if not totals:
+        return
+
+    # Sorted keys: concurrent workers lock rollup rows in the same order
+    values = [
+        {
+            "hour": hour,
+            "incident_type": incident_type,
+            "severity": severity,
+            "source": source,
+            "incident_count": count,
+            "risk_sum": risk_sum,
+            "risk_count": risk_count
+        }
+        for (hour, incident_type, severity, source), (count, risk_sum, risk_count)
+        in sorted(totals.items())
+    ]
+
+    stmt = _dialect(db).insert(IncidentRollup).values(values)
+
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["hour", "incident_type", "severity", "source"],
+            set_={
+                "incident_count": IncidentRollup.incident_count + stmt.excluded.incident_count,
+                "risk_sum": IncidentRollup.risk_sum + stmt.excluded.risk_sum,
+                "risk_count": IncidentRollup.risk_count + stmt.excluded.risk_count
+            }
+        )
+    )
+
+
+def update_cluster_rollups(db, cluster_ids):
+
+    counts = Counter(c for c in cluster_ids if c is not None)
+
+    if not counts:
+        return
+
+    stmt = _dialect(db).insert(ClusterRollup).values([
+        {"cluster_id": cluster_id, "incident_count": count}
+        for cluster_id, count in sorted(counts.items())
+    ])
+
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["cluster_id"],
+            set_={
+                "incident_count": ClusterRollup.incident_count + stmt.excluded.incident_count,
+                # onupdate is not applied to ON CONFLICT; the alert engine reads this
+                "updated_at": func.now()
+            }
+        )
+    )
+
+
+def rebuild_rollups(db):
+    """
+    Recount both rollups from raw_osint (Postgres) in one transaction.
+    The tables are locked first: enrichment / clustering transactions
+    wait, and their increments land on top of the recount, so the
+    workers may keep running.
+    """
+
+    db.execute(text("LOCK TABLE incident_rollup_hourly, cluster_rollup IN EXCLUSIVE MODE"))
+
+    db.execute(text("DELETE FROM incident_rollup_hourly"))
+    db.execute(text("DELETE FROM cluster_rollup"))
+
+    db.execute(text("""
+        INSERT INTO incident_rollup_hourly
+            (hour, incident_type, severity, source, incident_count, risk_sum, risk_count)
+        SELECT date_trunc('hour', collected_at),
+               incident_type,
+               COALESCE(severity, 'low'),
+               COALESCE(source, 'unknown'),
+               COUNT(*),
+               COALESCE(SUM(risk_score), 0),
+               COUNT(risk_score)
+        FROM raw_osint
+        WHERE processed = true
+          AND incident_type IS NOT NULL   -- near-duplicates: never enriched
+          AND collected_at IS NOT NULL
+        GROUP BY 1, 2, 3, 4
+    """))
+
+    db.execute(text("""
+        INSERT INTO cluster_rollup (cluster_id, incident_count)
+        SELECT cluster_id, COUNT(*)
+        FROM raw_osint
+        WHERE cluster_id IS NOT NULL
+        GROUP BY cluster_id
+    """))
+
+    db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OSNIT analytics rollups")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="recount incident_rollup_hourly and cluster_rollup from raw_osint")
+    args = parser.parse_args()
+
+    if not args.rebuild:
+        parser.error("nothing to do (pass --rebuild)")
+
+    logging.basicConfig(level=logging.INFO)
+
+    from database import SessionLocal
+
+    db = SessionLocal()
+
+    try:
+        rebuild_rollups(db)
+        logging.info("Rollups rebuilt from raw_osint")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
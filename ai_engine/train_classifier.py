@@ -0,0 +1,187 @@
+# ai_engine/train_classifier.py
+#
+# Offline train / eval for ai_engine.ml_classifier.
+#
+#   python -m ai_engine.train_classifier --from-db            # weak labels
+#   python -m ai_engine.train_classifier --csv labelled.csv   # text,label
+#
+# --from-db uses processed raw_osint rows: their stored embeddings, with
+# the keyword classifier's label as a weak target. A labelled CSV
+# (columns: text,label) is embedded with the sentence-transformer.
+# Either way the data is split, a multinomial logistic-regression head
+# is fitted, a softmax temperature is tuned on the validation split, and
+# test metrics are printed before the artifact is written.
+
+import argparse
+import csv
+
+import numpy as np
+
+from ai_engine.ml_classifier import IncidentClassifier, CLASSIFIER_MODEL_PATH, softmax
+
+
+SEED = 13
+
+
+# -----------------------------------------------------
+# DATA
+# -----------------------------------------------------
+
+def load_from_db(limit=None):
+    from database import SessionLocal
+    from models import RawOSINT
+    from ai_engine.preprocess import clean_text
+    from ai_engine.classifier import classify_incident
+    from ai_engine.vector_index import to_vector
+
+    db = SessionLocal()
+
+    try:
+        query = (
+            db.query(RawOSINT.content, RawOSINT.embedding)
+            .filter(
+                RawOSINT.processed == True,
+                RawOSINT.embedding != None
+            )
+            .order_by(RawOSINT.id.desc())
+        )
+
+        if limit:
+            query = query.limit(limit)
+
+        rows = [r for r in query.all() if r.embedding]
+
+    finally:
+        db.close()
+
+    embeddings = np.stack([to_vector(r.embedding) for r in rows])
+    labels = np.array([classify_incident(clean_text(r.content)) for r in rows])
+
+    return embeddings, labels
+
+
+def load_from_csv(path):
+    from ai_engine.embedding import generate_embeddings
+
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = [r for r in csv.DictReader(f) if r.get("text") and r.get("label")]
+
+    embeddings = generate_embeddings([r["text"] for r in rows])
+    labels = np.array([r["label"] for r in rows])
+
+    return embeddings, labels
+
+
+def split(n, rng, val=0.15, test=0.15):
+    order = rng.permutation(n)
+    n_test = int(n * test)
+    n_val = int(n * val)
+    return order[n_test + n_val:], order[n_test:n_test + n_val], order[:n_test]
+
+
+# -----------------------------------------------------
+# CALIBRATION / METRICS
+# -----------------------------------------------------
+
+def nll(logits, targets, temperature):
+    probs = softmax(logits / temperature)
+    return -np.mean(np.log(probs[np.arange(len(targets)), targets] + 1e-12))
+
+
+def fit_temperature(logits, targets):
+    grid = np.exp(np.linspace(np.log(0.05), np.log(10), 200))
+    return float(min(grid, key=lambda t: nll(logits, targets, t)))
+
+
+def expected_calibration_error(confidences, correct, bins=10):
+    edges = np.linspace(0, 1, bins + 1)
+    ece = 0.0
+
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        mask = (confidences > lo) & (confidences <= hi)
+        if mask.any():
+            ece += mask.mean() * abs(correct[mask].mean() - confidences[mask].mean())
+
+    return ece
+
+
+def macro_f1(predicted, actual, labels):
+    scores = []
+
+    for label in labels:
+        tp = np.sum((predicted == label) & (actual == label))
+        fp = np.sum((predicted == label) & (actual != label))
+        fn = np.sum((predicted != label) & (actual == label))
+
+        precision = tp / (tp + fp) if tp + fp else 0.0
+        recall = tp / (tp + fn) if tp + fn else 0.0
+        scores.append(2 * precision * recall / (precision + recall) if precision + recall else 0.0)
+
+    return float(np.mean(scores))
+
+
+# -----------------------------------------------------
+# TRAIN
+# -----------------------------------------------------
+
+def train(embeddings, labels, c=4.0):
+    from sklearn.linear_model import LogisticRegression
+
+    rng = np.random.default_rng(SEED)
+    train_idx, val_idx, test_idx = split(len(labels), rng)
+
+    classes = np.unique(labels)
+    targets = np.searchsorted(classes, labels)
+
+    head = LogisticRegression(C=c, max_iter=2000, class_weight="balanced")
+    head.fit(embeddings[train_idx], targets[train_idx])
+
+    weights = head.coef_.T
+    bias = head.intercept_
+
+    # Binary problems come back with a single column: expand to softmax form
+    if len(classes) == 2:
+        weights = np.hstack([-weights / 2, weights / 2])
+        bias = np.array([-bias[0] / 2, bias[0] / 2])
+
+    val_logits = embeddings[val_idx] @ weights + bias
+    temperature = fit_temperature(val_logits, targets[val_idx])
+
+    model = IncidentClassifier(weights, bias, classes, temperature)
+
+    predicted, confidences = model.predict(embeddings[test_idx])
+    predicted = np.array(predicted)
+    confidences = np.array(confidences)
+    actual = labels[test_idx]
+
+    print(f"train={len(train_idx)} val={len(val_idx)} test={len(test_idx)} classes={[str(c) for c in classes]}")
+    print(f"temperature      {temperature:.3f}")
+    print(f"test accuracy    {np.mean(predicted == actual):.3f}")
+    print(f"test macro-F1    {macro_f1(predicted, actual, classes):.3f}")
+    print(f"test ECE         {expected_calibration_error(confidences, predicted == actual):.3f}")
+
+    return model
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the incident classifier head")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--from-db", action="store_true", help="weak labels from raw_osint")
+    source.add_argument("--csv", help="labelled CSV with text,label columns")
+    parser.add_argument("--limit", type=int, default=None, help="max rows from the database")
+    parser.add_argument("--out", default=CLASSIFIER_MODEL_PATH)
+    args = parser.parse_args()
+
+    if args.from_db:
+        embeddings, labels = load_from_db(args.limit)
+    else:
+        embeddings, labels = load_from_csv(args.csv)
+
+    model = train(embeddings, labels)
+    model.save(args.out)
+
+    print(f"saved {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+# ai_engine/vector_index.py
+#
+# In-process nearest-neighbour index over incident embeddings.
+#
+# Default backend: one L2-normalised float32 matrix, so cosine top-k is a
+# single matmul + argpartition. Set VECTOR_INDEX_BACKEND=hnsw (and install
+# hnswlib) for an approximate HNSW graph instead.
+#
+# The index is persisted to VECTOR_INDEX_PATH and kept current with
+# refresh(), which only reads rows embedded since the last refresh.
+# Requests never wait on it: maybe_refresh() runs it on a background
+# thread and the request is served from what is already loaded.
+
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+
+from models import RawOSINT
+from ai_engine.alert_engine import PENDING_GRACE
+from ingestion.work_queue import MAX_ENRICH_ATTEMPTS
+
+
+EMBEDDING_DIM = 384   # all-MiniLM-L6-v2
+
+VECTOR_INDEX_PATH = os.getenv("VECTOR_INDEX_PATH", ".vector_index.npz")
+VECTOR_INDEX_BACKEND = os.getenv("VECTOR_INDEX_BACKEND", "exact")
+
+REFRESH_BATCH_SIZE = 5000
+
+# Minimum seconds between DB syncs triggered by queries
+REFRESH_INTERVAL_SECONDS = 30
+
+
+def to_vector(value):
+    # float32 bytes from the embedding column, or a plain list / array
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return np.frombuffer(value, dtype=np.float32)
+
+    return np.asarray(value, dtype=np.float32).reshape(-1)
+
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+# -----------------------------------------------------
+# EXACT BACKEND (normalised matrix)
+# -----------------------------------------------------
+
+class ExactIndex:
+
+    def __init__(self, dim=EMBEDDING_DIM):
+        self.dim = dim
+        self.size = 0
+        self.ids = np.empty(0, dtype=np.int64)
+        self.vectors = np.empty((0, dim), dtype=np.float32)
+        self.positions = {}
+
+    def _reserve(self, extra):
+        needed = self.size + extra
+
+        if needed <= len(self.ids):
+            return
+
+        capacity = max(needed, 2 * len(self.ids), 1024)
+
+        ids = np.empty(capacity, dtype=np.int64)
+        vectors = np.empty((capacity, self.dim), dtype=np.float32)
+
+        ids[:self.size] = self.ids[:self.size]
+        vectors[:self.size] = self.vectors[:self.size]
+
+        self.ids, self.vectors = ids, vectors
+
+    def add(self, ids, vectors):
+        vectors = _normalize(vectors).reshape(-1, self.dim)
+
+        new_rows = []
+
+        for row, item_id in enumerate(ids):
+            item_id = int(item_id)
+
+            # Re-embedded record: overwrite in place
+            if item_id in self.positions:
+                self.vectors[self.positions[item_id]] = vectors[row]
+            else:
+                new_rows.append(row)
+
+        if not new_rows:
+            return
+
+        self._reserve(len(new_rows))
+
+        start = self.size
+        end = start + len(new_rows)
+
+        self.ids[start:end] = np.asarray(ids, dtype=np.int64)[new_rows]
+        self.vectors[start:end] = vectors[new_rows]
+
+        for pos in range(start, end):
+            self.positions[int(self.ids[pos])] = pos
+
+        self.size = end
+
+    def get_vector(self, item_id):
+        pos = self.positions.get(int(item_id))
+        return None if pos is None else self.vectors[pos]
+
+    def search(self, vector, top_k, exclude_id=None):
+        if not self.size:
+            return []
+
+        query = _normalize(to_vector(vector))
+        scores = self.vectors[:self.size] @ query
+
+        if exclude_id is not None and int(exclude_id) in self.positions:
+            scores[self.positions[int(exclude_id)]] = -np.inf
+
+        k = min(top_k, self.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        return [
+            (int(self.ids[i]), float(scores[i]))
+            for i in top
+            if np.isfinite(scores[i])
+        ]
+
+    def state(self):
+        return {
+            "ids": self.ids[:self.size],
+            "vectors": self.vectors[:self.size]
+        }
+
+    def load_state(self, state):
+        self.size = 0
+        self.ids = np.empty(0, dtype=np.int64)
+        self.vectors = np.empty((0, self.dim), dtype=np.float32)
+        self.positions = {}
+        self.add(state["ids"], state["vectors"])
+
+
+# -----------------------------------------------------
+# HNSW BACKEND (optional, approximate)
+# -----------------------------------------------------
+
+class HNSWIndex(ExactIndex):
+    """
+    Keeps the normalised vectors (for persistence and get_vector) but
+    answers search() from an hnswlib graph.
+    """
+
+    def __init__(self, dim=EMBEDDING_DIM, ef=128, m=16):
+        import hnswlib
+
+        super().__init__(dim)
+        self._hnswlib = hnswlib
+        self.ef = ef
+        self.m = m
+        self.graph = None
+
+    def _ensure_graph(self, capacity):
+        if self.graph is None:
+            self.graph = self._hnswlib.Index(space="ip", dim=self.dim)
+            self.graph.init_index(max_elements=max(capacity, 1024), ef_construction=200, M=self.m)
+            self.graph.set_ef(self.ef)
+
+        elif capacity > self.graph.get_max_elements():
+            self.graph.resize_index(max(capacity, 2 * self.graph.get_max_elements()))
+
+    def add(self, ids, vectors):
+        super().add(ids, vectors)
+
+        ids = np.asarray(ids, dtype=np.int64)
+        if not len(ids):
+            return
+
+        self._ensure_graph(self.size)
+        self.graph.add_items(_normalize(vectors).reshape(-1, self.dim), ids)
+
+    def search(self, vector, top_k, exclude_id=None):
+        if not self.size:
+            return []
+
+        k = min(top_k + 1, self.size)
+        labels, distances = self.graph.knn_query(_normalize(to_vector(vector)), k=k)
+
+        results = [
+            (int(label), float(1.0 - dist))
+            for label, dist in zip(labels[0], distances[0])
+            if exclude_id is None or int(label) != int(exclude_id)
+        ]
+
+        return results[:top_k]
+
+    def load_state(self, state):
+        self.graph = None
+        super().load_state(state)
+
+
+# -----------------------------------------------------
+# PERSISTENT, DB-SYNCED INDEX
+# -----------------------------------------------------
+
+class VectorIndex:
+
+    def __init__(self, path=VECTOR_INDEX_PATH, backend=VECTOR_INDEX_BACKEND, dim=EMBEDDING_DIM):
+        self.path = path
+        self.backend = HNSWIndex(dim) if backend == "hnsw" else ExactIndex(dim)
+
+        # Every row with id <= watermark was already considered
+        self.watermark = 0
+        self.refreshed_at = 0.0
+        self.lock = threading.RLock()
+        self.refresh_lock = threading.Lock()
+
+    def __len__(self):
+        return self.backend.size
+
+    def add(self, ids, vectors):
+        with self.lock:
+            self.backend.add(ids, vectors)
+
+    def get_vector(self, item_id):
+        with self.lock:
+            return self.backend.get_vector(item_id)
+
+    def search(self, vector, top_k=5, exclude_id=None):
+        with self.lock:
+            return self.backend.search(vector, top_k, exclude_id)
+
+    # ----------------- disk -----------------
+
+    def save(self):
+        with self.lock:
+            state = self.backend.state()
+            tmp_path = self.path + ".tmp.npz"
+
+            np.savez(
+                tmp_path,
+                ids=state["ids"],
+                vectors=state["vectors"],
+                watermark=np.int64(self.watermark)
+            )
+            os.replace(tmp_path, self.path)
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return False
+
+        with np.load(self.path) as data:
+            with self.lock:
+                self.backend.load_state({
+                    "ids": data["ids"],
+                    "vectors": data["vectors"]
+                })
+                self.watermark = int(data["watermark"])
+
+        return True
+
+    # ----------------- database sync -----------------
+
+    def refresh(self, db):
+        """
+        Pull embeddings written since the last refresh.
+        Cost depends on the number of new rows, not the table size.
+
+        As with the alert watermark, rows parked by the pipeline or still
+        unenriched after PENDING_GRACE do not hold the watermark back
+        (else every refresh rescans everything above them); one that is
+        enriched later still reaches the index through similar_incidents'
+        fallback when it is queried.
+        """
+
+        from sqlalchemy import func
+
+        # Database clock, like collected_at's server default
+        cutoff = db.query(func.now()).scalar() - PENDING_GRACE
+
+        # Everything below the oldest row still being worked on is settled
+        oldest_pending = db.query(func.min(RawOSINT.id)).filter(
+            RawOSINT.processed == False,
+            RawOSINT.enrich_attempts < MAX_ENRICH_ATTEMPTS,
+            RawOSINT.collected_at >= cutoff
+        ).scalar()
+
+        if oldest_pending is None:
+            oldest_pending = (db.query(func.max(RawOSINT.id)).scalar() or 0) + 1
+
+        next_watermark = max(self.watermark, oldest_pending - 1)
+
+        added = 0
+        after_id = self.watermark
+
+        while True:
+            rows = (
+                db.query(RawOSINT.id, RawOSINT.embedding)
+                .filter(
+                    RawOSINT.id > after_id,
+                    RawOSINT.embedding != None
+                )
+                .order_by(RawOSINT.id)
+                .limit(REFRESH_BATCH_SIZE)
+                .all()
+            )
+
+            if not rows:
+                break
+
+            after_id = rows[-1].id
+
+            fresh = [
+                r for r in rows
+                if r.embedding and self.get_vector(r.id) is None
+            ]
+
+            if fresh:
+                self.add(
+                    [r.id for r in fresh],
+                    np.stack([to_vector(r.embedding) for r in fresh])
+                )
+                added += len(fresh)
+
+        with self.lock:
+            self.watermark = next_watermark
+            self.refreshed_at = time.monotonic()
+
+        return added
+
+    def maybe_refresh(self, max_age=REFRESH_INTERVAL_SECONDS):
+        """
+        Start a refresh on a background thread when the last one is older
+        than max_age. Returns True if one was started.
+        """
+
+        if time.monotonic() - self.refreshed_at < max_age:
+            return False
+
+        # Another thread is already syncing: serve what we have
+        if not self.refresh_lock.acquire(blocking=False):
+            return False
+
+        threading.Thread(target=self._refresh_in_background, name="vector-index-refresh",
+                         daemon=True).start()
+
+        return True
+
+    def _refresh_in_background(self):
+        from database import SessionLocal
+
+        db = SessionLocal()
+
+        try:
+            self.refresh(db)
+
+        except Exception as e:
+            logging.error(f"Vector index refresh failed: {e}")
+
+            # Retry after the usual interval, not on the next request
+            with self.lock:
+                self.refreshed_at = time.monotonic()
+
+        finally:
+            db.close()
+            self.refresh_lock.release()
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_vector_index():
+    global _index
+
+    with _index_lock:
+        if _index is None:
+            _index = VectorIndex()
+            _index.load()
+
+    return _index
@@ -0,0 +1,250 @@
+# ai_engine/worker.py
+#
+# Standalone multi-process enrichment workers.
+#
+#   python -m ai_engine.worker --processes 4
+#
+# Each process loads the spaCy and sentence-transformer models once and
+# then waits on the raw_osint_new channel: ingestion publishes the ids it
+# inserted, and the first worker to claim them (FOR UPDATE SKIP LOCKED)
+# enriches exactly those rows. One extra process listens for enriched ids
+# and runs clustering + alerts. Without Postgres NOTIFY the workers fall
+# back to polling raw_osint.
+
+import argparse
+import logging
+import multiprocessing as mp
+import os
+import time
+
+
+IDLE_SLEEP_SECONDS = 5
+
+# A listener catches up (on_start) when it connects or reconnects, soon
+# after a wake-up that left rows behind (a failed chunk), and otherwise
+# only this rarely, as a backstop for anything else that slipped through.
+# Between those an idle listener sends no queries.
+SWEEP_SECONDS = 900
+RETRY_SWEEP_SECONDS = 30
+
+# Back-off before reconnecting a dropped listener
+RECONNECT_SECONDS = 5
+
+# Let a burst of enriched chunks settle into one clustering run
+CLUSTER_DEBOUNCE_SECONDS = 2
+
+
+def _listen_forever(channel, on_start, on_ids, name):
+    """
+    LISTEN first, then catch up with on_start() (so nothing committed
+    in between is missed), then call on_ids(ids) for every wake-up.
+    When on_ids returns true (something failed and is still queued),
+    on_start() runs again within RETRY_SWEEP_SECONDS; otherwise only
+    every SWEEP_SECONDS. Reconnects, and catches up again, if the
+    connection drops.
+    """
+
+    from ingestion.work_queue import Listener
+
+    while True:
+        listener = None
+
+        try:
+            listener = Listener(channel)
+            on_start()
+            next_sweep = time.monotonic() + SWEEP_SECONDS
+
+            logging.info(f"{name}: listening on {channel}")
+
+            while True:
+                ids = listener.wait(timeout=max(next_sweep - time.monotonic(), 0))
+
+                if ids and on_ids(ids):
+                    next_sweep = min(next_sweep, time.monotonic() + RETRY_SWEEP_SECONDS)
+
+                if time.monotonic() >= next_sweep:
+                    on_start()
+                    next_sweep = time.monotonic() + SWEEP_SECONDS
+
+        except Exception as e:
+            logging.error(f"{name}: listener failed ({e}), reconnecting")
+            time.sleep(RECONNECT_SECONDS)
+
+        finally:
+            if listener is not None:
+                listener.close()
+
+
+def _serve_metrics(port):
+    if port is None:
+        return
+
+    from metrics import serve_metrics
+
+    try:
+        serve_metrics(port)
+    except OSError as e:
+        logging.error(f"Metrics port {port} unavailable: {e}")
+
+
+def worker_loop(chunk_size, once=False, metrics_port=None):
+
+    # One process per core: keep torch / BLAS from oversubscribing
+    os.environ.setdefault("OMP_NUM_THREADS", "1")
+    os.environ.setdefault("MKL_NUM_THREADS", "1")
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+    logging.basicConfig(level=logging.INFO)
+    name = mp.current_process().name
+
+    _serve_metrics(metrics_port)
+
+    # Load every model once, up front, in this process
+    from ai_engine.model_registry import preload
+    preload()
+
+    from ai_engine.pipeline import (
+        process_unprocessed_records, process_records, PIPELINE_CHUNK_SIZE
+    )
+    from ingestion.work_queue import supports_notify, NEW_RECORDS_CHANNEL
+
+    chunk_size = chunk_size or PIPELINE_CHUNK_SIZE
+
+    def drain():
+        processed = process_unprocessed_records(chunk_size=chunk_size)
+        if processed:
+            logging.info(f"{name}: processed {processed} records")
+        return processed
+
+    def on_ids(ids):
+        failed = []
+        processed = process_records(ids, chunk_size=chunk_size, failed=failed)
+        if processed:
+            logging.info(f"{name}: processed {processed} of {len(ids)} notified records")
+
+        # Retried by the next sweep unless parked
+        return bool(failed)
+
+    if once:
+        drain()
+        return
+
+    if supports_notify():
+        _listen_forever(NEW_RECORDS_CHANNEL, drain, on_ids, name)
+
+    logging.info(f"{name}: models loaded, polling raw_osint")
+
+    while True:
+        if not drain():
+            time.sleep(IDLE_SLEEP_SECONDS)
+
+
+def cluster_loop(once=False, metrics_port=None):
+    """
+    Single process: cluster newly enriched rows, then raise alerts.
+    """
+
+    logging.basicConfig(level=logging.INFO)
+    name = mp.current_process().name
+
+    _serve_metrics(metrics_port)
+
+    from ai_engine.clustering import cluster_new_records
+    from ai_engine.alert_engine import generate_alerts
+    from ingestion.work_queue import supports_notify, ENRICHED_CHANNEL
+
+    def run():
+        clustered = cluster_new_records()
+        alerts = generate_alerts()
+        if clustered:
+            logging.info(f"{name}: clustered {clustered} records, alerts {alerts}")
+        return clustered, alerts
+
+    def on_ids(ids):
+        time.sleep(CLUSTER_DEBOUNCE_SECONDS)
+        _, alerts = run()
+
+        # generate_alerts returns None when it failed: retry on the next sweep
+        return alerts is None
+
+    if once:
+        run()
+        return
+
+    if supports_notify():
+        _listen_forever(ENRICHED_CHANNEL, run, on_ids, name)
+
+    while True:
+        clustered, _ = run()
+        if not clustered:
+            time.sleep(IDLE_SLEEP_SECONDS)
+
+
+def run_workers(processes=None, chunk_size=None, once=False, cluster=True, metrics_port=None):
+    """
+    With metrics_port, worker i serves /metrics on metrics_port + i and
+    the clustering process on the port after the last worker.
+    """
+
+    processes = processes or os.cpu_count() or 1
+
+    def port(offset):
+        return None if metrics_port is None else metrics_port + offset
+
+    # spawn: every worker gets its own DB engine and model copies
+    ctx = mp.get_context("spawn")
+
+    workers = [
+        ctx.Process(
+            target=worker_loop,
+            args=(chunk_size, once, port(i)),
+            name=f"ai-worker-{i}"
+        )
+        for i in range(processes)
+    ]
+
+    for p in workers:
+        p.start()
+
+    # --once: cluster what the enrichment workers just produced
+    if once:
+        for p in workers:
+            p.join()
+
+    if cluster:
+        clusterer = ctx.Process(target=cluster_loop, args=(once, port(processes)), name="ai-cluster")
+        clusterer.start()
+        workers.append(clusterer)
+
+    try:
+        for p in workers:
+            p.join()
+
+    except KeyboardInterrupt:
+        for p in workers:
+            p.terminate()
+        for p in workers:
+            p.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OSNIT AI enrichment workers")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=None,
+                        help="rows claimed per chunk")
+    parser.add_argument("--once", action="store_true",
+                        help="drain the queue once and exit")
+    parser.add_argument("--no-cluster", action="store_true",
+                        help="do not start the clustering / alerts process "
+                             "(run exactly one across all hosts)")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="serve /metrics from each process, starting at this port")
+    args = parser.parse_args()
+
+    run_workers(args.processes, args.chunk_size, args.once,
+                cluster=not args.no_cluster, metrics_port=args.metrics_port)
+
+
+if __name__ == "__main__":
+    main()
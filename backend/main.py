@@ -1,15 +1,22 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from backend.routes.incidents import router as incidents_router
 from backend.routes.intelligence import router as intelligence_router
 from backend.routes.operations import router as operations_router
+from backend.routes.dashboard import router as dashboard_router
 
-from ingestion.collectors.news import collect_news
-from ai_engine.pipeline import process_unprocessed_records
+from ingestion import scheduler as job_scheduler
 
-from apscheduler.schedulers.background import BackgroundScheduler
 import logging
+import threading
+import time
+
+from database import SessionLocal
+from ai_engine.vector_index import get_vector_index
+from ingestion.work_queue import queue_depth
+from metrics import CONTENT_TYPE, HTTP_REQUEST_SECONDS, UNPROCESSED_ROWS, render
+from profiling import PROFILING_ENABLED, profile
 
 
 # -----------------------------------
@@ -27,15 +34,50 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 
+# -----------------------------------
+# Metrics / Profiling Middleware
+# -----------------------------------
+def _profile_requested(request):
+    return PROFILING_ENABLED and (
+        request.query_params.get("profile") == "1"
+        or request.headers.get("x-profile") == "1"
+    )
+
+
+@app.middleware("http")
+async def observe_requests(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
+
+    try:
+        with profile(f"{request.method} {request.url.path}", enabled=_profile_requested(request)):
+            response = await call_next(request)
+
+        status = response.status_code
+        return response
+
+    finally:
+        # Route template, not the raw path: keeps label cardinality fixed
+        route = request.scope.get("route")
+
+        HTTP_REQUEST_SECONDS.labels(
+            request.method,
+            getattr(route, "path", "unmatched"),
+            status
+        ).observe(time.perf_counter() - started)
+
+
 # -----------------------------------
 # Include Routers
 # -----------------------------------
 app.include_router(incidents_router)
 app.include_router(intelligence_router)
 app.include_router(operations_router)
+app.include_router(dashboard_router)
 
 
 # -----------------------------------
@@ -47,25 +89,62 @@ logging.basicConfig(level=logging.INFO)
 # -----------------------------------
 # Scheduler Setup
 # -----------------------------------
-scheduler = BackgroundScheduler()
+# Every uvicorn worker campaigns, but only the advisory-lock holder runs
+# jobs (see ingestion/scheduler.py). AI enrichment runs in the standalone
+# worker pool (python -m ai_engine.worker), never inside the API process.
 
+@app.on_event("startup")
+def start_scheduler():
+    job_scheduler.start()
+    logging.info("🚀 Scheduler started inside FastAPI")
 
-def ingestion_job():
-    logging.info("Running ingestion job...")
-    collect_news()
 
+@app.on_event("shutdown")
+def stop_scheduler():
+    job_scheduler.stop()
 
-def ai_processing_job():
-    logging.info("Running AI processing job...")
-    process_unprocessed_records()
+
+# -----------------------------------
+# Vector Index (similar incidents)
+# -----------------------------------
+def warm_vector_index():
+    db = SessionLocal()
+    try:
+        index = get_vector_index()
+
+        # Held so a request does not start a second refresh meanwhile
+        with index.refresh_lock:
+            added = index.refresh(db)
+        if added:
+            index.save()
+        logging.info(f"Vector index ready: {len(index)} embeddings")
+    except Exception as e:
+        logging.error(f"Vector index warm-up failed: {e}")
+    finally:
+        db.close()
 
 
 @app.on_event("startup")
-def start_scheduler():
-    scheduler.add_job(ingestion_job, "interval", minutes=15)
-    scheduler.add_job(ai_processing_job, "interval", minutes=15)
-    scheduler.start()
-    logging.info("🚀 Scheduler started inside FastAPI")
+def start_vector_index():
+    # Load from disk + catch up in the background; requests fall back
+    # to whatever is loaded so far
+    threading.Thread(target=warm_vector_index, daemon=True).start()
+
+
+@app.on_event("shutdown")
+def save_vector_index():
+    get_vector_index().save()
+
+
+# -----------------------------------
+# Metrics Endpoint
+# -----------------------------------
+UNPROCESSED_ROWS.set_function(queue_depth)
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return Response(render(), media_type=CONTENT_TYPE)
 
 
 # -----------------------------------
@@ -0,0 +1,84 @@
+import hashlib
+import json
+import threading
+import time
+
+from fastapi import APIRouter, Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from backend.routes.intelligence import (
+    analytics_summary,
+    incident_trends,
+    get_alerts,
+    top_threats,
+    detect_spikes
+)
+from backend.routes.incidents import map_data, get_all_incidents
+from backend.routes.operations import scheduler_status
+
+router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+
+
+# Seconds a built snapshot is served before the next rebuild
+SNAPSHOT_TTL_SECONDS = 10
+
+SNAPSHOT_PARTS = {
+    "summary": analytics_summary,
+    "trends": incident_trends,
+    "alerts": get_alerts,
+    "top_threats": top_threats,
+    "map": map_data,
+    "spikes": detect_spikes,
+    "incidents": lambda: get_all_incidents(limit=30),
+    "status": scheduler_status
+}
+
+_snapshot = {"body": None, "etag": None, "built_at": 0.0}
+_snapshot_lock = threading.Lock()
+
+
+def build_snapshot():
+    payload = {}
+
+    for name, build in SNAPSHOT_PARTS.items():
+        try:
+            payload[name] = build()
+        except Exception as e:
+            # Same contract as the per-endpoint calls: a failing part is null
+            print(f"Dashboard snapshot part '{name}' failed:", e)
+            payload[name] = None
+
+    body = json.dumps(jsonable_encoder(payload), separators=(",", ":")).encode("utf-8")
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+    return body, etag
+
+
+def get_snapshot():
+    """
+    Cached snapshot with single-flight rebuilds: when it expires, one
+    request rebuilds it while concurrent requests wait and reuse it.
+    """
+
+    if time.monotonic() - _snapshot["built_at"] < SNAPSHOT_TTL_SECONDS:
+        return _snapshot["body"], _snapshot["etag"]
+
+    with _snapshot_lock:
+        # Someone else rebuilt it while we waited for the lock
+        if time.monotonic() - _snapshot["built_at"] >= SNAPSHOT_TTL_SECONDS:
+            body, etag = build_snapshot()
+            _snapshot.update(body=body, etag=etag, built_at=time.monotonic())
+
+        return _snapshot["body"], _snapshot["etag"]
+
+
+@router.get("/snapshot")
+def dashboard_snapshot(request: Request):
+    body, etag = get_snapshot()
+
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -1,41 +1,101 @@
-from fastapi import APIRouter
+import base64
+import json
+from datetime import datetime
+
+from fastapi import APIRouter, HTTPException, Response
+from sqlalchemy import tuple_
 from database import SessionLocal
 from models import RawOSINT
 
 router = APIRouter(prefix="/incidents", tags=["Incidents"])
 
 
+# fields= name -> column; id and collected_at are always read for the cursor
+INCIDENT_FIELDS = {
+    "id": RawOSINT.id,
+    "source": RawOSINT.source,
+    "content": RawOSINT.content,
+    "url": RawOSINT.url,
+    "metadata": RawOSINT.extra_metadata,
+    "collected_at": RawOSINT.collected_at,
+    "country": RawOSINT.country,
+    "state": RawOSINT.state,
+    "incident_type": RawOSINT.incident_type,
+    "severity": RawOSINT.severity,
+    "risk_score": RawOSINT.risk_score
+}
+
+DEFAULT_FIELDS = ["id", "source", "content", "url", "metadata", "collected_at"]
+
+
+def encode_cursor(collected_at, incident_id):
+    raw = json.dumps([collected_at.isoformat() if collected_at else None, incident_id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        collected_at, incident_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(collected_at), int(incident_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @router.get("/")
 def get_all_incidents(
     source: str = None,
     limit: int = 10,
-    skip: int = 0
+    skip: int = 0,
+    cursor: str = None,
+    fields: str = None,
+    response: Response = None
 ):
+    """
+    Newest first. Pass the X-Next-Cursor response header back as
+    `cursor` for the next page (keyset on (collected_at, id), so every
+    page costs the same); `skip` is kept for old clients only.
+    """
+
+    names = [f.strip() for f in fields.split(",")] if fields else DEFAULT_FIELDS
+    unknown = [name for name in names if name not in INCIDENT_FIELDS]
+
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+
+    columns = {name: INCIDENT_FIELDS[name] for name in names}
+    columns.setdefault("id", RawOSINT.id)
+    columns.setdefault("collected_at", RawOSINT.collected_at)
+
     db = SessionLocal()
     try:
-        query = db.query(RawOSINT)
+        query = db.query(*[col.label(name) for name, col in columns.items()])
 
         if source:
             query = query.filter(RawOSINT.source == source)
 
-        incidents = (
+        if cursor:
+            cursor_at, cursor_id = decode_cursor(cursor)
+            query = query.filter(
+                tuple_(RawOSINT.collected_at, RawOSINT.id) < tuple_(cursor_at, cursor_id)
+            )
+        elif skip:
+            query = query.offset(skip)
+
+        rows = (
             query
-            .order_by(RawOSINT.collected_at.desc())
-            .offset(skip)
+            .order_by(RawOSINT.collected_at.desc(), RawOSINT.id.desc())
             .limit(limit)
             .all()
         )
 
+        if response is not None and len(rows) == limit:
+            last = rows[-1]
+            response.headers["X-Next-Cursor"] = encode_cursor(last.collected_at, last.id)
+
         return [
-            {
-                "id": i.id,
-                "source": i.source,
-                "content": i.content,
-                "url": i.url,
-                "metadata": i.extra_metadata,
-                "collected_at": i.collected_at
-            }
-            for i in incidents
+            {name: getattr(row, name) for name in names}
+            for row in rows
         ]
 
     finally:
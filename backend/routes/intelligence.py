@@ -2,8 +2,7 @@ from fastapi import APIRouter
 from database import SessionLocal
 from models import RawOSINT
 from sqlalchemy import desc, text
-from sklearn.metrics.pairwise import cosine_similarity
-import numpy as np
+from ai_engine.vector_index import get_vector_index, to_vector
 
 router = APIRouter(prefix="/intelligence", tags=["Intelligence"])
 
@@ -63,12 +62,12 @@ def top_threats(limit: int = 10):
 def cluster_summary():
     db = SessionLocal()
     try:
+        # Maintained by clustering; no full GROUP BY over raw_osint
         results = db.execute(
             text("""
-                SELECT cluster_id, COUNT(*) as count
-                FROM raw_osint
-                GROUP BY cluster_id
-                ORDER BY count DESC
+                SELECT cluster_id, incident_count as count
+                FROM cluster_rollup
+                ORDER BY incident_count DESC
             """)
         ).fetchall()
 
@@ -119,38 +118,37 @@ def cluster_details(cluster_id: int):
 def similar_incidents(incident_id: int, top_k: int = 5):
     db = SessionLocal()
     try:
-        base_record = db.get(RawOSINT, incident_id)
-
-        if not base_record or not base_record.embedding:
-            return {"error": "Incident not found or embedding missing"}
+        index = get_vector_index()
+        index.maybe_refresh()
 
-        all_records = db.query(RawOSINT).filter(
-            RawOSINT.embedding != None
-        ).all()
+        base_vector = index.get_vector(incident_id)
 
-        base_vector = np.array(base_record.embedding).reshape(1, -1)
+        if base_vector is None:
+            base_record = db.get(RawOSINT, incident_id)
 
-        similarities = []
+            if not base_record or not base_record.embedding:
+                return {"error": "Incident not found or embedding missing"}
 
-        for record in all_records:
-            if record.id == incident_id:
-                continue
+            base_vector = to_vector(base_record.embedding)
+            index.add([incident_id], base_vector.reshape(1, -1))
 
-            vector = np.array(record.embedding).reshape(1, -1)
-            score = cosine_similarity(base_vector, vector)[0][0]
-            similarities.append((record, score))
+        neighbours = index.search(base_vector, top_k=top_k, exclude_id=incident_id)
 
-        similarities.sort(key=lambda x: x[1], reverse=True)
+        risk_scores = dict(
+            db.query(RawOSINT.id, RawOSINT.risk_score)
+            .filter(RawOSINT.id.in_([i for i, _ in neighbours]))
+            .all()
+        ) if neighbours else {}
 
         return {
             "incident_id": incident_id,
             "similar_incidents": [
                 {
-                    "id": r.id,
+                    "id": i,
                     "similarity_score": round(score, 3),
-                    "risk_score": r.risk_score
+                    "risk_score": risk_scores.get(i)
                 }
-                for r, score in similarities[:top_k]
+                for i, score in neighbours
             ]
         }
 
@@ -166,10 +164,10 @@ def incident_trends():
     try:
         results = db.execute(
             text("""
-                SELECT date_trunc('hour', collected_at) as hour,
-                       COUNT(*) as count
-                FROM raw_osint
-                WHERE collected_at >= NOW() - INTERVAL '24 hours'
+                SELECT hour,
+                       SUM(incident_count) as count
+                FROM incident_rollup_hourly
+                WHERE hour >= date_trunc('hour', NOW() - INTERVAL '24 hours')
                 GROUP BY hour
                 ORDER BY hour
             """)
@@ -190,50 +188,48 @@ def incident_trends():
 from sqlalchemy import text
 
 
+# Types whose last-hour count grew by more than this share are spikes
+SPIKE_GROWTH_THRESHOLD = 0.5
+
+
 @router.get("/spikes")
-def detect_spikes():
+def detect_spikes(window_minutes: int = 60):
     db = SessionLocal()
     try:
-        # Last 1 hour count
-        recent = db.execute(
-            text("""
-                SELECT incident_type, COUNT(*) as cnt
-                FROM raw_osint
-                WHERE collected_at >= NOW() - INTERVAL '1 hour'
-                GROUP BY incident_type
-            """)
-        ).fetchall()
-
-        # Previous 1 hour count
-        previous = db.execute(
+        # Two full rolling windows (the last `window_minutes` against the
+        # ones before), not the partial current clock hour against the
+        # whole previous one. Counted from raw rows through the
+        # collected_at index, with the rollups' rules: enriched rows
+        # only, near-duplicates excluded.
+        results = db.execute(
             text("""
-                SELECT incident_type, COUNT(*) as cnt
+                SELECT incident_type,
+                       COUNT(*) FILTER (WHERE collected_at >= NOW() - make_interval(mins => :window)) AS current_count,
+                       COUNT(*) FILTER (WHERE collected_at < NOW() - make_interval(mins => :window)) AS previous_count
                 FROM raw_osint
-                WHERE collected_at >= NOW() - INTERVAL '2 hour'
-                  AND collected_at < NOW() - INTERVAL '1 hour'
+                WHERE collected_at >= NOW() - make_interval(mins => :window * 2)
+                  AND processed = true
+                  AND incident_type IS NOT NULL
                 GROUP BY incident_type
-            """)
+            """),
+            {"window": window_minutes}
         ).fetchall()
 
-        prev_dict = {row.incident_type: row.cnt for row in previous}
-
         spikes = []
 
-        for row in recent:
-            prev_count = prev_dict.get(row.incident_type, 0)
-
-            if prev_count > 0:
-                growth = (row.cnt - prev_count) / prev_count
+        for row in results:
+            if row.previous_count > 0:
+                growth = (row.current_count - row.previous_count) / row.previous_count
 
-                if growth > 0.5:  # 50% growth threshold
+                if growth > SPIKE_GROWTH_THRESHOLD:
                     spikes.append({
                         "incident_type": row.incident_type,
-                        "previous_count": prev_count,
-                        "current_count": row.cnt,
+                        "previous_count": row.previous_count,
+                        "current_count": row.current_count,
                         "growth_rate": round(growth, 2)
                     })
 
-        return {"spikes": spikes}
+        return {"window_minutes": window_minutes, "spikes": spikes}
 
     finally:
         db.close()
@@ -244,8 +240,12 @@ def analytics_summary():
         # ---------------------------
         # 1️⃣ Total Incidents
         # ---------------------------
+        # From the rollups, so every count here covers enriched rows
+        # only: rows still waiting for the AI pipeline and near-duplicates
+        # (stored against their canonical record, never enriched) are
+        # not incidents yet and are left out.
         total = db.execute(
-            text("SELECT COUNT(*) FROM raw_osint")
+            text("SELECT COALESCE(SUM(incident_count), 0) FROM incident_rollup_hourly")
         ).scalar()
 
         # ---------------------------
@@ -253,8 +253,8 @@ def analytics_summary():
         # ---------------------------
         severity_counts = db.execute(
             text("""
-                SELECT severity, COUNT(*) as cnt
-                FROM raw_osint
+                SELECT severity, SUM(incident_count) as cnt
+                FROM incident_rollup_hourly
                 GROUP BY severity
             """)
         ).fetchall()
@@ -268,8 +268,8 @@ def analytics_summary():
         # ---------------------------
         top_types = db.execute(
             text("""
-                SELECT incident_type, COUNT(*) as cnt
-                FROM raw_osint
+                SELECT incident_type, SUM(incident_count) as cnt
+                FROM incident_rollup_hourly
                 GROUP BY incident_type
                 ORDER BY cnt DESC
                 LIMIT 5
@@ -281,10 +281,9 @@ def analytics_summary():
         # ---------------------------
         top_clusters = db.execute(
             text("""
-                SELECT cluster_id, COUNT(*) as cnt
-                FROM raw_osint
-                GROUP BY cluster_id
-                ORDER BY cnt DESC
+                SELECT cluster_id, incident_count as cnt
+                FROM cluster_rollup
+                ORDER BY incident_count DESC
                 LIMIT 5
             """)
         ).fetchall()
@@ -293,7 +292,10 @@ def analytics_summary():
         # 5️⃣ Average Risk Score
         # ---------------------------
         avg_risk = db.execute(
-            text("SELECT AVG(risk_score) FROM raw_osint")
+            text("""
+                SELECT SUM(risk_sum) / NULLIF(SUM(risk_count), 0)
+                FROM incident_rollup_hourly
+            """)
         ).scalar()
 
         # ---------------------------
@@ -308,9 +310,9 @@ def analytics_summary():
         # ---------------------------
         last_24h = db.execute(
             text("""
-                SELECT COUNT(*)
-                FROM raw_osint
-                WHERE collected_at >= NOW() - INTERVAL '24 hours'
+                SELECT COALESCE(SUM(incident_count), 0)
+                FROM incident_rollup_hourly
+                WHERE hour >= date_trunc('hour', NOW() - INTERVAL '24 hours')
             """)
         ).scalar()
 
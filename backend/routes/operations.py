@@ -1,7 +1,10 @@
-from fastapi import APIRouter
+import subprocess
+import sys
+import threading
+
+from fastapi import APIRouter, HTTPException
 from ingestion.collectors.news import collect_news
-from ai_engine.pipeline import process_unprocessed_records
-from ingestion.scheduler import scheduler
+from ingestion.scheduler import status
 
 router = APIRouter(prefix="/operations", tags=["Operations"])
 
@@ -10,13 +13,27 @@ def run_ingestion():
     collect_news()
     return {"status": "Ingestion started"}
 
+# The one-shot worker /run-ai started, if any (one at a time per process)
+_ai_run = {"process": None}
+_ai_run_lock = threading.Lock()
+
 @router.post("/run-ai")
 def run_ai():
-    process_unprocessed_records()
+    with _ai_run_lock:
+        process = _ai_run["process"]
+
+        # poll() also reaps a finished worker
+        if process is not None and process.poll() is None:
+            raise HTTPException(status_code=409, detail=f"AI worker already running (pid {process.pid})")
+
+        # Hand off to a worker process so the API never runs NLP itself
+        _ai_run["process"] = subprocess.Popen(
+            [sys.executable, "-m", "ai_engine.worker", "--once", "--processes", "1"]
+        )
+
     return {"status": "AI processing started"}
 
 @router.get("/status")
 def scheduler_status():
-    return {
-        "running": scheduler.running
-    }
+    # Leader / follower role of this process + per-job run metrics
+    return status()
@@ -0,0 +1,58 @@
+# benchmarks/bench_classifier.py
+#
+# Throughput and load time of the vectorised IncidentClassifier vs the
+# keyword classifier, on synthetic embeddings / the shared corpus.
+#
+#   python -m benchmarks.bench_classifier [n_records]
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from ai_engine.classifier import classify_incident
+from ai_engine.ml_classifier import IncidentClassifier
+from ai_engine.preprocess import clean_text
+from ai_engine.vector_index import EMBEDDING_DIM
+from benchmarks.corpus import make_corpus
+
+
+LABELS = ["border_tension", "civil_unrest", "cyber_attack", "military_activity", "other"]
+
+
+def main(n_records=100_000):
+    rng = np.random.default_rng(0)
+
+    path = os.path.join(tempfile.mkdtemp(), "incident_classifier.npz")
+    IncidentClassifier(
+        rng.standard_normal((EMBEDDING_DIM, len(LABELS))),
+        rng.standard_normal(len(LABELS)),
+        LABELS,
+        temperature=1.3
+    ).save(path)
+
+    start = time.perf_counter()
+    model = IncidentClassifier.load(path)
+    print(f"artifact load              {(time.perf_counter() - start) * 1000:8.2f} ms")
+
+    embeddings = rng.standard_normal((n_records, EMBEDDING_DIM)).astype(np.float32)
+
+    for batch in (200, 5000):
+        start = time.perf_counter()
+        for i in range(0, n_records, batch):
+            model.predict(embeddings[i:i + batch])
+        elapsed = time.perf_counter() - start
+        print(f"predict batch={batch:<6}      {n_records / elapsed:12.0f} records/sec")
+
+    texts = [clean_text(t) for t in make_corpus(min(n_records, 20000))]
+    start = time.perf_counter()
+    for text in texts:
+        classify_incident(text)
+    elapsed = time.perf_counter() - start
+    print(f"keyword classify_incident  {len(texts) / elapsed:12.0f} records/sec")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,102 @@
+# benchmarks/bench_clustering.py
+#
+# Old O(n^2) greedy pass vs the incremental centroid clusterer on
+# synthetic embeddings (noisy copies of a few hundred "stories").
+#
+#   python -m benchmarks.bench_clustering [n_records]
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from ai_engine.clustering import IncrementalClusterer, SIMILARITY_THRESHOLD
+from ai_engine.vector_index import EMBEDDING_DIM
+
+
+N_STORIES = 300
+NOISE = 0.02
+
+
+def synthetic_embeddings(n, seed=0):
+    rng = np.random.default_rng(seed)
+
+    stories = rng.standard_normal((N_STORIES, EMBEDDING_DIM)).astype(np.float32)
+    stories /= np.linalg.norm(stories, axis=1, keepdims=True)
+
+    labels = rng.integers(0, N_STORIES, n)
+    vectors = stories[labels] + NOISE * rng.standard_normal((n, EMBEDDING_DIM)).astype(np.float32)
+
+    return vectors, labels
+
+
+def legacy_cluster(embeddings):
+    # The previous ai_engine.clustering.cluster_records, minus the ORM objects
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    similarity_matrix = cosine_similarity(embeddings)
+
+    cluster_ids = [0] * len(embeddings)
+    cluster_id = 1
+    assigned = set()
+
+    for i in range(len(embeddings)):
+        if i in assigned:
+            continue
+
+        cluster_ids[i] = cluster_id
+        assigned.add(i)
+
+        for j in range(i + 1, len(embeddings)):
+            if similarity_matrix[i][j] >= SIMILARITY_THRESHOLD:
+                cluster_ids[j] = cluster_id
+                assigned.add(j)
+
+        cluster_id += 1
+
+    return cluster_ids
+
+
+def measure(label, func):
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    result = func()
+
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{label:<24} {elapsed:8.2f} s  peak {peak / 2**20:8.1f} MiB  clusters={len(set(result))}")
+    return result
+
+
+def purity(labels, clusters):
+    # Fraction of records whose cluster's majority story matches their own
+    by_cluster = {}
+    for story, cluster in zip(labels, clusters):
+        by_cluster.setdefault(cluster, []).append(story)
+
+    hits = sum(np.bincount(members).max() for members in by_cluster.values())
+    return hits / len(labels)
+
+
+def main(n_records=20000):
+    vectors, labels = synthetic_embeddings(n_records)
+
+    clusterer = IncrementalClusterer(path=os.path.join(tempfile.mkdtemp(), "clusters.npz"))
+
+    incremental = measure("incremental", lambda: clusterer.assign_many(vectors))
+    print(f"  purity {purity(labels, incremental):.3f}")
+
+    # n x n similarity matrix: keep the legacy run to a size that fits
+    legacy_n = min(n_records, 4000)
+    legacy = measure(f"legacy greedy (n={legacy_n})", lambda: legacy_cluster(vectors[:legacy_n]))
+    print(f"  purity {purity(labels[:legacy_n], legacy):.3f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,36 @@
+# benchmarks/bench_embedding.py
+#
+# Texts/sec of one-at-a-time generate_embedding vs batched
+# generate_embeddings on the shared synthetic corpus.
+#
+#   python -m benchmarks.bench_embedding [n_texts]
+
+import sys
+import time
+
+from ai_engine.embedding import generate_embedding, generate_embeddings
+from benchmarks.corpus import make_corpus
+
+
+def timed(label, func, n):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed:7.2f} s  {n / elapsed:8.0f} texts/sec")
+
+
+def main(n_texts=2000):
+    corpus = make_corpus(n_texts)
+
+    timed("generate_embedding (single)", lambda: [generate_embedding(t) for t in corpus], n_texts)
+
+    for batch_size in (16, 64, 256):
+        timed(
+            f"generate_embeddings bs={batch_size}",
+            lambda: generate_embeddings(corpus, batch_size=batch_size),
+            n_texts
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
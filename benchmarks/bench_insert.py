@@ -0,0 +1,81 @@
+# benchmarks/bench_insert.py
+#
+# Compare rows/sec of the per-row and bulk insert_records paths.
+#
+#   python -m benchmarks.bench_insert                  # SQLite stand-in
+#   DATABASE_URL=postgresql://... python -m benchmarks.bench_insert
+
+import os
+import random
+import tempfile
+import time
+
+_STATE_DIR = tempfile.mkdtemp(prefix="osnit_bench_")
+
+# Benchmark ids must not land in the shared near-duplicate index
+os.environ["NEAR_DUP_INDEX_PATH"] = os.path.join(_STATE_DIR, "near_dup.npz")
+
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(_STATE_DIR, "bench_insert.db")
+
+from database import Base, engine
+from models import RawOSINT
+from ingestion.utils import insert_records
+
+
+BATCH_SIZE = 500
+DUPLICATE_RATE = 0.2
+
+
+def make_batch(tag, n=BATCH_SIZE):
+    records = []
+
+    for i in range(n):
+        # Re-use an earlier headline to exercise in-batch dedup
+        if i and random.random() < DUPLICATE_RATE:
+            records.append(random.choice(records))
+            continue
+
+        records.append({
+            "source": "bench",
+            "content": f"[{tag}] Border incident #{i} reported near Kashmir",
+            "url": f"https://example.com/{tag}/{i}",
+            "country": "India",
+            "metadata": {"seq": i}
+        })
+
+    return records
+
+
+def run(label, records, **kwargs):
+    start = time.perf_counter()
+    inserted = insert_records(records, **kwargs)
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{label:<28} inserted={inserted:<5} "
+        f"{elapsed * 1000:8.1f} ms  {len(records) / elapsed:10.0f} rows/sec"
+    )
+    return inserted
+
+
+def main():
+    random.seed(7)
+    Base.metadata.create_all(engine, tables=[RawOSINT.__table__])
+
+    print(f"Database: {engine.url.render_as_string(hide_password=True)}")
+
+    per_row = make_batch("per_row")
+    run("per-row (fresh)", per_row, bulk=False)
+    run("per-row (all duplicates)", per_row, bulk=False)
+
+    bulk = make_batch("bulk")
+    run("bulk (fresh)", bulk)
+    run("bulk (all duplicates)", bulk)
+
+    for chunk_size in (50, 1000):
+        run(f"bulk chunk_size={chunk_size}", make_batch(f"c{chunk_size}"), chunk_size=chunk_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# benchmarks/bench_keywords.py
+#
+# Per-document cost of KeywordMatcher vs the old nested `in` scan as the
+# keyword list grows to thousands of terms.
+#
+#   python -m benchmarks.bench_keywords
+
+import random
+import string
+import time
+
+from ai_engine.keyword_matcher import KeywordMatcher
+from benchmarks.corpus import make_corpus
+
+
+SIZES = [10, 100, 1000, 5000]
+N_DOCS = 2000
+
+
+def random_keywords(n, rng):
+    words = set()
+    while len(words) < n:
+        words.add("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10))))
+    return sorted(words) + ["border", "army", "kashmir"]
+
+
+def per_doc_us(func, docs):
+    start = time.perf_counter()
+    for doc in docs:
+        func(doc)
+    return (time.perf_counter() - start) / len(docs) * 1e6
+
+
+def main():
+    rng = random.Random(1)
+    docs = make_corpus(N_DOCS)
+
+    print(f"{'keywords':>9} {'build ms':>9} {'matcher us/doc':>15} {'naive us/doc':>13}")
+
+    for size in SIZES:
+        keywords = random_keywords(size, rng)
+
+        start = time.perf_counter()
+        matcher = KeywordMatcher(keywords)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        matcher_us = per_doc_us(matcher.find_all, docs)
+        naive_us = per_doc_us(
+            lambda d: [k for k in keywords if k.lower() in d.lower()],
+            docs
+        )
+
+        print(f"{size:>9} {build_ms:>9.1f} {matcher_us:>15.2f} {naive_us:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# benchmarks/bench_ner.py
+#
+# docs/sec of per-record extract_entities vs nlp.pipe batching.
+# Exits 1 when the batched entities differ from the per-record ones.
+#
+#   python -m benchmarks.bench_ner [n_docs]
+
+import sys
+import time
+
+from ai_engine.preprocess import clean_text
+from ai_engine.ner import extract_entities, extract_entities_batch
+from benchmarks.corpus import make_corpus
+
+
+def timed(label, func, n_docs):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+
+    print(f"{label:<36} {elapsed:7.2f} s  {n_docs / elapsed:8.0f} docs/sec")
+    return result
+
+
+def main(n_docs=2000):
+    corpus = [clean_text(t) for t in make_corpus(n_docs)]
+
+    failed = False
+
+    baseline = timed(
+        "extract_entities (per record)",
+        lambda: [extract_entities(t) for t in corpus],
+        n_docs
+    )
+
+    for batch_size in (32, 128, 512):
+        batched = timed(
+            f"extract_entities_batch bs={batch_size}",
+            lambda: extract_entities_batch(corpus, batch_size=batch_size),
+            n_docs
+        )
+
+        mismatches = sum(
+            1 for a, b in zip(baseline, batched)
+            if {k: sorted(v) for k, v in a.items()} != {k: sorted(v) for k, v in b.items()}
+        )
+        if mismatches:
+            print(f"  !! {mismatches} records differ from extract_entities")
+            failed = True
+
+    return not failed
+
+
+if __name__ == "__main__":
+    if not main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000):
+        sys.exit(1)
@@ -0,0 +1,60 @@
+# benchmarks/bench_similar.py
+#
+# Top-k latency of the in-process vector index vs the old
+# per-row cosine_similarity loop.
+#
+#   python -m benchmarks.bench_similar [n_vectors]
+
+import sys
+import time
+
+import numpy as np
+
+from ai_engine.vector_index import ExactIndex, EMBEDDING_DIM
+
+
+QUERIES = 50
+TOP_K = 5
+
+
+def legacy_topk(vectors, query, top_k):
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    q = query.reshape(1, -1)
+    scores = [
+        (i, cosine_similarity(q, vectors[i].reshape(1, -1))[0][0])
+        for i in range(len(vectors))
+    ]
+    scores.sort(key=lambda x: x[1], reverse=True)
+    return scores[:top_k]
+
+
+def main(n_vectors=1_000_000):
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((n_vectors, EMBEDDING_DIM), dtype=np.float32)
+
+    start = time.perf_counter()
+    index = ExactIndex()
+    index.add(np.arange(n_vectors), vectors)
+    print(f"build {n_vectors} vectors: {time.perf_counter() - start:.2f} s")
+
+    latencies = []
+    for q in rng.integers(0, n_vectors, QUERIES):
+        start = time.perf_counter()
+        index.search(vectors[q], TOP_K, exclude_id=int(q))
+        latencies.append(time.perf_counter() - start)
+
+    latencies = np.array(latencies) * 1000
+    print(f"exact index  p50={np.percentile(latencies, 50):7.2f} ms  p95={np.percentile(latencies, 95):7.2f} ms")
+
+    # The old loop is far too slow at full scale: time it on a slice
+    legacy_n = min(n_vectors, 20_000)
+    start = time.perf_counter()
+    legacy_topk(vectors[:legacy_n], vectors[0], TOP_K)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"legacy loop  {elapsed:9.2f} ms for {legacy_n} rows "
+          f"(~{elapsed * n_vectors / legacy_n / 1000:.1f} s extrapolated)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,205 @@
+# benchmarks/explain_check.py
+#
+# Plan regression check for the hot query paths (Postgres only).
+#
+# Seeds a throwaway schema with a large raw_osint table, runs the real
+# route / pipeline functions against it, captures every SELECT they send
+# to raw_osint and EXPLAINs it. Exits 1 if any plan falls back to a
+# sequential scan on raw_osint.
+#
+#   DATABASE_URL=postgresql://... python -m benchmarks.explain_check [rows]
+
+import json
+import os
+import sys
+
+from sqlalchemy import event, text
+
+from database import Base, SessionLocal, engine
+import models  # noqa: F401
+
+
+SEED_ROWS = 200_000
+
+SCHEMA = f"explain_check_{os.getpid()}"
+
+# Statements that are not issued through a route function
+EXTRA_QUERIES = {
+    "clustering keyset": """
+        SELECT id, embedding FROM raw_osint
+        WHERE id > 0 AND cluster_id IS NULL AND embedding IS NOT NULL
+        ORDER BY id LIMIT 1000
+    """,
+    "vector index refresh": """
+        SELECT id, embedding FROM raw_osint
+        WHERE id > (SELECT max(id) - 1000 FROM raw_osint) AND embedding IS NOT NULL
+        ORDER BY id LIMIT 5000
+    """,
+    "oldest unprocessed": """
+        SELECT min(id) FROM raw_osint WHERE processed = false
+    """,
+}
+
+
+SEED_SQL = """
+    INSERT INTO raw_osint (
+        source, content, url, content_hash, processed, collected_at,
+        incident_type, severity, risk_score, cluster_id, embedding, geo_lat, geo_lon
+    )
+    SELECT
+        (ARRAY['newsapi', 'gdelt', 'rss', 'regional_rss', 'telegram', 'youtube'])[1 + g % 6],
+        'seed incident ' || g,
+        'https://example.org/' || g,
+        md5(g::text),
+        g <= :processed_rows,
+        now() - make_interval(secs => (:rows - g) * 30),
+        (ARRAY['protest', 'violence', 'terrorism', 'cyber', 'other'])[1 + g % 5],
+        (ARRAY['low', 'medium', 'high'])[1 + g % 3],
+        CASE WHEN g <= :processed_rows THEN (g * 7919 % 1000) / 200.0 END,
+        CASE WHEN g <= :clustered_rows THEN g % 5000 END,
+        CASE WHEN g <= :processed_rows THEN '\\x00000000'::bytea END,
+        CASE WHEN g % 50 = 0 THEN 20.0 END,
+        CASE WHEN g % 50 = 0 THEN 78.0 END
+    FROM generate_series(1, :rows) AS g
+"""
+
+
+def seed(conn, rows):
+    conn.execute(text(SEED_SQL), {
+        "rows": rows,
+        "processed_rows": rows - 500,
+        "clustered_rows": rows - 1500
+    })
+    conn.execute(text("VACUUM ANALYZE raw_osint"))
+
+
+def run_hot_paths(captured):
+    """
+    Call the real query code; SELECTs on raw_osint land in `captured`.
+    """
+
+    from backend.routes.incidents import get_all_incidents, map_data, encode_cursor
+    from backend.routes.intelligence import top_threats, cluster_details
+    from ai_engine.pipeline import claim_chunk
+
+    def label(name, call):
+        start = len(captured)
+        call()
+        for item in captured[start:]:
+            item["name"] = name
+
+    pages = []
+
+    label("incidents first page", lambda: pages.append(get_all_incidents(limit=30)))
+    cursor = encode_cursor(pages[0][-1]["collected_at"], pages[0][-1]["id"])
+
+    label("incidents next page", lambda: get_all_incidents(limit=30, cursor=cursor))
+    label("incidents by source", lambda: get_all_incidents(source="rss", limit=30))
+    label("top threats", lambda: top_threats(limit=10))
+    label("cluster details", lambda: cluster_details(42))
+    label("map", map_data)
+
+    db = SessionLocal()
+    try:
+        label("pipeline claim", lambda: claim_chunk(db, 0, 200))
+    finally:
+        db.rollback()
+        db.close()
+
+
+def seq_scans(plan):
+    """
+    Relation names read with a Seq Scan anywhere in the plan tree.
+    """
+
+    found = []
+
+    if plan.get("Node Type") == "Seq Scan":
+        found.append(plan.get("Relation Name"))
+
+    for child in plan.get("Plans", []):
+        found.extend(seq_scans(child))
+
+    return found
+
+
+def explain(conn, statement, parameters=None):
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+        result = cursor.fetchone()[0]
+    finally:
+        cursor.close()
+
+    if isinstance(result, str):
+        result = json.loads(result)
+
+    return result[0]["Plan"]
+
+
+def main(rows=SEED_ROWS):
+
+    if engine.dialect.name != "postgresql":
+        print("explain_check needs a Postgres DATABASE_URL")
+        return 2
+
+    captured = []
+
+    def set_search_path(dbapi_conn, _):
+        cursor = dbapi_conn.cursor()
+        cursor.execute(f"SET search_path TO {SCHEMA}")
+        cursor.close()
+        dbapi_conn.commit()
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "raw_osint" in statement:
+            captured.append({"name": None, "sql": statement, "params": parameters})
+
+    engine.dispose()
+    event.listen(engine, "connect", set_search_path)
+
+    failures = []
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+
+        try:
+            # Pooled connections are all opened after the listener, so
+            # create_all, seeding and the routes all land in SCHEMA
+            conn.execute(text(f"SET search_path TO {SCHEMA}"))
+            Base.metadata.create_all(conn)
+
+            print(f"seeding {rows} rows into {SCHEMA}.raw_osint ...")
+            seed(conn, rows)
+
+            event.listen(engine, "before_cursor_execute", capture)
+            try:
+                run_hot_paths(captured)
+            finally:
+                event.remove(engine, "before_cursor_execute", capture)
+
+            checks = [(c["name"], c["sql"], c["params"]) for c in captured]
+            checks += [(name, sql, None) for name, sql in EXTRA_QUERIES.items()]
+
+            for name, sql, params in checks:
+                plan = explain(conn, sql, params)
+                scans = [r for r in seq_scans(plan) if r == "raw_osint"]
+
+                status = "SEQ SCAN" if scans else "ok"
+                print(f"{name:<24} {plan['Node Type']:<18} cost={plan['Total Cost']:<10} {status}")
+
+                if scans:
+                    failures.append(name)
+
+        finally:
+            engine.dispose()
+            conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+
+    for name in failures:
+        print("FAIL: sequential scan on raw_osint in", name)
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else SEED_ROWS))
@@ -0,0 +1,60 @@
+# benchmarks/import_budget.py
+#
+# Fails (exit 1) if `import backend.main` takes longer than the budget
+# or loads any ML model / framework. Runs the import in a fresh
+# interpreter so nothing is already cached.
+#
+#   python -m benchmarks.import_budget [budget_seconds]
+
+import json
+import subprocess
+import sys
+
+
+IMPORT_BUDGET_SECONDS = 3.0
+
+FORBIDDEN_MODULES = ["spacy", "sentence_transformers", "torch", "transformers"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import backend.main
+elapsed = time.perf_counter() - start
+from ai_engine.model_registry import LOADERS, is_loaded
+print(json.dumps({
+    "seconds": elapsed,
+    "modules": [m for m in %r if m in sys.modules],
+    "models": [name for name in LOADERS if is_loaded(name)]
+}))
+""" % (FORBIDDEN_MODULES,)
+
+
+def main(budget=IMPORT_BUDGET_SECONDS):
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout
+
+    result = json.loads(output.strip().splitlines()[-1])
+
+    print(f"import backend.main: {result['seconds']:.2f} s (budget {budget:.2f} s)")
+
+    failures = []
+
+    if result["seconds"] > budget:
+        failures.append("over import-time budget")
+    if result["modules"]:
+        failures.append(f"ML modules imported: {', '.join(result['modules'])}")
+    if result["models"]:
+        failures.append(f"models loaded: {', '.join(result['models'])}")
+
+    for failure in failures:
+        print("FAIL:", failure)
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(float(sys.argv[1]) if len(sys.argv) > 1 else IMPORT_BUDGET_SECONDS))
@@ -0,0 +1,457 @@
+# benchmarks/suite.py
+#
+# Reproducible end-to-end benchmark suite.
+#
+# Seeds a throwaway database with the synthetic corpus (benchmarks/
+# synthetic.py) at the chosen scale, then measures insert_records,
+# process_unprocessed_records, cluster_records, similar_incidents and
+# every /intelligence/* endpoint. Results are written as JSON tagged with
+# the commit, database and scale so two runs can be compared:
+#
+#   python -m benchmarks.suite --scale 10k                   # SQLite stand-in
+#   DATABASE_URL=postgresql://... python -m benchmarks.suite --scale 100k
+#   python -m benchmarks.suite --compare base.json head.json # exit 1 on regression
+#
+# On Postgres everything runs in a temporary schema that is dropped
+# afterwards; model, index and cache files go to a temporary directory.
+# On SQLite, endpoints built on Postgres-only SQL record their HTTP error
+# instead of a timing, and the enrichment benchmark is skipped when the
+# NLP models are not installed.
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+_STATE_DIR = tempfile.mkdtemp(prefix="osnit_bench_")
+
+# Before anything imports the modules that read these
+for _var, _name in [
+    ("CLUSTER_STATE_PATH", "clusters.npz"),
+    ("VECTOR_INDEX_PATH", "vectors.npz"),
+    ("NEAR_DUP_INDEX_PATH", "near_dup.npz"),
+    ("GEOCODE_CACHE_PATH", "geocode.sqlite"),
+    ("HTTP_CACHE_PATH", "http_cache.json"),
+]:
+    os.environ[_var] = os.path.join(_STATE_DIR, _name)
+
+if not os.getenv("DATABASE_URL"):
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(_STATE_DIR, "bench.db")
+
+import numpy as np
+from sqlalchemy import event, text
+
+from database import Base, SessionLocal, engine
+import models  # noqa: F401
+
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+SCHEMA = f"bench_suite_{os.getpid()}"
+
+INSERT_ROWS = 20_000
+PIPELINE_ROWS = 1000
+CLUSTER_ROWS = 50_000
+SIMILAR_QUERIES = 200
+ENDPOINT_REPEAT = 20
+WARMUP = 2
+
+# Relative change counted as a regression by --compare
+TOLERANCE = 0.20
+
+
+# -----------------------------------------------------
+# HELPERS
+# -----------------------------------------------------
+
+def git_commit():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+
+        dirty = bool(subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip())
+
+        return commit, dirty
+
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+
+
+def latency_stats(seconds):
+    ms = np.array(seconds) * 1000
+
+    return {
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "mean_ms": round(float(ms.mean()), 3)
+    }
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - started
+
+
+# -----------------------------------------------------
+# BENCHMARKS
+# -----------------------------------------------------
+
+def bench_insert_records(n, seed):
+    from benchmarks.synthetic import iter_raw_records
+    from ingestion.utils import insert_records
+
+    records = list(iter_raw_records(n, seed=seed + 1))
+
+    inserted, fresh_seconds = timed(lambda: insert_records(records))
+    _, repeat_seconds = timed(lambda: insert_records(records))
+
+    return {
+        "records": n,
+        "inserted": inserted,
+        "rows_per_sec": round(n / fresh_seconds, 1),
+        "all_duplicates_rows_per_sec": round(n / repeat_seconds, 1)
+    }
+
+
+def bench_process_unprocessed_records(limit):
+    try:
+        from ai_engine.model_registry import preload
+        preload()
+    except Exception as e:
+        return {"skipped": f"models unavailable: {e}"}
+
+    from ai_engine.pipeline import process_unprocessed_records, PIPELINE_CHUNK_SIZE
+
+    processed, seconds = timed(lambda: process_unprocessed_records(
+        max_chunks=math.ceil(limit / PIPELINE_CHUNK_SIZE)
+    ))
+
+    return {
+        "processed": processed,
+        "rows_per_sec": round(processed / seconds, 1) if processed else 0.0
+    }
+
+
+def bench_cluster_records(n, seed):
+    from types import SimpleNamespace
+
+    from ai_engine.clustering import cluster_records, get_clusterer
+    from ai_engine.embedding import encode_embedding
+    from benchmarks.synthetic import topic_centroids, EMBEDDING_NOISE, N_TOPICS
+
+    rng = np.random.default_rng(seed + 2)
+    centroids = topic_centroids(seed)
+
+    vectors = centroids[rng.integers(0, N_TOPICS, n)] + EMBEDDING_NOISE * rng.standard_normal(
+        (n, centroids.shape[1])
+    ).astype(np.float32)
+
+    records = [SimpleNamespace(embedding=encode_embedding(v), cluster_id=None) for v in vectors]
+
+    _, seconds = timed(lambda: cluster_records(records))
+
+    return {
+        "records": n,
+        "clusters": len(get_clusterer()),
+        "records_per_sec": round(n / seconds, 1)
+    }
+
+
+def _embedded_ids(sample, seed):
+    with engine.connect() as conn:
+        low, high = conn.execute(text(
+            "SELECT min(id), max(id) FROM raw_osint WHERE embedding IS NOT NULL"
+        )).one()
+
+    rng = random.Random(seed)
+    return [rng.randint(low, high) for _ in range(sample)]
+
+
+def bench_similar_incidents(client, queries, seed):
+    from ai_engine.vector_index import get_vector_index
+
+    ids = _embedded_ids(queries + 1, seed)
+
+    # Requests only trigger a background refresh: time the initial
+    # load from the database on its own, then query a current index
+    db = SessionLocal()
+    try:
+        _, cold = timed(lambda: get_vector_index().refresh(db))
+    finally:
+        db.close()
+
+    response = client.get(f"/intelligence/incident/{ids[0]}/similar")
+
+    latencies = []
+    for incident_id in ids[1:]:
+        _, seconds = timed(lambda: client.get(f"/intelligence/incident/{incident_id}/similar"))
+        latencies.append(seconds)
+
+    return {
+        "status": response.status_code,
+        "cold_ms": round(cold * 1000, 3),
+        **latency_stats(latencies)
+    }
+
+
+def bench_endpoints(client, repeat, seed):
+    from backend.routes.intelligence import router
+
+    incident_id = _embedded_ids(1, seed)[0]
+    params = {"cluster_id": 1, "incident_id": incident_id}
+
+    results = {}
+
+    for route in router.routes:
+        path = route.path
+
+        if "GET" not in route.methods:
+            continue
+
+        # Measured on its own (cold index + more queries)
+        if path.endswith("/similar"):
+            continue
+
+        url = path.format(**params)
+
+        for _ in range(WARMUP):
+            response = client.get(url)
+
+        if response.status_code >= 400:
+            results[path] = {"status": response.status_code, "error": response.text[:200]}
+            continue
+
+        latencies = [timed(lambda: client.get(url))[1] for _ in range(repeat)]
+        results[path] = {"status": response.status_code, **latency_stats(latencies)}
+
+    return results
+
+
+# -----------------------------------------------------
+# RUN
+# -----------------------------------------------------
+
+def _use_schema():
+    """
+    Point every new pooled connection at a fresh schema (Postgres).
+    """
+
+    def set_search_path(dbapi_conn, _):
+        cursor = dbapi_conn.cursor()
+        cursor.execute(f"SET search_path TO {SCHEMA}")
+        cursor.close()
+        dbapi_conn.commit()
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+
+    engine.dispose()
+    event.listen(engine, "connect", set_search_path)
+
+
+def _drop_schema():
+    engine.dispose()
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+
+
+def run_suite(scale, seed, only=None, insert_rows=INSERT_ROWS, queries=SIMILAR_QUERIES,
+              repeat=ENDPOINT_REPEAT):
+    from benchmarks.synthetic import SCALES, seed_database
+
+    rows = SCALES[scale]
+    dialect = engine.dialect.name
+
+    def wanted(name):
+        return only is None or name in only
+
+    commit, dirty = git_commit()
+
+    report = {
+        "suite": "osnit",
+        "format": 1,
+        "commit": commit,
+        "dirty": dirty,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "database": dialect,
+        "scale": scale,
+        "rows": rows,
+        "seed": seed,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "results": {}
+    }
+
+    results = report["results"]
+
+    if dialect == "postgresql":
+        _use_schema()
+
+    try:
+        Base.metadata.create_all(engine)
+
+        print(f"seeding {rows} rows ({dialect}) ...")
+        results["seed"] = {"rows_per_sec": round(seed_database(rows, seed=seed), 1)}
+
+        if dialect == "postgresql":
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                conn.execute(text("VACUUM ANALYZE raw_osint"))
+
+        # Read-side benchmarks first, on the freshly seeded table
+        if wanted("similar_incidents") or wanted("endpoints"):
+            from fastapi.testclient import TestClient
+            from backend.main import app
+
+            client = TestClient(app, raise_server_exceptions=False)
+
+            if wanted("similar_incidents"):
+                print("similar_incidents ...")
+                results["similar_incidents"] = bench_similar_incidents(client, queries, seed)
+
+            if wanted("endpoints"):
+                print("/intelligence endpoints ...")
+                results["endpoints"] = bench_endpoints(client, repeat, seed)
+
+        if wanted("cluster_records"):
+            print("cluster_records ...")
+            results["cluster_records"] = bench_cluster_records(min(rows, CLUSTER_ROWS), seed)
+
+        if wanted("insert_records"):
+            print("insert_records ...")
+            results["insert_records"] = bench_insert_records(min(rows, insert_rows), seed)
+
+        if wanted("process_unprocessed_records"):
+            print("process_unprocessed_records ...")
+            results["process_unprocessed_records"] = bench_process_unprocessed_records(PIPELINE_ROWS)
+
+    finally:
+        if dialect == "postgresql":
+            _drop_schema()
+
+    return report
+
+
+# -----------------------------------------------------
+# COMPARE
+# -----------------------------------------------------
+
+def flatten(results, prefix=""):
+    flat = {}
+
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+
+    return flat
+
+
+def _direction(metric):
+    # +1: higher is better, -1: lower is better, 0: informational
+    if metric.endswith("_per_sec"):
+        return 1
+    if metric.endswith("_ms"):
+        return -1
+    return 0
+
+
+def compare(base, head, tolerance=TOLERANCE):
+    """
+    Print every timed metric present in both reports. Returns the
+    metrics that got worse by more than `tolerance`.
+    """
+
+    for key in ("database", "scale"):
+        if base.get(key) != head.get(key):
+            print(f"warning: {key} differs ({base.get(key)} vs {head.get(key)})")
+
+    old, new = flatten(base["results"]), flatten(head["results"])
+    regressions = []
+
+    print(f"{'metric':<58} {base['commit']:>12} {head['commit']:>12} {'change':>9}")
+
+    for metric in sorted(set(old) & set(new)):
+        direction = _direction(metric)
+
+        if not direction or not old[metric]:
+            continue
+
+        change = (new[metric] - old[metric]) / old[metric]
+        worse = -change * direction > tolerance
+
+        if worse:
+            regressions.append(metric)
+
+        print(f"{metric:<58} {old[metric]:>12.1f} {new[metric]:>12.1f} {change:>+8.1%}"
+              f"{'  REGRESSION' if worse else ''}")
+
+    return regressions
+
+
+def main():
+    from benchmarks.synthetic import SCALES, SEED
+
+    parser = argparse.ArgumentParser(description="OSNIT benchmark suite")
+    parser.add_argument("--scale", choices=SCALES, default="10k")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--only", default=None,
+                        help="comma separated: insert_records, process_unprocessed_records, "
+                             "cluster_records, similar_incidents, endpoints")
+    parser.add_argument("--insert-rows", type=int, default=INSERT_ROWS)
+    parser.add_argument("--queries", type=int, default=SIMILAR_QUERIES)
+    parser.add_argument("--repeat", type=int, default=ENDPOINT_REPEAT)
+    parser.add_argument("--output", default=None, help="results file (default: benchmarks/results/)")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "HEAD"),
+                        help="compare two results files instead of running")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args()
+
+    if args.compare:
+        reports = []
+        for path in args.compare:
+            with open(path, "r", encoding="utf-8") as f:
+                reports.append(json.load(f))
+
+        regressions = compare(*reports, tolerance=args.tolerance)
+        print(f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+        return 1 if regressions else 0
+
+    only = set(args.only.split(",")) if args.only else None
+
+    report = run_suite(args.scale, args.seed, only, args.insert_rows, args.queries, args.repeat)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR,
+        f"{report['commit']}{'-dirty' if report['dirty'] else ''}-{report['database']}-{report['scale']}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print(json.dumps(report["results"], indent=2))
+    print(f"results written to {output}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,320 @@
+# benchmarks/synthetic.py
+#
+# Deterministic synthetic raw_osint data for the benchmark suite.
+#
+# Two shapes:
+#   - iter_raw_records(): collector-style dicts for insert_records
+#     (news headlines, Telegram posts, YouTube titles; cross-posted
+#     paraphrases and exact repeats included, as real feeds have them)
+#   - iter_row_chunks(): fully enriched raw_osint rows (locations,
+#     coordinates, incident type, risk, clusters and 384-d embeddings
+#     drawn around a fixed set of story topics) for seeding a database
+#
+# The same seed always yields the same data, so runs on different
+# commits measure the same workload.
+#
+#   python -m benchmarks.synthetic --scale 100k     # seed DATABASE_URL
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from ai_engine.classifier import classify_incident
+from ai_engine.embedding import encode_embedding
+from ai_engine.preprocess import clean_text
+from ai_engine.risk_engine import calculate_severity, calculate_risk_score
+from ai_engine.summarizer import generate_summary
+from ai_engine.vector_index import EMBEDDING_DIM
+from benchmarks.corpus import PLACES, make_headline, make_story, paraphrase
+from ingestion.utils import generate_hash
+
+
+SCALES = {
+    "10k": 10_000,
+    "100k": 100_000,
+    "1m": 1_000_000
+}
+
+SEED = 42
+
+SEED_CHUNK_SIZE = 5000
+
+# Distinct stories the embeddings are drawn around
+N_TOPICS = 2000
+
+# Per-dimension noise around a topic (cosine to its centroid ~0.9)
+EMBEDDING_NOISE = 0.025
+
+# Share of seeded rows already enriched / clustered; the rest are the
+# backlog the pipeline and clustering benchmarks work on
+PROCESSED_SHARE = 0.98
+CLUSTERED_SHARE = 0.95
+
+# Seeded rows span this much history
+HISTORY = timedelta(days=30)
+
+# (latitude, longitude, country, state)
+PLACE_INFO = {
+    "Kashmir": (34.08, 74.80, "India", "Jammu and Kashmir"),
+    "Jammu": (32.73, 74.86, "India", "Jammu and Kashmir"),
+    "Ladakh": (34.15, 77.58, "India", "Ladakh"),
+    "Punjab": (31.15, 75.34, "India", "Punjab"),
+    "Rajasthan": (27.02, 74.22, "India", "Rajasthan"),
+    "Gujarat": (22.26, 71.19, "India", "Gujarat"),
+    "Assam": (26.20, 92.94, "India", "Assam"),
+    "Manipur": (24.66, 93.91, "India", "Manipur"),
+    "Arunachal Pradesh": (28.22, 94.73, "India", "Arunachal Pradesh"),
+    "New Delhi": (28.61, 77.21, "India", "Delhi"),
+    "Lahore": (31.55, 74.34, "Pakistan", None),
+    "Islamabad": (33.68, 73.05, "Pakistan", None),
+    "Dhaka": (23.81, 90.41, "Bangladesh", None),
+    "Kathmandu": (27.72, 85.32, "Nepal", None),
+    "Colombo": (6.93, 79.86, "Sri Lanka", None),
+    "Beijing": (39.90, 116.40, "China", None)
+}
+
+TELEGRAM_CHANNELS = ["DawnNews", "ARYNEWSOFFICIAL", "IndiaToday", "timesofindia", "WIONews"]
+
+# (source, share of records)
+SOURCE_MIX = [
+    ("newsapi", 0.25),
+    ("gdelt", 0.15),
+    ("regional_rss", 0.15),
+    ("rss", 0.10),
+    ("telegram", 0.30),
+    ("youtube", 0.05)
+]
+
+HASHTAGS = ["#Breaking", "#India", "#Kashmir", "#Security", "#BorderNews", "#Defence", "#Alert"]
+
+# Collector feeds repeat themselves: share of records that are an exact
+# repeat / a cross-posted paraphrase of an earlier one
+REPEAT_SHARE = 0.10
+PARAPHRASE_SHARE = 0.15
+
+
+# -----------------------------------------------------
+# TEXT
+# -----------------------------------------------------
+
+def make_telegram_post(rng):
+    post = make_story(rng)
+
+    if rng.random() < 0.4:
+        post = "🔴 " + post
+
+    tags = " ".join(rng.sample(HASHTAGS, rng.randint(1, 3)))
+    return f"{post}\n\n{tags}\nFollow @{rng.choice(TELEGRAM_CHANNELS)}"
+
+
+def _pick_source(rng):
+    roll = rng.random()
+
+    for source, share in SOURCE_MIX:
+        roll -= share
+        if roll < 0:
+            return source
+
+    return SOURCE_MIX[-1][0]
+
+
+def _place_in(text):
+    return next((place for place in PLACES if place in text), None)
+
+
+def make_raw_record(rng, i):
+    source = _pick_source(rng)
+
+    if source == "telegram":
+        channel = rng.choice(TELEGRAM_CHANNELS)
+        content = make_telegram_post(rng)
+        return {
+            "source": f"telegram_{channel}",
+            "content": content,
+            "url": f"https://t.me/{channel}/{i}",
+            "country": "external",
+            "metadata": {"channel": channel, "message_id": i}
+        }
+
+    # Titles only for the API sources, title + detail for the feeds
+    content = make_headline(rng) if source in ("gdelt", "youtube", "regional_rss") else make_story(rng)
+    place = _place_in(content)
+
+    return {
+        "source": source,
+        "content": content,
+        "url": f"https://example.org/{source}/{i}",
+        "country": PLACE_INFO[place][2] if place else None,
+        "metadata": {"synthetic": True, "seq": i}
+    }
+
+
+def iter_raw_records(n, seed=SEED):
+    """
+    n collector-style records, including exact repeats and cross-posted
+    paraphrases of recent records.
+    """
+
+    rng = random.Random(seed)
+    recent = []
+
+    for i in range(n):
+        roll = rng.random()
+
+        if recent and roll < REPEAT_SHARE:
+            yield dict(rng.choice(recent))
+            continue
+
+        if recent and roll < REPEAT_SHARE + PARAPHRASE_SHARE:
+            original = rng.choice(recent)
+            yield {**original, "content": paraphrase(original["content"], rng), "url": f"{original['url']}#{i}"}
+            continue
+
+        record = make_raw_record(rng, i)
+
+        recent.append(record)
+        if len(recent) > 500:
+            recent.pop(0)
+
+        yield record
+
+
+# -----------------------------------------------------
+# ENRICHED ROWS
+# -----------------------------------------------------
+
+# Every row carries every key (None until enriched): one executemany per chunk
+ENRICHED_COLUMNS = [
+    "country", "state", "geo_lat", "geo_lon", "keyword_vector", "incident_type",
+    "severity", "risk_score", "confidence", "summary", "embedding", "cluster_id"
+]
+
+
+def topic_centroids(seed=SEED):
+    rng = np.random.default_rng(seed)
+
+    centroids = rng.standard_normal((N_TOPICS, EMBEDDING_DIM)).astype(np.float32)
+    centroids /= np.linalg.norm(centroids, axis=1, keepdims=True)
+
+    return centroids
+
+
+def iter_row_chunks(n, seed=SEED, chunk_size=SEED_CHUNK_SIZE, now=None):
+    """
+    Lists of raw_osint row dicts, oldest first. The last
+    (1 - PROCESSED_SHARE) of the rows are left unprocessed, and clusters
+    are only assigned up to CLUSTERED_SHARE.
+    """
+
+    rng = random.Random(seed)
+    np_rng = np.random.default_rng(seed + 1)
+    centroids = topic_centroids(seed)
+
+    now = now or datetime.now().replace(microsecond=0)
+    start = now - HISTORY
+    step = HISTORY / max(n, 1)
+
+    processed_until = int(n * PROCESSED_SHARE)
+    clustered_until = int(n * CLUSTERED_SHARE)
+
+    for offset in range(0, n, chunk_size):
+        size = min(chunk_size, n - offset)
+
+        topics = np_rng.integers(0, N_TOPICS, size)
+        vectors = centroids[topics] + EMBEDDING_NOISE * np_rng.standard_normal(
+            (size, EMBEDDING_DIM)
+        ).astype(np.float32)
+
+        rows = []
+
+        for j in range(size):
+            i = offset + j
+            record = make_raw_record(rng, i)
+            content = record["content"]
+
+            row = {
+                "source": record["source"],
+                "content": content,
+                "url": record["url"],
+                # Unique per row: the seeded table is not a dedup test
+                "content_hash": generate_hash(f"{seed}:{i}:{content}"),
+                "extra_metadata": record["metadata"],
+                "collected_at": start + step * i,
+                "processed": i < processed_until,
+                **dict.fromkeys(ENRICHED_COLUMNS)
+            }
+
+            if row["processed"]:
+                place = _place_in(content)
+                lat, lon, country, state = PLACE_INFO.get(place, (None, None, None, None))
+
+                incident_type = classify_incident(clean_text(content))
+                severity_level = calculate_severity(incident_type)
+                risk_score = calculate_risk_score(severity_level, 1 if place else 0)
+
+                row.update({
+                    "country": country,
+                    "state": state,
+                    "geo_lat": lat + rng.uniform(-0.3, 0.3) if lat is not None else None,
+                    "geo_lon": lon + rng.uniform(-0.3, 0.3) if lon is not None else None,
+                    "keyword_vector": {"locations": [place] if place else [], "organizations": [], "persons": []},
+                    "incident_type": incident_type,
+                    "severity": ["low", "medium", "high"][severity_level - 1],
+                    "risk_score": risk_score,
+                    "confidence": round(0.6 + risk_score * 0.3, 2),
+                    "summary": generate_summary(incident_type, state, country),
+                    "embedding": encode_embedding(vectors[j]),
+                    "cluster_id": int(topics[j]) + 1 if i < clustered_until else None
+                })
+
+            rows.append(row)
+
+        yield rows
+
+
+def seed_database(n, seed=SEED, chunk_size=SEED_CHUNK_SIZE):
+    """
+    Insert n enriched rows (and their rollups) into the current
+    DATABASE_URL. Returns rows/sec.
+    """
+
+    from sqlalchemy import insert
+
+    from database import SessionLocal
+    from models import RawOSINT
+    from ai_engine.rollups import update_incident_rollups, update_cluster_rollups
+
+    started = time.perf_counter()
+    db = SessionLocal()
+
+    try:
+        for rows in iter_row_chunks(n, seed, chunk_size):
+            db.execute(insert(RawOSINT), rows)
+
+            processed = [row for row in rows if row["processed"]]
+            update_incident_rollups(db, processed)
+            update_cluster_rollups(db, [row["cluster_id"] for row in processed])
+
+            db.commit()
+
+    finally:
+        db.close()
+
+    return n / (time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed synthetic raw_osint rows")
+    parser.add_argument("--scale", choices=SCALES, default="10k")
+    parser.add_argument("--seed", type=int, default=SEED)
+    args = parser.parse_args()
+
+    from database import Base, engine
+
+    Base.metadata.create_all(engine)
+
+    rate = seed_database(SCALES[args.scale], seed=args.seed)
+    print(f"seeded {SCALES[args.scale]} rows at {rate:,.0f} rows/sec")
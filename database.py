@@ -9,7 +9,8 @@ Base = declarative_base()
 load_dotenv()
 
 # Build database URL from environment variables
-DATABASE_URL = (
+# (DATABASE_URL overrides, e.g. a SQLite file for local benchmarks)
+DATABASE_URL = os.getenv("DATABASE_URL") or (
     f"postgresql://{os.getenv('DB_USER')}:"
     f"{os.getenv('DB_PASSWORD')}@"
     f"{os.getenv('DB_HOST')}:"
@@ -0,0 +1,54 @@
+# ingestion/checkpoints.py
+#
+# Collector state that may only be persisted once the records it covers
+# are stored: Telegram read offsets, HTTP ETag / Last-Modified validators.
+# Saved any earlier, a failed insert would lose those records for good:
+# the next cycle would start past them, or get a 304 for the feed.
+#
+# The runner and the streaming pipeline run each collector inside
+# deferring(); whatever the collector hands to defer() on that thread is
+# kept in the yielded list, and the caller runs commit() on it after the
+# source's records are inserted. A collector run on its own (outside
+# deferring()) persists straight away.
+
+import logging
+import threading
+from contextlib import contextmanager
+
+
+_local = threading.local()
+
+
+def defer(action):
+    pending = getattr(_local, "pending", None)
+
+    if pending is None:
+        action()
+    else:
+        pending.append(action)
+
+
+@contextmanager
+def deferring():
+    """
+    Collect this thread's defer()red actions into the yielded list.
+    """
+
+    previous = getattr(_local, "pending", None)
+    pending = _local.pending = []
+
+    try:
+        yield pending
+    finally:
+        _local.pending = previous
+
+
+def commit(pending):
+    for action in pending:
+        try:
+            action()
+        except Exception as e:
+            # Not fatal: the records are stored, the next cycle re-reads them
+            logging.error(f"Checkpoint commit failed: {e}")
+
+    pending.clear()
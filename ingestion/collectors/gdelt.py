@@ -1,11 +1,11 @@
 # ingestion/collectors/gdelt.py
 
-import requests
+import json
 import urllib.parse
 
-def collect_gdelt():
-    records = []
+from ingestion.fetcher import defer_validators, fetch
 
+def iter_gdelt():
     query = "India"
     encoded_query = urllib.parse.quote(query)
 
@@ -18,20 +18,26 @@ def collect_gdelt():
     )
 
     try:
-        response = requests.get(url, timeout=30)
+        response = fetch(url, timeout=30)
+
+        if response.not_modified:
+            return
+
+        if response.error:
+            raise RuntimeError(response.error)
 
-        if response.status_code != 200:
-            print("GDELT HTTP error:", response.status_code)
-            return []
+        if response.status != 200:
+            print("GDELT HTTP error:", response.status)
+            return
 
-        data = response.json()
+        data = json.loads(response.content)
 
     except Exception as e:
         print("GDELT failed:", str(e))
-        return []
+        return
 
     for article in data.get("articles", []):
-        records.append({
+        yield {
             "source": "gdelt",
             "content": article.get("title"),
             "url": article.get("url"),
@@ -41,6 +47,11 @@ def collect_gdelt():
                 "language": article.get("language"),
                 "tone": article.get("tone")
             }
-        })
+        }
 
-    return records
+    # Every article was handed out: the response may be skipped next time
+    defer_validators(response)
+
+
+def collect_gdelt():
+    return list(iter_gdelt())
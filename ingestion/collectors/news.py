@@ -1,7 +1,9 @@
-import requests
+import json
 import os
 from dotenv import load_dotenv
 
+from ingestion.fetcher import defer_validators, fetch
+
 load_dotenv()
 
 
@@ -13,8 +15,10 @@ INDIA_KEYWORDS = (
 )
 
 
-def collect_news():
-    records = []
+def iter_news():
+    """
+    Yields records one article at a time (see ingestion/streaming.py).
+    """
 
     url = "https://newsapi.org/v2/everything"
 
@@ -27,20 +31,26 @@ def collect_news():
     }
 
     try:
-        response = requests.get(url, params=params, timeout=15)
+        response = fetch(url, params=params, timeout=15)
+
+        if response.not_modified:
+            return
+
+        if response.error:
+            raise RuntimeError(response.error)
 
-        if response.status_code != 200:
-            print("NewsAPI error:", response.text)
-            return []
+        if response.status != 200:
+            print("NewsAPI error:", response.content)
+            return
 
-        data = response.json()
+        data = json.loads(response.content)
 
     except Exception as e:
         print("NewsAPI failed:", e)
-        return []
+        return
 
     for article in data.get("articles", []):
-        records.append({
+        yield {
             "source": "newsapi",
             "content": article.get("title"),
             "url": article.get("url"),
@@ -50,6 +60,11 @@ def collect_news():
                 "published_at": article.get("publishedAt"),
                 "source_name": article.get("source", {}).get("name")
             }
-        })
+        }
 
-    return records
+    # Every article was handed out: the response may be skipped next time
+    defer_validators(response)
+
+
+def collect_news():
+    return list(iter_news())
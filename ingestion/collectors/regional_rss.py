@@ -1,6 +1,8 @@
 
 import feedparser
-import requests
+
+from ai_engine.keyword_matcher import KeywordMatcher
+from ingestion.fetcher import defer_validators, fetch_many
 
 REGIONAL_SOURCES = {
     "Pakistan": [
@@ -28,37 +30,55 @@ KEYWORDS = [
     "army"
 ]
 
+_keyword_matcher = KeywordMatcher(KEYWORDS, prefix=True)
 
-def collect_regional_rss():
 
-    records = []
+def iter_regional_rss():
+    """
+    Yields matching entries feed by feed; each parsed feed is dropped
+    before the next one is parsed.
+    """
+
+    feeds = [
+        (country, feed_url)
+        for country, urls in REGIONAL_SOURCES.items()
+        for feed_url in urls
+    ]
+
+    results = fetch_many([feed_url for _, feed_url in feeds], timeout=8)
+
+    for (country, feed_url), result in zip(feeds, results):
 
-    for country, feeds in REGIONAL_SOURCES.items():
+        # 304 Not Modified: nothing new, skip parsing entirely
+        if result.not_modified or result.status != 200:
+            continue
 
-        for feed_url in feeds:
+        try:
+            feed = feedparser.parse(result.content)
 
-            try:
-                response = requests.get(feed_url, timeout=8)
-                feed = feedparser.parse(response.content)
+        except Exception:
+            continue
 
-            except Exception:
-                continue
+        for entry in feed.entries[:15]:
 
-            for entry in feed.entries[:15]:
+            title = entry.get("title", "")
 
-                title = entry.get("title", "")
+            if _keyword_matcher.search(title):
 
-                if any(keyword.lower() in title.lower() for keyword in KEYWORDS):
+                yield {
+                    "source": "regional_rss",
+                    "content": title,
+                    "url": entry.get("link"),
+                    "country": country,
+                    "metadata": {
+                        "feed_url": feed_url,
+                        "published": entry.get("published")
+                    }
+                }
 
-                    records.append({
-                        "source": "regional_rss",
-                        "content": title,
-                        "url": entry.get("link"),
-                        "country": country,
-                        "metadata": {
-                            "feed_url": feed_url,
-                            "published": entry.get("published")
-                        }
-                    })
+        # Every entry was handed out: the feed may be skipped next time
+        defer_validators(result)
 
-    return records
+
+def collect_regional_rss():
+    return list(iter_regional_rss())
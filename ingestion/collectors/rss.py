@@ -1,19 +1,25 @@
 import feedparser
 import logging
-from ingestion.utils import insert_record
+
+from ingestion.fetcher import defer_validators, fetch_many
 
 RSS_FEEDS = [
     "https://feeds.bbci.co.uk/news/world/rss.xml",
     "https://rss.nytimes.com/services/xml/rss/nyt/World.xml"
 ]
 
-def collect_rss():
+def iter_rss():
     logging.info("Starting RSS ingestion...")
 
-    inserted = 0
+    collected = 0
+
+    for feed_url, result in zip(RSS_FEEDS, fetch_many(RSS_FEEDS)):
+
+        # 304 Not Modified: nothing new, skip parsing entirely
+        if result.not_modified or result.status != 200:
+            continue
 
-    for feed_url in RSS_FEEDS:
-        feed = feedparser.parse(feed_url)
+        feed = feedparser.parse(result.content)
 
         for entry in feed.entries:
             content = entry.get("summary") or entry.get("title")
@@ -21,17 +27,23 @@ def collect_rss():
             if not content:
                 continue
 
-            success = insert_record(
-                source="rss",
-                content=content,
-                url=entry.get("link"),
-                metadata={
+            collected += 1
+
+            yield {
+                "source": "rss",
+                "content": content,
+                "url": entry.get("link"),
+                "metadata": {
                     "feed_source": feed.feed.get("title"),
                     "published": entry.get("published")
                 }
-            )
+            }
+
+        # Every entry was handed out: the feed may be skipped next time
+        defer_validators(result)
 
-            if success:
-                inserted += 1
+    logging.info(f"RSS collected: {collected}")
 
-    logging.info(f"RSS inserted: {inserted}")
+
+def collect_rss():
+    return list(iter_rss())
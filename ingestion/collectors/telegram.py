@@ -1,15 +1,46 @@
 # ingestion/collectors/telegram.py
+#
+# Incremental Telegram collector.
+#
+# The highest message id seen per channel is persisted, so each cycle
+# asks only for newer messages (min_id) instead of re-reading the last
+# 50. Channels are fetched concurrently through one long-lived client,
+# which lives on its own event loop thread and is reused across cycles.
+#
+#   python -m ingestion.collectors.telegram --stream
+#
+# keeps a live NewMessage subscription and inserts messages as they
+# arrive, reconnecting with back-off when the connection drops. The
+# stream only moves a channel's offset up through message ids contiguous
+# with it: anything posted while the stream was down sits between the
+# offset and the ids the stream sees, and the interval collector reads
+# it from there (min_id) before the offset passes it.
 
-import os
+import argparse
 import asyncio
-from telethon import TelegramClient
+import concurrent.futures
+import json
+import os
+import threading
+import time
+from functools import partial
+
+from telethon import TelegramClient, events
+from telethon.errors import FloodWaitError
 from dotenv import load_dotenv
 
+from ai_engine.keyword_matcher import KeywordMatcher
+from ingestion.checkpoints import defer
+
 load_dotenv()
 
 API_ID = os.getenv("TELEGRAM_API_ID")
 API_HASH = os.getenv("TELEGRAM_API_HASH")
 
+SESSION_NAME = "osnit_session"
+
+TELEGRAM_OFFSETS_PATH = os.getenv("TELEGRAM_OFFSETS_PATH", ".telegram_offsets.json")
+
 CHANNELS = [
     "DawnNews",        # Pakistan
     "ARYNEWSOFFICIAL",   # Pakistan
@@ -27,34 +58,445 @@ KEYWORDS = [
     "military"
 ]
 
+_keyword_matcher = KeywordMatcher(KEYWORDS, prefix=True)
+
+# First visit to a channel: how far back to read
+INITIAL_LIMIT = 50
+
+# Per channel per cycle; a larger backlog is picked up next cycle
+MAX_MESSAGES_PER_CHANNEL = 500
+
+CHANNEL_CONCURRENCY = 5
+
+# Flood waits up to this long are slept off and retried once; longer
+# ones park the channel until the wait expires
+MAX_FLOOD_WAIT_SECONDS = 30
+
+# Stay inside the runner's telegram deadline (ingestion/runner.py)
+COLLECT_TIMEOUT_SECONDS = 80
+
+# Streaming mode: insert buffered messages this often / at this size
+STREAM_FLUSH_SECONDS = 2
+STREAM_BATCH_SIZE = 50
+
+# Back-off between stream reconnects, doubling up to the maximum
+STREAM_RECONNECT_SECONDS = 5
+STREAM_RECONNECT_MAX_SECONDS = 300
+
+# Stored ids the stream remembers per channel while waiting for the
+# offset to reach them (oldest forgotten first; only costs a re-read)
+STREAM_MAX_PENDING_IDS = 10_000
+
+# Records buffered between the channel readers and iter_telegram()
+CHANNEL_QUEUE_SIZE = 200
+
+
+# -----------------------------------------------------
+# OFFSETS (persisted across runs)
+# -----------------------------------------------------
+
+_offsets_lock = threading.Lock()
+
+
+def load_offsets():
+    try:
+        with open(TELEGRAM_OFFSETS_PATH, "r", encoding="utf-8") as f:
+            return {channel: int(last_id) for channel, last_id in json.load(f).items()}
+    except (OSError, ValueError):
+        return {}
+
+
+def save_offsets(updates):
+    if not updates:
+        return
+
+    # The interval collector and the stream may both write: keep the max
+    with _offsets_lock:
+        offsets = load_offsets()
+
+        for channel, last_id in updates.items():
+            offsets[channel] = max(offsets.get(channel, 0), last_id)
+
+        tmp_path = TELEGRAM_OFFSETS_PATH + ".tmp"
+
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(offsets, f)
+            os.replace(tmp_path, TELEGRAM_OFFSETS_PATH)
+        except OSError as e:
+            print("Telegram offsets write failed:", e)
+
+
+# -----------------------------------------------------
+# LONG-LIVED CLIENT
+# -----------------------------------------------------
+
+_loop = None
+_client = None
+_loop_lock = threading.Lock()
+
+
+def _event_loop():
+    """
+    One background event loop per process; the Telethon client is
+    bound to the loop it was created on, so everything runs here.
+    """
+
+    global _loop
+
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="telegram-loop", daemon=True).start()
+
+    return _loop
+
+
+def _run(coro, timeout=None):
+    future = asyncio.run_coroutine_threadsafe(coro, _event_loop())
+
+    try:
+        return future.result(timeout)
+    except concurrent.futures.TimeoutError:
+        # Do not leave a late cycle running into the next one
+        future.cancel()
+        raise
+
+
+async def _get_client():
+    global _client
+
+    if _client is None:
+        # Flood waits are handled per channel below, not slept off inside Telethon
+        _client = TelegramClient(SESSION_NAME, int(API_ID), API_HASH, flood_sleep_threshold=0)
+
+    if not _client.is_connected():
+        await _client.start()
+
+    return _client
+
+
+# -----------------------------------------------------
+# COLLECTION
+# -----------------------------------------------------
+
+_blocked_until = {}
+
+
+def _to_record(channel, message):
+    return {
+        "source": f"telegram_{channel}",
+        "content": message.text,
+        "url": f"https://t.me/{channel}/{message.id}",
+        "country": "external",
+        "metadata": {
+            "channel": channel,
+            "message_id": message.id,
+            "date": str(message.date)
+        }
+    }
+
+
+async def _fetch_channel(client, channel, offset, semaphore, emit):
+    """
+    Awaits emit(record) for each matching message newer than `offset`,
+    oldest first. Returns the highest message id seen.
+    """
+
+    if time.monotonic() < _blocked_until.get(channel, 0):
+        return offset
+
+    if offset:
+        kwargs = {"min_id": offset, "reverse": True, "limit": MAX_MESSAGES_PER_CHANNEL}
+    else:
+        kwargs = {"limit": INITIAL_LIMIT}
+
+    async with semaphore:
+        for attempt in range(2):
+            last_id = offset
+
+            try:
+                async for message in client.iter_messages(channel, **kwargs):
+                    last_id = max(last_id, message.id)
+
+                    if message.text and _keyword_matcher.search(message.text):
+                        await emit(_to_record(channel, message))
+
+                return last_id
+
+            except FloodWaitError as e:
+                # Messages emitted before the wait are re-emitted on retry;
+                # the content hash drops them at insert
+                if attempt or e.seconds > MAX_FLOOD_WAIT_SECONDS:
+                    _blocked_until[channel] = time.monotonic() + e.seconds
+                    print(f"Telegram flood wait on {channel}: skipping for {e.seconds}s")
+                    return offset
+
+                await asyncio.sleep(e.seconds + 1)
+
+            except Exception as e:
+                print("Telegram error:", channel, e)
+                return offset
+
+    return offset
+
+
+class _ChannelDone:
+    def __init__(self, channel, last_id):
+        self.channel = channel
+        self.last_id = last_id
+
+
+async def iter_telegram_async(reached=None):
+    """
+    Async stream of records from every channel. Channels are read
+    concurrently into a bounded queue, so a slow consumer pauses the
+    reads instead of buffering whole channels. Once all of a channel's
+    records have been handed out, its new offset goes into `reached`;
+    the caller saves those (save_offsets) after storing the records.
+    """
+
+    if reached is None:
+        reached = {}
+
+    client = await _get_client()
+    offsets = load_offsets()
+
+    semaphore = asyncio.Semaphore(CHANNEL_CONCURRENCY)
+    queue = asyncio.Queue(maxsize=CHANNEL_QUEUE_SIZE)
+
+    async def produce(channel):
+        offset = offsets.get(channel, 0)
+        last_id = offset
+
+        try:
+            last_id = await _fetch_channel(client, channel, offset, semaphore, queue.put)
+        finally:
+            await queue.put(_ChannelDone(channel, last_id))
+
+    tasks = [asyncio.create_task(produce(channel)) for channel in CHANNELS]
+    remaining = len(tasks)
+
+    try:
+        while remaining:
+            item = await queue.get()
+
+            if isinstance(item, _ChannelDone):
+                remaining -= 1
+                if item.last_id > offsets.get(item.channel, 0):
+                    reached[item.channel] = item.last_id
+                continue
+
+            yield item
+
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
 async def collect_telegram_async():
+    reached = {}
+    records = [record async for record in iter_telegram_async(reached)]
+
+    defer(partial(save_offsets, reached))
+    return records
+
+
+def iter_telegram(timeout=COLLECT_TIMEOUT_SECONDS):
+    """
+    Blocking generator over iter_telegram_async(), driven on the
+    client's event loop one record at a time. The offsets reached are
+    deferred (ingestion/checkpoints.py) until the caller has stored
+    the records.
+    """
+
     if not API_ID or not API_HASH:
         print("Telegram credentials missing")
-        return []
+        return
 
-    records = []
+    reached = {}
+    stream = iter_telegram_async(reached)
+    deadline = time.monotonic() + timeout
 
-    async with TelegramClient("osnit_session", int(API_ID), API_HASH) as client:
-        for channel in CHANNELS:
+    try:
+        while True:
             try:
-                async for message in client.iter_messages(channel, limit=50):
-                    if message.text:
-                        text = message.text.lower()
-                        if any(k.lower() in text for k in KEYWORDS):
-                            records.append({
-                                "source": f"telegram_{channel}",
-                                "content": message.text,
-                                "url": None,
-                                "country": "external",
-                                "metadata": {
-                                    "channel": channel,
-                                    "date": str(message.date)
-                                }
-                            })
-            except Exception as e:
-                print("Telegram error:", e)
+                yield _run(stream.__anext__(), timeout=max(deadline - time.monotonic(), 0))
+            except StopAsyncIteration:
+                return
+
+    finally:
+        try:
+            _run(stream.aclose(), timeout=5)
+        except Exception:
+            pass
+
+        # Channels read to the end, even when the consumer stopped early
+        defer(partial(save_offsets, reached))
 
-    return records
 
 def collect_telegram():
-    return asyncio.run(collect_telegram_async())
+    return list(iter_telegram())
+
+
+# -----------------------------------------------------
+# LIVE STREAM
+# -----------------------------------------------------
+
+_CHANNEL_NAMES = {channel.lower(): channel for channel in CHANNELS}
+
+
+class _StreamOffsets:
+    """
+    Message ids the stream has stored, per channel, and how far each
+    channel's saved offset may move: up to the last id of an unbroken
+    run above it. Ids past a gap wait here until the interval collector
+    has moved the offset up to them.
+    """
+
+    def __init__(self):
+        self.stored = {}
+
+    def advance(self, channel_ids):
+        offsets = load_offsets()
+        updates = {}
+
+        for channel, ids in channel_ids.items():
+            stored = self.stored.setdefault(channel, set())
+            stored.update(ids)
+
+            offset = offsets.get(channel, 0)
+            last_id = offset
+
+            # Never collected: the collector's first read sets the base
+            if offset:
+                while last_id + 1 in stored:
+                    last_id += 1
+
+            stored = {i for i in stored if i > last_id}
+
+            if len(stored) > STREAM_MAX_PENDING_IDS:
+                stored = set(sorted(stored)[-STREAM_MAX_PENDING_IDS:])
+
+            self.stored[channel] = stored
+
+            if last_id > offset:
+                updates[channel] = last_id
+
+        save_offsets(updates)
+
+
+def _ingest_stream_batch(batch, stream_offsets):
+    """
+    batch: every (channel, message) received, text or not, so the ids
+    stay contiguous for _StreamOffsets.
+    """
+
+    from ingestion.utils import insert_records, log_ingestion
+
+    started = time.monotonic()
+
+    records = [_to_record(channel, message) for channel, message in batch if message.text]
+    fetched = len(records)
+    records = [r for r in records if _keyword_matcher.search(r["content"])]
+
+    inserted = insert_records(records)
+
+    channel_ids = {}
+    for channel, message in batch:
+        channel_ids.setdefault(channel, set()).add(message.id)
+
+    # Only once the batch is stored
+    stream_offsets.advance(channel_ids)
+
+    log_ingestion(
+        source="telegram_stream",
+        fetched=fetched,
+        inserted=inserted,
+        status="success",
+        error_message=None,
+        duration=time.monotonic() - started
+    )
+
+
+async def stream_async():
+    loop = asyncio.get_running_loop()
+    stream_offsets = _StreamOffsets()
+
+    buffer = []
+    flush_now = asyncio.Event()
+
+    async def on_message(event):
+        chat = await event.get_chat()
+        username = (getattr(chat, "username", None) or "").lower()
+        channel = _CHANNEL_NAMES.get(username, username or str(event.chat_id))
+
+        buffer.append((channel, event.message))
+        if len(buffer) >= STREAM_BATCH_SIZE:
+            flush_now.set()
+
+    async def flush():
+        if not buffer:
+            return
+
+        batch = buffer[:]
+        del buffer[:]
+
+        # DB work off the event loop so updates keep flowing
+        try:
+            await loop.run_in_executor(None, _ingest_stream_batch, batch, stream_offsets)
+        except Exception as e:
+            # The offsets stay put: the interval collector re-reads the batch
+            print("Telegram stream insert failed:", e)
+
+    subscribed = None
+    delay = STREAM_RECONNECT_SECONDS
+
+    while True:
+        try:
+            client = await _get_client()
+
+            if client is not subscribed:
+                client.add_event_handler(on_message, events.NewMessage(chats=CHANNELS))
+                subscribed = client
+
+            print(f"Streaming {len(CHANNELS)} Telegram channels...")
+            delay = STREAM_RECONNECT_SECONDS
+
+            while client.is_connected():
+                try:
+                    await asyncio.wait_for(flush_now.wait(), timeout=STREAM_FLUSH_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+
+                flush_now.clear()
+                await flush()
+
+        except Exception as e:
+            print("Telegram stream error:", e)
+
+        await flush()
+
+        print(f"Telegram stream disconnected; reconnecting in {delay}s")
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, STREAM_RECONNECT_MAX_SECONDS)
+
+
+def stream_telegram():
+    if not API_ID or not API_HASH:
+        print("Telegram credentials missing")
+        return
+
+    _run(stream_async())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Telegram collector")
+    parser.add_argument("--stream", action="store_true",
+                        help="insert new channel messages as they arrive")
+    args = parser.parse_args()
+
+    if args.stream:
+        stream_telegram()
+    else:
+        print(f"Collected {len(collect_telegram())} Telegram records")
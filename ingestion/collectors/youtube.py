@@ -8,12 +8,10 @@ load_dotenv()
 
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 
-def collect_youtube():
+def iter_youtube():
     if not YOUTUBE_API_KEY:
         print("YOUTUBE_API_KEY missing")
-        return []
-
-    records = []
+        return
 
     try:
         youtube = build("youtube", "v3", developerKey=YOUTUBE_API_KEY)
@@ -29,10 +27,10 @@ def collect_youtube():
 
     except Exception as e:
         print("YouTube error:", e)
-        return []
+        return
 
     for item in response.get("items", []):
-        records.append({
+        yield {
             "source": "youtube",
             "content": item["snippet"]["title"],
             "url": f"https://youtube.com/watch?v={item['id']['videoId']}",
@@ -41,6 +39,8 @@ def collect_youtube():
                 "channel": item["snippet"]["channelTitle"],
                 "published_at": item["snippet"]["publishedAt"]
             }
-        })
+        }
 
-    return records
+
+def collect_youtube():
+    return list(iter_youtube())
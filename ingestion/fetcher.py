@@ -0,0 +1,230 @@
+# ingestion/fetcher.py
+#
+# Shared async HTTP layer for the feed-based collectors.
+# One long-lived pooled aiohttp session on a background event loop, a
+# per-host concurrency cap, gzip, and ETag / Last-Modified validators
+# persisted between runs so unchanged feeds come back as 304 and are
+# skipped entirely. Collectors save a response's validators only once
+# its records are stored (defer_validators).
+
+import asyncio
+import atexit
+import hashlib
+import json
+import os
+import threading
+from collections import namedtuple
+from functools import partial
+
+import aiohttp
+from yarl import URL
+
+from ingestion.checkpoints import defer
+
+
+HTTP_CACHE_PATH = os.getenv("HTTP_CACHE_PATH", ".http_cache.json")
+
+MAX_CONNECTIONS = 32
+PER_HOST_LIMIT = 4
+DEFAULT_TIMEOUT = 15
+
+USER_AGENT = "osnit_shield/1.0"
+
+
+FetchResult = namedtuple(
+    "FetchResult",
+    ["url", "status", "content", "not_modified", "error", "validators"]
+)
+
+
+# -----------------------------------------------------
+# VALIDATOR CACHE (persisted across runs)
+# -----------------------------------------------------
+
+_cache_lock = threading.Lock()
+
+
+def _cache_key(url):
+    # Hash the full URL so API keys in query strings never hit disk
+    return hashlib.sha256(str(url).encode("utf-8")).hexdigest()
+
+
+def _load_cache():
+    try:
+        with open(HTTP_CACHE_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(updates):
+    if not updates:
+        return
+
+    # Collectors run on several threads; merge rather than overwrite
+    with _cache_lock:
+        cache = _load_cache()
+        cache.update(updates)
+
+        tmp_path = HTTP_CACHE_PATH + ".tmp"
+
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(cache, f)
+            os.replace(tmp_path, HTTP_CACHE_PATH)
+        except OSError as e:
+            print("HTTP cache write failed:", e)
+
+
+def defer_validators(result):
+    """
+    Save a result's ETag / Last-Modified once the caller has stored
+    what it parsed from the body (ingestion/checkpoints.py). Saved any
+    earlier, a failed insert would turn the next fetch into a 304 and
+    the records would never be collected again.
+    """
+
+    if result.validators:
+        defer(partial(_save_cache, result.validators))
+
+
+# -----------------------------------------------------
+# ASYNC FETCH
+# -----------------------------------------------------
+
+async def _fetch_one(session, url, cached_validators, timeout):
+
+    key = _cache_key(url)
+    headers = {}
+
+    cached = cached_validators.get(key, {})
+
+    if cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached.get("last_modified"):
+        headers["If-Modified-Since"] = cached["last_modified"]
+
+    try:
+        async with session.get(
+            url,
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as response:
+
+            if response.status == 304:
+                return FetchResult(str(url), 304, None, True, None, None)
+
+            content = await response.read()
+            validators = None
+
+            if response.status == 200:
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
+
+                if etag or last_modified:
+                    validators = {key: {"etag": etag, "last_modified": last_modified}}
+
+            return FetchResult(str(url), response.status, content, False, None, validators)
+
+    except Exception as e:
+        return FetchResult(str(url), None, None, False, str(e) or type(e).__name__, None)
+
+
+def _new_session():
+    connector = aiohttp.TCPConnector(
+        limit=MAX_CONNECTIONS,
+        limit_per_host=PER_HOST_LIMIT
+    )
+
+    return aiohttp.ClientSession(
+        connector=connector,
+        headers={
+            "User-Agent": USER_AGENT,
+            "Accept-Encoding": "gzip, deflate"
+        },
+        auto_decompress=True
+    )
+
+
+async def _fetch_all(session, urls, timeout):
+    cached_validators = _load_cache()
+
+    return await asyncio.gather(*[
+        _fetch_one(session, url, cached_validators, timeout)
+        for url in urls
+    ])
+
+
+async def fetch_many_async(urls, timeout=DEFAULT_TIMEOUT):
+    """
+    Fetch every URL in parallel over one keep-alive pool, for callers
+    already on an event loop. Returns FetchResults in the same order as
+    `urls`; validators are not saved (see defer_validators).
+    """
+
+    async with _new_session() as session:
+        return await _fetch_all(session, urls, timeout)
+
+
+# -----------------------------------------------------
+# SHARED SESSION (background event loop)
+# -----------------------------------------------------
+
+_loop = None
+_session = None
+_loop_lock = threading.Lock()
+
+
+def _event_loop():
+    """
+    One loop per process, so the session and its keep-alive connections
+    outlive a single call and any thread (even one running its own
+    event loop) can fetch through them.
+    """
+
+    global _loop
+
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="fetcher-loop", daemon=True).start()
+
+    return _loop
+
+
+async def _fetch_pooled(urls, timeout):
+    global _session
+
+    if _session is None or _session.closed:
+        _session = _new_session()
+
+    return await _fetch_all(_session, urls, timeout)
+
+
+async def _close_session():
+    if _session is not None and not _session.closed:
+        await _session.close()
+
+
+@atexit.register
+def _shutdown():
+    if _loop is not None and _loop.is_running():
+        try:
+            asyncio.run_coroutine_threadsafe(_close_session(), _loop).result(5)
+        except Exception:
+            pass
+
+
+def fetch_many(urls, timeout=DEFAULT_TIMEOUT):
+    future = asyncio.run_coroutine_threadsafe(_fetch_pooled(list(urls), timeout), _event_loop())
+    return future.result()
+
+
+def fetch(url, params=None, timeout=DEFAULT_TIMEOUT):
+
+    if params:
+        url = URL(url).update_query(
+            {k: v for k, v in params.items() if v is not None}
+        )
+
+    return fetch_many([url], timeout=timeout)[0]
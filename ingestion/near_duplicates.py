@@ -0,0 +1,258 @@
+# ingestion/near_duplicates.py
+#
+# Near-duplicate detection at ingest (MinHash + LSH banding).
+#
+# The same wire story reaches us from several sources with slightly
+# different wording, so exact content hashes miss it. Each text becomes
+# a MinHash signature over character shingles; signatures are split into
+# bands and any earlier record sharing a band bucket is a candidate,
+# confirmed by the signatures' estimated Jaccard similarity.
+#
+# The index keeps the most recent canonical records in memory and is
+# persisted to NEAR_DUP_INDEX_PATH between runs. Several processes
+# (scheduler, streaming ingestion) share the file, so a save merges in
+# whatever the others wrote since this process last read it.
+
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+
+from ai_engine.preprocess import clean_text
+
+
+NEAR_DUP_INDEX_PATH = os.getenv("NEAR_DUP_INDEX_PATH", ".near_dup_index.npz")
+
+SHINGLE_SIZE = 5          # characters
+NUM_PERM = 128
+BANDS = 16                # 16 bands x 8 rows: candidates from ~0.7 Jaccard
+ROWS_PER_BAND = NUM_PERM // BANDS
+
+# Estimated Jaccard at or above which a candidate counts as the same story
+SIMILARITY_THRESHOLD = 0.7
+
+# Texts shorter than this many shingles are left to the exact hash
+MIN_SHINGLES = 20
+
+# Canonical records remembered (oldest evicted first)
+MAX_ENTRIES = 100_000
+
+# Fixed seed: signatures must stay comparable across runs
+_rng = np.random.default_rng(20240601)
+_PERM_A = _rng.integers(0, 1 << 64, NUM_PERM, dtype=np.uint64, endpoint=False) | np.uint64(1)
+_PERM_B = _rng.integers(0, 1 << 64, NUM_PERM, dtype=np.uint64, endpoint=False)
+
+try:
+    import fcntl
+except ImportError:   # Windows: in-process locking only
+    fcntl = None
+
+
+def shingle_ids(text):
+    """
+    Distinct character shingles of the cleaned text, each packed into
+    one integer (clean_text leaves plain ASCII, one byte per char).
+    """
+
+    data = " ".join(clean_text(text or "").split()).encode("ascii", "ignore")
+
+    if len(data) < SHINGLE_SIZE:
+        return np.empty(0, dtype=np.uint64)
+
+    chars = np.frombuffer(data, dtype=np.uint8).astype(np.uint64)
+    count = len(chars) - SHINGLE_SIZE + 1
+
+    ids = np.zeros(count, dtype=np.uint64)
+    for offset in range(SHINGLE_SIZE):
+        ids |= chars[offset:offset + count] << np.uint64(8 * offset)
+
+    return np.unique(ids)
+
+
+def signature(text):
+    """
+    MinHash signature (uint32[NUM_PERM]), or None for very short text.
+    """
+
+    ids = shingle_ids(text)
+
+    if len(ids) < MIN_SHINGLES:
+        return None
+
+    # Multiply-shift: top 32 bits of (a * x + b) mod 2^64, one per permutation
+    hashed = (np.outer(ids, _PERM_A) + _PERM_B) >> np.uint64(32)
+
+    return hashed.min(axis=0).astype(np.uint32)
+
+
+def similarity(sig_a, sig_b):
+    # Fraction of agreeing minhashes estimates the Jaccard similarity
+    return float(np.count_nonzero(sig_a == sig_b)) / NUM_PERM
+
+
+def _band_keys(sig):
+    bands = sig.reshape(BANDS, ROWS_PER_BAND)
+    return [(band, bands[band].tobytes()) for band in range(BANDS)]
+
+
+class NearDuplicateIndex:
+
+    def __init__(self, path=NEAR_DUP_INDEX_PATH, threshold=SIMILARITY_THRESHOLD,
+                 max_entries=MAX_ENTRIES):
+        self.path = path
+        self.threshold = threshold
+        self.max_entries = max_entries
+
+        self.signatures = OrderedDict()   # record id -> signature, oldest first
+        self.buckets = {}                 # (band, key) -> set of record ids
+        self.lock = threading.Lock()
+
+        # mtime of the file as last read or written by this process
+        self._disk_mtime = None
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def _evict(self):
+        while len(self.signatures) > self.max_entries:
+            record_id, sig = self.signatures.popitem(last=False)
+
+            for key in _band_keys(sig):
+                members = self.buckets.get(key)
+                if members:
+                    members.discard(record_id)
+                    if not members:
+                        del self.buckets[key]
+
+    def _add(self, record_id, sig):
+        self.signatures[record_id] = sig
+
+        for key in _band_keys(sig):
+            self.buckets.setdefault(key, set()).add(record_id)
+
+    def add(self, record_id, sig):
+        if sig is None:
+            return
+
+        with self.lock:
+            self._add(record_id, sig)
+            self._evict()
+
+    def query(self, sig):
+        """
+        Best matching canonical record: (record_id, similarity) or None.
+        """
+
+        if sig is None:
+            return None
+
+        with self.lock:
+            candidates = set()
+            for key in _band_keys(sig):
+                candidates.update(self.buckets.get(key, ()))
+
+            if not candidates:
+                return None
+
+            candidates = list(candidates)
+            stacked = np.stack([self.signatures[c] for c in candidates])
+
+        scores = np.count_nonzero(stacked == sig, axis=1) / NUM_PERM
+        best = int(np.argmax(scores))
+
+        if scores[best] < self.threshold:
+            return None
+
+        return candidates[best], float(scores[best])
+
+    # ----------------- disk -----------------
+
+    @contextmanager
+    def _file_lock(self):
+        # Serialises read-merge-replace across processes sharing the file
+        if fcntl is None:
+            yield
+            return
+
+        with open(self.path + ".lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_disk(self):
+        """
+        Entries the on-disk file has and this index doesn't. Skipped when
+        the file hasn't changed since this process last read or wrote it.
+        """
+
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return
+
+        if mtime == self._disk_mtime:
+            return
+
+        with np.load(self.path) as data:
+            if data["signatures"].shape[1:] == (NUM_PERM,):
+                for record_id, sig in zip(data["ids"], data["signatures"]):
+                    record_id = int(record_id)
+                    if record_id not in self.signatures:
+                        self._add(record_id, sig)
+
+        self._disk_mtime = mtime
+        self._evict()
+
+    def save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+
+        with self.lock, self._file_lock():
+            self._read_disk()
+
+            ids = np.fromiter(self.signatures.keys(), dtype=np.int64, count=len(self.signatures))
+            sigs = (
+                np.stack(list(self.signatures.values()))
+                if len(ids) else np.empty((0, NUM_PERM), dtype=np.uint32)
+            )
+
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".near_dup_", suffix=".npz")
+
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    np.savez(f, ids=ids, signatures=sigs)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+
+            self._disk_mtime = os.stat(self.path).st_mtime_ns
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return False
+
+        with self.lock, self._file_lock():
+            self._read_disk()
+
+        return True
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_near_duplicate_index():
+    global _index
+
+    with _index_lock:
+        if _index is None:
+            _index = NearDuplicateIndex()
+            _index.load()
+
+    return _index
@@ -1,45 +1,161 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
 from ingestion.collectors.news import collect_news
 from ingestion.collectors.regional_rss import collect_regional_rss
 from ingestion.collectors.youtube import collect_youtube
 from ingestion.collectors.telegram import collect_telegram
 
+from ingestion.checkpoints import commit, deferring
 from ingestion.utils import insert_records, log_ingestion
+from metrics import COLLECTOR_FETCH_SECONDS, COLLECTOR_RECORDS
 
 
-def run_ingestion():
+SOURCES = {
+    "newsapi": collect_news,
+    "regional_rss": collect_regional_rss,
+    "youtube": collect_youtube,
+    "telegram": collect_telegram
+}
+
+# Wall-clock budget per source (seconds), measured from cycle start
+SOURCE_DEADLINES = {
+    "newsapi": 30,
+    "regional_rss": 45,
+    "youtube": 30,
+    "telegram": 90
+}
+
+DEFAULT_DEADLINE = 60
+
+
+def _timed(name, func, started):
+    # Per-source start: the failed / timeout paths time from here too
+    started[name] = time.monotonic()
+
+    # Offsets / validators the collector defers wait for the insert
+    with deferring() as deferred:
+        records = func()
+
+    return records, time.monotonic() - started[name], deferred
 
-    sources = {
-        "newsapi": collect_news,
-        "regional_rss": collect_regional_rss,
-        "youtube": collect_youtube,
-        "telegram": collect_telegram
-    }
+
+def run_ingestion(sources=None, deadlines=None):
+    """
+    Fan collectors out over a thread pool and insert each source's
+    records as soon as it finishes. A source that misses its deadline
+    is logged as "timeout" and its late result is discarded.
+    """
+
+    sources = sources or SOURCES
+    deadlines = deadlines or SOURCE_DEADLINES
 
     total_inserted = 0
+    cycle_start = time.monotonic()
+    started = {}
 
-    for name, func in sources.items():
+    executor = ThreadPoolExecutor(
+        max_workers=len(sources),
+        thread_name_prefix="collector"
+    )
 
-        try:
-            records = func()
-            inserted = insert_records(records)
+    pending = {
+        executor.submit(_timed, name, func, started): name
+        for name, func in sources.items()
+    }
 
-            log_ingestion(
-                source=name,
-                fetched=len(records),
-                inserted=inserted,
-                status="success",
-                error_message=None
-            )
+    expires_at = {
+        name: cycle_start + deadlines.get(name, DEFAULT_DEADLINE)
+        for name in sources
+    }
+
+    def elapsed(name, now):
+        return now - started.get(name, cycle_start)
 
-            total_inserted += inserted
+    try:
+        while pending:
 
-        except Exception as e:
-            log_ingestion(
-                source=name,
-                fetched=0,
-                inserted=0,
-                status="failed",
-                error_message=str(e)
+            now = time.monotonic()
+            next_deadline = min(expires_at[name] for name in pending.values())
+
+            done, _ = wait(
+                pending,
+                timeout=max(next_deadline - now, 0),
+                return_when=FIRST_COMPLETED
             )
 
+            for future in done:
+                name = pending.pop(future)
+
+                try:
+                    records, duration, deferred = future.result()
+
+                except Exception as e:
+                    duration = elapsed(name, time.monotonic())
+
+                    COLLECTOR_FETCH_SECONDS.labels(name, "failed").observe(duration)
+
+                    log_ingestion(
+                        source=name,
+                        fetched=0,
+                        inserted=0,
+                        status="failed",
+                        error_message=str(e),
+                        duration=duration
+                    )
+                    continue
+
+                COLLECTOR_FETCH_SECONDS.labels(name, "success").observe(duration)
+                COLLECTOR_RECORDS.labels(name).inc(len(records))
+
+                try:
+                    inserted = insert_records(records)
+                    commit(deferred)
+
+                    log_ingestion(
+                        source=name,
+                        fetched=len(records),
+                        inserted=inserted,
+                        status="success",
+                        error_message=None,
+                        duration=duration
+                    )
+
+                    total_inserted += inserted
+
+                except Exception as e:
+                    log_ingestion(
+                        source=name,
+                        fetched=len(records),
+                        inserted=0,
+                        status="failed",
+                        error_message=f"Insert failed: {e}",
+                        duration=duration
+                    )
+
+            # Abandon anything past its deadline
+            now = time.monotonic()
+
+            for future, name in list(pending.items()):
+                if now < expires_at[name]:
+                    continue
+
+                future.cancel()
+                pending.pop(future)
+
+                COLLECTOR_FETCH_SECONDS.labels(name, "timeout").observe(elapsed(name, now))
+
+                log_ingestion(
+                    source=name,
+                    fetched=0,
+                    inserted=0,
+                    status="timeout",
+                    error_message=f"No result within {deadlines.get(name, DEFAULT_DEADLINE)}s",
+                    duration=elapsed(name, now)
+                )
+
+    finally:
+        # Do not block the cycle on collectors that blew their deadline
+        executor.shutdown(wait=False, cancel_futures=True)
+
     return total_inserted
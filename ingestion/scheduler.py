@@ -1,32 +1,338 @@
-from apscheduler.schedulers.blocking import BlockingScheduler
+# ingestion/scheduler.py
+#
+# Single-owner job scheduler.
+#
+# Every API worker and every standalone runner may call start(), but only
+# the process holding a Postgres advisory lock actually runs jobs; the
+# others keep the scheduler paused and retry the lock periodically, so a
+# leader that dies is replaced within LEADER_RETRY_SECONDS. Jobs never
+# overlap (max_instances=1) and missed runs are coalesced into one.
+# Per-job metrics live in scheduler_jobs so any process can report them.
+#
+#   python -m ingestion.scheduler
+
+from apscheduler.events import EVENT_JOB_MAX_INSTANCES, EVENT_JOB_SUBMITTED
+from apscheduler.schedulers.background import BackgroundScheduler
+from datetime import datetime, timezone
 import logging
+import os
+import socket
+import threading
+import time
+
+from sqlalchemy.dialects import postgresql, sqlite
 
-from ingestion.collectors.news import collect_news
-from ai_engine.pipeline import process_unprocessed_records
-from ingestion.runner import run_ingestion
+from database import SessionLocal, engine
+from models import SchedulerJob
+from profiling import job_profiled, profile
 
 
 logging.basicConfig(level=logging.INFO)
 
-scheduler = BlockingScheduler()
 
+# Arbitrary, but shared by every process scheduling OSNIT jobs
+SCHEDULER_LOCK_KEY = 7315420019
+
+# Followers retry the lock (and the leader checks it still holds it) this often
+LEADER_RETRY_SECONDS = 30
+
+JOB_DEFAULTS = {
+    "max_instances": 1,        # a slow run never overlaps the next one
+    "coalesce": True,          # missed runs collapse into a single run
+    "misfire_grace_time": 300
+}
+
+OWNER = f"{socket.gethostname()}:{os.getpid()}"
 
 
+# -----------------------------------------------------
+# JOBS
+# -----------------------------------------------------
+
 def ingestion_job():
+    # Imported here: collectors pull in their client libraries
+    from ingestion.runner import run_ingestion
+
     print("Running ingestion pipeline...")
-    run_ingestion()
+    return run_ingestion()
+
+
+# Enrichment, clustering and alerts are event-driven: inserted ids are
+# published on commit and picked up by `python -m ai_engine.worker`.
+JOBS = {
+    "ingestion": {"func": ingestion_job, "trigger": "interval", "minutes": 15},
+}
+
+
+# -----------------------------------------------------
+# METRICS (scheduler_jobs)
+# -----------------------------------------------------
+
+_lags = {}
+
+
+def _utc(value=None):
+    value = value or datetime.now(timezone.utc)
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def record_job(job_name, **values):
+    """
+    Upsert one job's row; the *_count columns are added to the stored
+    totals, everything else overwrites.
+    """
+
+    counters = ("run_count", "failure_count", "skipped_count")
+    row = {"job_name": job_name, "owner": OWNER, **values}
+
+    for column in counters:
+        row.setdefault(column, 0)
+
+    db = SessionLocal()
+
+    try:
+        dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+        stmt = dialect.insert(SchedulerJob).values(row)
+
+        set_ = {k: stmt.excluded[k] for k in row if k != "job_name" and k not in counters}
+        set_.update({
+            k: getattr(SchedulerJob, k) + stmt.excluded[k]
+            for k in counters
+        })
+
+        db.execute(stmt.on_conflict_do_update(index_elements=["job_name"], set_=set_))
+        db.commit()
+
+    except Exception as e:
+        db.rollback()
+        logging.error(f"Scheduler metrics write failed for {job_name}: {e}")
+
+    finally:
+        db.close()
+
+
+def _instrumented(job_name, func):
+
+    def run():
+        started = time.monotonic()
+        started_at = _utc()
+        status, error = "success", None
+
+        try:
+            # OSNIT_PROFILE_JOBS=<job_name> writes a flame graph per run
+            with profile(f"job-{job_name}", enabled=job_profiled(job_name)):
+                return func()
+
+        except Exception as e:
+            status, error = "failed", str(e)
+            logging.error(f"Job {job_name} failed: {e}")
+
+        finally:
+            job = scheduler.get_job(job_name)
+
+            record_job(
+                job_name,
+                run_count=1,
+                failure_count=int(status == "failed"),
+                last_status=status,
+                last_error=error,
+                last_started_at=started_at,
+                last_finished_at=_utc(),
+                last_duration_seconds=time.monotonic() - started,
+                last_lag_seconds=_lags.pop(job_name, None),
+                next_run_at=_utc(job.next_run_time) if job and job.next_run_time else None
+            )
+
+    return run
+
+
+def _on_submitted(event):
+    if event.scheduled_run_times:
+        scheduled = event.scheduled_run_times[-1]
+        _lags[event.job_id] = (datetime.now(scheduled.tzinfo) - scheduled).total_seconds()
+
+
+def _on_max_instances(event):
+    logging.warning(f"Job {event.job_id} still running; skipped this run")
+    record_job(event.job_id, skipped_count=1)
+
+
+# -----------------------------------------------------
+# LEADER ELECTION
+# -----------------------------------------------------
+
+class LeaderLock:
+    """
+    Session-level pg_try_advisory_lock on a dedicated connection: the
+    lock lives exactly as long as that connection. Databases without
+    advisory locks (SQLite) always grant it.
+    """
+
+    def __init__(self, key=SCHEDULER_LOCK_KEY):
+        self.key = key
+        self.raw = None
+
+    def acquire(self):
+        if engine.dialect.name != "postgresql":
+            return True
+
+        raw = engine.raw_connection()
+        conn = raw.driver_connection
+        raw.detach()
+        conn.autocommit = True
+
+        cursor = conn.cursor()
+        cursor.execute("SELECT pg_try_advisory_lock(%s)", (self.key,))
+        acquired = cursor.fetchone()[0]
+        cursor.close()
+
+        if acquired:
+            self.raw = raw
+        else:
+            raw.close()
+
+        return acquired
+
+    def held(self):
+        if engine.dialect.name != "postgresql":
+            return True
+
+        if self.raw is None:
+            return False
+
+        try:
+            cursor = self.raw.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+            return True
+        except Exception:
+            self.release()
+            return False
+
+    def release(self):
+        if self.raw is not None:
+            try:
+                self.raw.close()   # closing the session drops the lock
+            except Exception:
+                pass
+            self.raw = None
+
+
+scheduler = BackgroundScheduler(job_defaults=JOB_DEFAULTS)
+scheduler.add_listener(_on_submitted, EVENT_JOB_SUBMITTED)
+scheduler.add_listener(_on_max_instances, EVENT_JOB_MAX_INSTANCES)
+
+for _name, _spec in JOBS.items():
+    _trigger_args = {k: v for k, v in _spec.items() if k not in ("func", "trigger")}
+    scheduler.add_job(
+        _instrumented(_name, _spec["func"]),
+        _spec["trigger"],
+        id=_name,
+        name=_name,
+        **_trigger_args
+    )
+
+_lock = LeaderLock()
+_state = {"leader": False, "thread": None}
+_stop = threading.Event()
+
+
+def is_leader():
+    return _state["leader"]
+
+
+def _campaign():
+    while not _stop.is_set():
+        try:
+            if not _state["leader"] and _lock.acquire():
+                _state["leader"] = True
+                scheduler.resume()
+                logging.info(f"Scheduler leader: {OWNER}")
+
+            elif _state["leader"] and not _lock.held():
+                _state["leader"] = False
+                scheduler.pause()
+                logging.warning("Scheduler lost leadership; jobs paused")
+
+        except Exception as e:
+            logging.error(f"Scheduler election failed: {e}")
+
+        _stop.wait(LEADER_RETRY_SECONDS)
+
+
+def start():
+    """
+    Start paused and campaign for leadership in the background.
+    Safe to call from every process.
+    """
+
+    if _state["thread"] is not None:
+        return
+
+    scheduler.start(paused=True)
+
+    _stop.clear()
+    _state["thread"] = threading.Thread(target=_campaign, name="scheduler-election", daemon=True)
+    _state["thread"].start()
+
+
+def stop():
+    _stop.set()
+
+    if scheduler.running:
+        scheduler.shutdown(wait=False)
+
+    _lock.release()
+    _state.update(leader=False, thread=None)
+
+
+def status():
+    """
+    This process's role plus the shared per-job metrics.
+    """
+
+    db = SessionLocal()
+
+    try:
+        rows = {row.job_name: row for row in db.query(SchedulerJob).all()}
+    except Exception:
+        rows = {}
+    finally:
+        db.close()
+
+    jobs = []
 
-def ai_processing_job():
-    logging.info("Running AI processing job...")
-    process_unprocessed_records()
+    for name in JOBS:
+        row = rows.get(name)
 
+        jobs.append({
+            "job": name,
+            "owner": row.owner if row else None,
+            "runs": row.run_count if row else 0,
+            "failures": row.failure_count if row else 0,
+            "skipped": row.skipped_count if row else 0,
+            "last_status": row.last_status if row else None,
+            "last_error": row.last_error if row else None,
+            "last_started_at": row.last_started_at if row else None,
+            "last_duration_seconds": row.last_duration_seconds if row else None,
+            "last_lag_seconds": row.last_lag_seconds if row else None,
+            "next_run_at": row.next_run_at if row else None
+        })
 
-# Run every 15 minutes
-scheduler.add_job(ingestion_job, 'interval', minutes=15)
-scheduler.add_job(ai_processing_job, 'interval', minutes=15)
+    return {
+        "running": scheduler.running,
+        "leader": is_leader(),
+        "process": OWNER,
+        "jobs": jobs
+    }
 
 
 if __name__ == "__main__":
     logging.info("🚀 OSNIT Full Pipeline Scheduler Started...")
-    scheduler.start()
+    start()
 
+    try:
+        while True:
+            time.sleep(3600)
+    except (KeyboardInterrupt, SystemExit):
+        stop()
@@ -0,0 +1,700 @@
+# ingestion/streaming.py
+#
+# Streaming ingestion -> enrichment pipeline.
+#
+#   collectors --> dedup --> insert --> enrich --> alert
+#
+# Collectors are generators (iter_* in ingestion/collectors) read on one
+# thread per source. Stages are joined by bounded queues and each runs its
+# own number of threads, so all of them work at once and a cycle moves at
+# the pace of the slowest stage. A full queue blocks whoever feeds it: when
+# enrichment falls behind, inserts stall, then dedup, and then the
+# collector generators simply stop being advanced. Records in flight never
+# exceed the queue sizes below, whatever a source returns.
+#
+#   python -m ingestion.streaming                 # one cycle
+#   python -m ingestion.streaming --interval 900  # keep cycling
+#
+# Without enrichment (--no-enrich) inserted ids go out on raw_osint_new
+# for `python -m ai_engine.worker`; with it they are not published, so the
+# workers do not race the enrich stage for the same rows (a row the
+# stream never got to is left for the workers' sweep). The alert stage
+# shares clustering with the workers' clustering process through
+# cluster_new_records()'s advisory lock.
+#
+# A batch that still fails to insert after INSERT_RETRIES is appended to
+# STREAM_DEAD_LETTER_PATH (one JSON record per line) and its source is
+# logged as failed; `--replay-dead-letters` inserts the file again.
+
+import argparse
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+from ingestion.collectors.news import iter_news
+from ingestion.collectors.regional_rss import iter_regional_rss
+from ingestion.collectors.youtube import iter_youtube
+from ingestion.collectors.telegram import iter_telegram
+
+from ingestion.checkpoints import commit, deferring
+from ingestion.runner import SOURCE_DEADLINES, DEFAULT_DEADLINE
+from ingestion.utils import bulk_insert_records, generate_hash, insert_records, log_ingestion
+from ingestion.near_duplicates import get_near_duplicate_index
+from ingestion.work_queue import queue_depth
+from metrics import COLLECTOR_FETCH_SECONDS, COLLECTOR_RECORDS, UNPROCESSED_ROWS, serve_metrics
+from profiling import job_profiled, profile
+
+
+logging.basicConfig(level=logging.INFO)
+
+
+SOURCES = {
+    "newsapi": iter_news,
+    "regional_rss": iter_regional_rss,
+    "youtube": iter_youtube,
+    "telegram": iter_telegram
+}
+
+# Queue sizes bound the records / ids held in memory between stages
+RECORD_QUEUE_SIZE = 1000
+ID_QUEUE_SIZE = 5000
+
+INSERT_BATCH_SIZE = 200
+INSERT_WORKERS = 1         # >1 lets near-duplicates race past each other
+
+ENRICH_WORKERS = 2
+
+# Hashes the dedup stage remembers per cycle (oldest forgotten first)
+DEDUP_MEMORY = 200_000
+
+# A stage waits this long for a batch to fill before running it short
+LINGER_SECONDS = 1.0
+
+# Let a burst of enriched batches settle into one clustering run
+ALERT_LINGER_SECONDS = 2.0
+
+# Insert attempts per batch, waiting 1s, 2s, ... between them
+INSERT_RETRIES = 3
+INSERT_RETRY_SECONDS = 1.0
+
+STREAM_DEAD_LETTER_PATH = os.getenv("STREAM_DEAD_LETTER_PATH", "dead_letter/stream.jsonl")
+
+# A source stuck inside a fetch is abandoned this long past its budget
+FEED_GRACE_SECONDS = 10
+FEED_POLL_SECONDS = 1.0
+
+
+# -----------------------------------------------------
+# STAGES
+# -----------------------------------------------------
+
+_STOP = object()
+
+
+class Stage:
+    """
+    `workers` threads taking batches of up to `batch_size` items from a
+    bounded inbox and putting func(batch)'s results into the next
+    stage's inbox. The last worker to stop passes the stop on.
+    """
+
+    def __init__(self, name, func, workers=1, batch_size=1, linger=LINGER_SECONDS,
+                 queue_size=RECORD_QUEUE_SIZE):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.batch_size = batch_size
+        self.linger = linger
+
+        self.inbox = queue.Queue(maxsize=queue_size)
+        self.next = None
+
+        self.lock = threading.Lock()
+        self.threads = []
+        self.running = 0
+
+        self.items_in = 0
+        self.items_out = 0
+        self.busy_seconds = 0.0
+        self.blocked_seconds = 0.0
+        self.max_depth = 0
+
+    def put(self, item):
+        """
+        Blocks while the inbox is full. Returns the seconds spent blocked.
+        """
+
+        self.max_depth = max(self.max_depth, self.inbox.qsize())
+
+        started = time.monotonic()
+        self.inbox.put(item)
+
+        return time.monotonic() - started
+
+    def start(self):
+        self.running = self.workers
+
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"stream-{self.name}-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def stop(self):
+        for _ in range(self.workers):
+            self.inbox.put(_STOP)
+
+    def join(self):
+        for thread in self.threads:
+            thread.join()
+
+    def _next_batch(self):
+        """
+        (batch, stopping): waits for one item, then up to `linger`
+        seconds for the rest of the batch.
+        """
+
+        item = self.inbox.get()
+
+        if item is _STOP:
+            return [], True
+
+        batch = [item]
+        deadline = time.monotonic() + self.linger
+
+        while len(batch) < self.batch_size:
+            try:
+                item = self.inbox.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+
+            if item is _STOP:
+                return batch, True
+
+            batch.append(item)
+
+        return batch, False
+
+    def _work(self):
+        stopping = False
+
+        while not stopping:
+            batch, stopping = self._next_batch()
+
+            if not batch:
+                continue
+
+            started = time.monotonic()
+
+            try:
+                results = self.func(batch) or []
+            except Exception as e:
+                logging.error(f"Stream stage {self.name} failed on {len(batch)} items: {e}")
+                results = []
+
+            finished = time.monotonic()
+            blocked = 0.0
+
+            if self.next is not None:
+                for item in results:
+                    blocked += self.next.put(item)
+
+            with self.lock:
+                self.items_in += len(batch)
+                self.items_out += len(results)
+                self.busy_seconds += finished - started
+                self.blocked_seconds += blocked
+
+        with self.lock:
+            self.running -= 1
+            last = self.running == 0
+
+        if last and self.next is not None:
+            self.next.stop()
+
+    def stats(self, wall_seconds):
+        return {
+            "stage": self.name,
+            "workers": self.workers,
+            "in": self.items_in,
+            "out": self.items_out,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "blocked_seconds": round(self.blocked_seconds, 3),
+            # Busy share of the stage's thread time: the bottleneck is near 1
+            "utilisation": round(self.busy_seconds / (wall_seconds * self.workers), 3) if wall_seconds else 0,
+            "max_queue_depth": self.max_depth
+        }
+
+
+# -----------------------------------------------------
+# STAGE FUNCTIONS
+# -----------------------------------------------------
+
+def make_dedup_stage():
+    """
+    Drops empty content and exact repeats across sources within the
+    cycle before they cost a round trip (the unique content_hash still
+    catches repeats of stored rows). Run with a single worker: the
+    hash memory is not locked.
+    """
+
+    recent = OrderedDict()
+
+    def dedup_stage(items):
+        fresh = []
+
+        for name, record in items:
+
+            content = record.get("content")
+            if not content:
+                continue
+
+            content_hash = generate_hash(content)
+
+            if content_hash in recent:
+                continue
+
+            recent[content_hash] = True
+            fresh.append((name, record))
+
+        while len(recent) > DEDUP_MEMORY:
+            recent.popitem(last=False)
+
+        return fresh
+
+    return dedup_stage
+
+
+_dead_letter_lock = threading.Lock()
+
+
+def dead_letter(name, records):
+    directory = os.path.dirname(STREAM_DEAD_LETTER_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with _dead_letter_lock, open(STREAM_DEAD_LETTER_PATH, "a", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps({"source_name": name, "record": record}, default=str) + "\n")
+
+
+def replay_dead_letters():
+    """
+    Insert every dead-lettered record again. The file is set aside
+    first, so records that fail again are written to a fresh one.
+    Returns the number inserted.
+    """
+
+    if not os.path.exists(STREAM_DEAD_LETTER_PATH):
+        return 0
+
+    replay_path = STREAM_DEAD_LETTER_PATH + ".replay"
+
+    with _dead_letter_lock:
+        os.replace(STREAM_DEAD_LETTER_PATH, replay_path)
+
+    by_source = {}
+    with open(replay_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                by_source.setdefault(entry["source_name"], []).append(entry["record"])
+
+    inserted = 0
+
+    for name, records in by_source.items():
+        try:
+            inserted += insert_records(records)
+        except Exception as e:
+            logging.error(f"Dead-letter replay failed for {name}: {e}")
+            dead_letter(name, records)
+
+    os.remove(replay_path)
+
+    return inserted
+
+
+def _insert_with_retry(name, records, notify):
+    for attempt in range(INSERT_RETRIES):
+        try:
+            return bulk_insert_records(records, save_index=False, notify=notify)
+        except Exception as e:
+            logging.error(
+                f"Stream insert failed for {name} ({len(records)} records, "
+                f"attempt {attempt + 1}/{INSERT_RETRIES}): {e}"
+            )
+
+            if attempt + 1 < INSERT_RETRIES:
+                time.sleep(INSERT_RETRY_SECONDS * 2 ** attempt)
+
+    return None
+
+
+def make_insert_stage(inserted_by_source, failed_by_source, lock, notify=True):
+
+    def insert_stage(items):
+        by_source = {}
+        for name, record in items:
+            by_source.setdefault(name, []).append(record)
+
+        ids = []
+
+        # Per source so each source's ingestion log gets its own count
+        for name, records in by_source.items():
+            written = _insert_with_retry(name, records, notify)
+
+            if written is None:
+                dead_letter(name, records)
+
+                # Logged as failed, and its offsets / validators are not
+                # committed this cycle
+                with lock:
+                    failed_by_source[name] = failed_by_source.get(name, 0) + len(records)
+                continue
+
+            with lock:
+                inserted_by_source[name] = inserted_by_source.get(name, 0) + len(written)
+
+            ids.extend(written)
+
+        return ids
+
+    return insert_stage
+
+
+def enrich_stage(ids):
+    from ai_engine.pipeline import process_records
+
+    # Near-duplicates are stored processed and skipped by the claim
+    if process_records(ids, chunk_size=len(ids)):
+        return ids
+
+    return []
+
+
+def alert_stage(ids):
+    from ai_engine.clustering import cluster_new_records
+    from ai_engine.alert_engine import generate_alerts
+
+    clustered = cluster_new_records()
+    alerts = generate_alerts()
+
+    if clustered:
+        logging.info(f"Stream: clustered {clustered} records, alerts {alerts}")
+
+    return []
+
+
+# -----------------------------------------------------
+# SOURCES
+# -----------------------------------------------------
+
+class _FeedProgress:
+    """
+    Shared between a feeder thread and run_stream, which abandons a
+    feeder stuck inside a fetch instead of waiting on it forever.
+    """
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.fetched = 0
+        self.blocked = 0.0
+        self.putting_since = None
+        self.abandoned = False
+        self.lock = threading.Lock()
+
+    def fetch_seconds(self, now):
+        with self.lock:
+            putting = now - self.putting_since if self.putting_since is not None else 0.0
+            return now - self.started - self.blocked - putting
+
+    def begin_put(self):
+        """
+        False once abandoned: the stop may already be on its way down
+        the stages, so nothing more may be put.
+        """
+
+        with self.lock:
+            if self.abandoned:
+                return False
+            self.putting_since = time.monotonic()
+            return True
+
+    def end_put(self, blocked):
+        with self.lock:
+            self.fetched += 1
+            self.blocked += blocked
+            self.putting_since = None
+
+    def abandon_if_over(self, budget, now):
+        with self.lock:
+            if self.putting_since is not None:
+                # Waiting on the pipeline, not on the source
+                return False
+            if now - self.started - self.blocked <= budget:
+                return False
+            self.abandoned = True
+            return True
+
+
+def _feed(name, iterate, stage, budget, results, progress):
+    """
+    Advance one collector and push its records downstream. The budget
+    counts fetch time only: time spent blocked by a full queue is the
+    pipeline's, not the source's. What the collector defers is kept in
+    the result until its records are inserted.
+    """
+
+    status, error = "success", None
+
+    records = None
+
+    with deferring() as pending:
+        try:
+            records = iterate()
+
+            for record in records:
+                if not progress.begin_put():
+                    break
+
+                progress.end_put(stage.put((name, record)))
+
+                if progress.fetch_seconds(time.monotonic()) > budget:
+                    status, error = "timeout", f"Stopped after {budget}s of fetching"
+                    break
+
+        except Exception as e:
+            status, error = "failed", str(e)
+
+        finally:
+            # Closed here so a generator's cleanup defers into `pending`
+            if records is not None:
+                records.close()
+
+    if progress.abandoned:
+        # run_stream has already recorded the timeout
+        return
+
+    duration = progress.fetch_seconds(time.monotonic())
+
+    COLLECTOR_FETCH_SECONDS.labels(name, status).observe(duration)
+    COLLECTOR_RECORDS.labels(name).inc(progress.fetched)
+
+    results[name] = {
+        "fetched": progress.fetched,
+        "status": status,
+        "error": error,
+        "duration": duration,
+        "pending": pending
+    }
+
+
+def _join_feeders(feeders, budgets, results):
+    """
+    Wait for the feeder threads. One that is past its budget while not
+    waiting on the pipeline is stuck inside its collector (the budget
+    is only checked between records): it is logged as a timeout and
+    left behind.
+    """
+
+    while True:
+        alive = [(name, thread, progress) for name, thread, progress in feeders if thread.is_alive()]
+
+        if not alive:
+            return
+
+        alive[0][1].join(FEED_POLL_SECONDS)
+        now = time.monotonic()
+
+        for name, thread, progress in alive:
+            budget = budgets[name]
+
+            if not thread.is_alive() or not progress.abandon_if_over(budget + FEED_GRACE_SECONDS, now):
+                continue
+
+            logging.error(f"Stream source {name} stuck past its {budget}s budget; abandoning it")
+
+            duration = progress.fetch_seconds(now)
+            COLLECTOR_FETCH_SECONDS.labels(name, "timeout").observe(duration)
+            COLLECTOR_RECORDS.labels(name).inc(progress.fetched)
+
+            results[name] = {
+                "fetched": progress.fetched,
+                "status": "timeout",
+                "error": f"No progress within {budget}s",
+                "duration": duration,
+                "pending": []
+            }
+
+        feeders = [entry for entry in feeders if entry[1].is_alive() and not entry[2].abandoned]
+
+
+# -----------------------------------------------------
+# PIPELINE
+# -----------------------------------------------------
+
+def run_stream(sources=None, deadlines=None, enrich=True, alert=True,
+               enrich_workers=ENRICH_WORKERS, insert_batch_size=INSERT_BATCH_SIZE):
+    """
+    One streaming cycle over every source. Returns per-source and
+    per-stage stats.
+    """
+
+    sources = sources or SOURCES
+    deadlines = deadlines or SOURCE_DEADLINES
+
+    if enrich:
+        # Load the models before the first batch arrives
+        from ai_engine.model_registry import preload
+        preload()
+
+    inserted_by_source = {}
+    failed_by_source = {}
+    inserted_lock = threading.Lock()
+
+    stages = [
+        Stage("dedup", make_dedup_stage(), batch_size=100, linger=0.1),
+        # Ids the enrich stage will take are not published to the workers
+        Stage("insert", make_insert_stage(inserted_by_source, failed_by_source, inserted_lock,
+                                          notify=not enrich),
+              workers=INSERT_WORKERS, batch_size=insert_batch_size),
+    ]
+
+    if enrich:
+        from ai_engine.pipeline import PIPELINE_CHUNK_SIZE
+
+        stages.append(Stage("enrich", enrich_stage, workers=enrich_workers,
+                            batch_size=PIPELINE_CHUNK_SIZE, queue_size=ID_QUEUE_SIZE))
+
+        if alert:
+            stages.append(Stage("alert", alert_stage, batch_size=ID_QUEUE_SIZE,
+                                linger=ALERT_LINGER_SECONDS, queue_size=ID_QUEUE_SIZE))
+
+    for upstream, downstream in zip(stages, stages[1:]):
+        upstream.next = downstream
+
+    started = time.monotonic()
+
+    for stage in stages:
+        stage.start()
+
+    feed_results = {}
+    budgets = {name: deadlines.get(name, DEFAULT_DEADLINE) for name in sources}
+    feeders = []
+
+    for name, iterate in sources.items():
+        progress = _FeedProgress()
+
+        thread = threading.Thread(
+            target=_feed,
+            args=(name, iterate, stages[0], budgets[name], feed_results, progress),
+            name=f"stream-source-{name}",
+            daemon=True
+        )
+        thread.start()
+
+        feeders.append((name, thread, progress))
+
+    _join_feeders(feeders, budgets, feed_results)
+
+    # Drain: the stop travels down the stages behind the last record
+    stages[0].stop()
+    for stage in stages:
+        stage.join()
+
+    wall = time.monotonic() - started
+
+    if inserted_by_source:
+        get_near_duplicate_index().save()
+
+    for name, result in feed_results.items():
+        pending = result.pop("pending")
+
+        if name in failed_by_source:
+            result["status"] = "failed"
+            result["error"] = (
+                f"{failed_by_source[name]} records failed to insert; "
+                f"dead-lettered to {STREAM_DEAD_LETTER_PATH}"
+            )
+        else:
+            commit(pending)
+
+        log_ingestion(
+            source=name,
+            fetched=result["fetched"],
+            inserted=inserted_by_source.get(name, 0),
+            status=result["status"],
+            error_message=result["error"],
+            duration=result["duration"]
+        )
+
+    return {
+        "seconds": round(wall, 3),
+        "sources": {
+            name: {**result, "inserted": inserted_by_source.get(name, 0)}
+            for name, result in feed_results.items()
+        },
+        "stages": [stage.stats(wall) for stage in stages]
+    }
+
+
+def _report(summary):
+    logging.info(f"Stream cycle finished in {summary['seconds']}s")
+
+    for name, result in summary["sources"].items():
+        logging.info(
+            f"  {name:<14} {result['status']:<8} fetched {result['fetched']:>5}  "
+            f"inserted {result['inserted']:>5}"
+        )
+
+    for stage in summary["stages"]:
+        logging.info(
+            f"  stage {stage['stage']:<7} x{stage['workers']}  in {stage['in']:>6}  "
+            f"out {stage['out']:>6}  busy {stage['utilisation']:.0%}  "
+            f"max queue {stage['max_queue_depth']}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Streaming ingestion + enrichment")
+    parser.add_argument("--interval", type=int, default=None,
+                        help="seconds between cycles (default: run one cycle)")
+    parser.add_argument("--enrich-workers", type=int, default=ENRICH_WORKERS)
+    parser.add_argument("--no-enrich", action="store_true",
+                        help="insert only; leave enrichment to ai_engine.worker")
+    parser.add_argument("--no-alert", action="store_true",
+                        help="do not cluster / raise alerts after enrichment")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="serve /metrics on this port")
+    parser.add_argument("--replay-dead-letters", action="store_true",
+                        help="insert the dead-lettered records again and exit")
+    args = parser.parse_args()
+
+    if args.replay_dead_letters:
+        logging.info(f"Replayed {replay_dead_letters()} dead-lettered records")
+        raise SystemExit(0)
+
+    if args.metrics_port is not None:
+        UNPROCESSED_ROWS.set_function(queue_depth)
+        serve_metrics(args.metrics_port)
+
+    while True:
+        cycle_started = time.monotonic()
+
+        # OSNIT_PROFILE_JOBS=stream writes a flame graph per cycle
+        with profile("job-stream", enabled=job_profiled("stream")):
+            summary = run_stream(
+                enrich=not args.no_enrich,
+                alert=not args.no_alert,
+                enrich_workers=args.enrich_workers
+            )
+
+        _report(summary)
+
+        if args.interval is None:
+            break
+
+        time.sleep(max(args.interval - (time.monotonic() - cycle_started), 0))
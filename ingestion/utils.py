@@ -1,8 +1,17 @@
 # ingestion/utils.py
 
 import hashlib
+import time
+from sqlalchemy.dialects import postgresql, sqlite
 from database import SessionLocal
 from models import RawOSINT, IngestionLog
+from ingestion.work_queue import publish, NEW_RECORDS_CHANNEL
+from ingestion.near_duplicates import NearDuplicateIndex, get_near_duplicate_index, signature
+from metrics import INSERT_ROWS, INSERT_SECONDS, INSERT_ROWS_PER_SECOND, INSERT_DEDUP_RATIO
+
+
+# Rows written per INSERT ... ON CONFLICT statement in bulk mode
+BULK_CHUNK_SIZE = 500
 
 
 # -----------------------------------------------------
@@ -13,11 +22,261 @@ def generate_hash(text: str) -> str:
     return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
 
+# -----------------------------------------------------
+# ROW BUILDING
+# -----------------------------------------------------
+
+def _build_row(record, content_hash):
+    return {
+        "source": record.get("source"),
+        "content": record.get("content"),
+        "url": record.get("url"),
+        "country": record.get("country"),
+        "state": record.get("state"),
+        "geo_lat": record.get("geo_lat"),
+        "geo_lon": record.get("geo_lon"),
+        "extra_metadata": record.get("metadata"),
+        "content_hash": content_hash,
+        "processed": False
+    }
+
+
+def _dedup_batch(records):
+    """
+    Hash the whole batch up front and drop empty / repeated content
+    """
+
+    rows = []
+    seen = set()
+
+    for record in records:
+
+        content = record.get("content")
+        if not content:
+            continue
+
+        content_hash = generate_hash(content)
+
+        if content_hash in seen:
+            continue
+
+        seen.add(content_hash)
+        rows.append(_build_row(record, content_hash))
+
+    return rows
+
+
+def _insert_ignore(db, rows):
+    """
+    INSERT ... ON CONFLICT (content_hash) DO NOTHING RETURNING id
+    Returns {content_hash: id} for the rows that were actually written.
+    """
+
+    dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+
+    stmt = (
+        dialect.insert(RawOSINT)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=["content_hash"])
+        .returning(RawOSINT.id, RawOSINT.content_hash)
+    )
+
+    return {row.content_hash: row.id for row in db.execute(stmt)}
+
+
+def _insert_chunk(db, rows, notify=True):
+    """
+    One statement + one commit for the chunk. A chunk that fails is
+    retried row by row so one bad record does not drop its neighbours.
+    """
+
+    if not rows:
+        return {}
+
+    try:
+        written = _insert_ignore(db, rows)
+        # Workers are woken when this chunk commits
+        if notify:
+            publish(db, NEW_RECORDS_CHANNEL, list(written.values()))
+        db.commit()
+        return written
+
+    except Exception:
+        db.rollback()
+
+    written = {}
+
+    for row in rows:
+        try:
+            ids = _insert_ignore(db, [row])
+            if notify:
+                publish(db, NEW_RECORDS_CHANNEL, list(ids.values()))
+            db.commit()
+            written.update(ids)
+
+        except Exception:
+            db.rollback()
+            continue
+
+    return written
+
+
+def _link_duplicate(row, canonical_id, score):
+    # Stored already processed: it shares the canonical record's enrichment
+    return {
+        **row,
+        "extra_metadata": {
+            **(row["extra_metadata"] or {}),
+            "near_duplicate_of": canonical_id,
+            "near_duplicate_similarity": round(score, 3)
+        },
+        "processed": True
+    }
+
+
+def _split_near_duplicates(index, rows):
+    """
+    Match each row against the persisted index and the rows before it
+    in the same chunk.
+    Returns (canonical_rows, signatures by hash, duplicate links) where a
+    link is (row, canonical id or in-chunk content_hash, similarity).
+    """
+
+    local = NearDuplicateIndex(path=None, threshold=index.threshold)
+
+    canonical, signatures, links = [], {}, []
+
+    for position, row in enumerate(rows):
+        sig = signature(row["content"])
+        match = index.query(sig)
+
+        if match:
+            links.append((row, match[0], match[1]))
+            continue
+
+        local_match = local.query(sig)
+
+        if local_match:
+            links.append((row, rows[local_match[0]]["content_hash"], local_match[1]))
+            continue
+
+        local.add(position, sig)
+        canonical.append(row)
+        signatures[row["content_hash"]] = sig
+
+    return canonical, signatures, links
+
+
 # -----------------------------------------------------
 # INSERT RECORDS SAFELY (DUPLICATE-PROOF)
 # -----------------------------------------------------
 
-def insert_records(records):
+def insert_records(records, bulk=True, chunk_size=BULK_CHUNK_SIZE, near_dedup=True):
+
+    if not bulk:
+        return _insert_records_per_row(records)
+
+    return len(bulk_insert_records(records, chunk_size=chunk_size, near_dedup=near_dedup))
+
+
+def bulk_insert_records(records, chunk_size=BULK_CHUNK_SIZE, near_dedup=True,
+                        save_index=True, notify=True):
+    """
+    Set-based insert, one commit per chunk. Returns the inserted ids.
+
+    With near_dedup, rows that paraphrase an already-stored (or earlier
+    in-batch) record are stored linked to it through
+    metadata.near_duplicate_of, marked processed and never handed to the
+    AI workers. Long-running callers pass save_index=False and save the
+    index themselves rather than after every call. Callers that enrich
+    the ids themselves pass notify=False so the AI workers do not race
+    them for the rows.
+    """
+
+    started = time.perf_counter()
+
+    records = list(records)
+    rows = _dedup_batch(records)
+    inserted_ids = []
+    near_duplicates = 0
+
+    index = get_near_duplicate_index() if near_dedup else None
+    indexed = 0
+
+    db = SessionLocal()
+
+    try:
+        for start in range(0, len(rows), chunk_size):
+
+            chunk = rows[start:start + chunk_size]
+
+            if index is None:
+                inserted_ids.extend(_insert_chunk(db, chunk, notify=notify).values())
+                continue
+
+            canonical, signatures, links = _split_near_duplicates(index, chunk)
+
+            written = _insert_chunk(db, canonical, notify=notify)
+
+            for content_hash, record_id in written.items():
+                index.add(record_id, signatures[content_hash])
+                indexed += 1
+
+            duplicates, orphans = [], []
+
+            for row, target, score in links:
+                canonical_id = written.get(target) if isinstance(target, str) else target
+
+                # In-chunk canonical already existed (exact hash): store normally
+                if canonical_id is None:
+                    orphans.append(row)
+                else:
+                    duplicates.append(_link_duplicate(row, canonical_id, score))
+
+            linked = _insert_chunk(db, duplicates, notify=False)
+            near_duplicates += len(linked)
+            fresh = _insert_chunk(db, orphans, notify=notify)
+
+            inserted_ids.extend(written.values())
+            inserted_ids.extend(linked.values())
+            inserted_ids.extend(fresh.values())
+
+    finally:
+        db.close()
+
+        if indexed and save_index:
+            index.save()
+
+    _record_insert_metrics(records, len(inserted_ids), near_duplicates,
+                           time.perf_counter() - started)
+
+    return inserted_ids
+
+
+def _record_insert_metrics(records, inserted, near_duplicates, seconds):
+    total = len(records)
+
+    if not total:
+        return
+
+    empty = sum(1 for record in records if not record.get("content"))
+    fresh = inserted - near_duplicates
+
+    # Repeats within the batch plus content already stored
+    duplicates = total - empty - inserted
+
+    INSERT_ROWS.labels("inserted").inc(fresh)
+    INSERT_ROWS.labels("near_duplicate").inc(near_duplicates)
+    INSERT_ROWS.labels("duplicate").inc(duplicates)
+    INSERT_ROWS.labels("empty").inc(empty)
+
+    INSERT_SECONDS.observe(seconds)
+    INSERT_ROWS_PER_SECOND.observe(total / seconds if seconds > 0 else 0)
+    if total > empty:
+        INSERT_DEDUP_RATIO.observe((duplicates + near_duplicates) / (total - empty))
+
+
+def _insert_records_per_row(records):
 
     db = SessionLocal()
     inserted = 0
@@ -39,20 +298,11 @@ def insert_records(records):
             continue
 
         try:
-            obj = RawOSINT(
-                source=record.get("source"),
-                content=content,
-                url=record.get("url"),
-                country=record.get("country"),
-                state=record.get("state"),
-                geo_lat=record.get("geo_lat"),
-                geo_lon=record.get("geo_lon"),
-                extra_metadata=record.get("metadata"),
-                content_hash=content_hash,
-                processed=False
-            )
+            obj = RawOSINT(**_build_row(record, content_hash))
 
             db.add(obj)
+            db.flush()
+            publish(db, NEW_RECORDS_CHANNEL, [obj.id])
             db.commit()   # commit per record
             inserted += 1
 
@@ -68,7 +318,8 @@ def insert_records(records):
 # INGESTION LOGGING
 # -----------------------------------------------------
 
-def log_ingestion(source, fetched, inserted, status, error_message):
+def log_ingestion(source, fetched, inserted, status, error_message,
+                  duration=None):
 
     db = SessionLocal()
 
@@ -78,7 +329,8 @@ def log_ingestion(source, fetched, inserted, status, error_message):
             records_fetched=fetched,
             records_inserted=inserted,
             status=status,
-            error_message=error_message
+            error_message=error_message,
+            duration_seconds=duration
         )
 
         db.add(log)
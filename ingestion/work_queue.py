@@ -0,0 +1,129 @@
+# ingestion/work_queue.py
+#
+# Event-driven hand-off between ingestion and the AI workers over
+# Postgres LISTEN/NOTIFY.
+#
+# publish() runs inside the transaction that writes the rows, so the
+# notification goes out exactly when that transaction commits (and never
+# for rows that were rolled back). Listener.wait() blocks on the
+# connection socket: an idle worker sends no queries at all.
+
+import select
+
+from sqlalchemy import text
+
+from database import engine
+
+
+# New raw_osint rows -> enrichment workers
+NEW_RECORDS_CHANNEL = "raw_osint_new"
+
+# Enriched rows -> clustering / alerts
+ENRICHED_CHANNEL = "raw_osint_enriched"
+
+# NOTIFY payloads are capped at 8000 bytes
+IDS_PER_NOTIFY = 800
+
+# A row whose enrichment failed this often on its own is parked: no
+# longer claimed, counted as queued or holding back the alert watermark
+MAX_ENRICH_ATTEMPTS = 3
+
+
+def supports_notify(bind=engine):
+    return bind.dialect.name == "postgresql"
+
+
+def queue_depth():
+    """
+    Rows still waiting for enrichment (served by the partial
+    ix_raw_osint_unprocessed index), parked rows excluded.
+    """
+
+    with engine.connect() as conn:
+        return conn.execute(
+            text("SELECT count(*) FROM raw_osint WHERE processed = false AND enrich_attempts < :max_attempts"),
+            {"max_attempts": MAX_ENRICH_ATTEMPTS}
+        ).scalar()
+
+
+def publish(db, channel, ids):
+    """
+    Queue the ids on `channel`; delivered when `db` commits.
+    No-op on databases without NOTIFY (workers poll there instead).
+    """
+
+    if not ids or not supports_notify(db.bind):
+        return
+
+    ids = list(ids)
+
+    for start in range(0, len(ids), IDS_PER_NOTIFY):
+        db.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {
+                "channel": channel,
+                "payload": ",".join(str(i) for i in ids[start:start + IDS_PER_NOTIFY])
+            }
+        )
+
+
+class Listener:
+    """
+    Dedicated autocommit connection LISTENing on one or more channels.
+    Works with psycopg2 and psycopg 3.
+    """
+
+    def __init__(self, *channels):
+        raw = engine.raw_connection()
+        self.conn = raw.driver_connection
+
+        raw.detach()   # never hand a LISTENing connection back to the pool
+        self.raw = raw
+
+        self.conn.autocommit = True
+
+        cursor = self.conn.cursor()
+        for channel in channels:
+            cursor.execute(f"LISTEN {channel}")
+        cursor.close()
+
+    def _payloads(self, timeout):
+
+        # psycopg2: select() on the socket, then poll() into conn.notifies
+        if hasattr(self.conn, "poll"):
+            self.conn.poll()
+
+            if not self.conn.notifies and select.select([self.conn], [], [], timeout)[0]:
+                self.conn.poll()
+
+            notes = list(self.conn.notifies)
+            del self.conn.notifies[:]
+
+            return [n.payload for n in notes]
+
+        # psycopg 3: block for the first one, then take whatever is queued
+        notes = list(self.conn.notifies(timeout=timeout, stop_after=1))
+
+        if notes:
+            notes.extend(self.conn.notifies(timeout=0))
+
+        return [n.payload for n in notes]
+
+    def wait(self, timeout=None):
+        """
+        Block until something is published (or timeout seconds pass).
+        Returns the notified ids, deduplicated and sorted.
+        """
+
+        ids = set()
+
+        for payload in self._payloads(timeout):
+            ids.update(int(i) for i in payload.split(",") if i)
+
+        return sorted(ids)
+
+    def close(self):
+        try:
+            self.raw.close()
+        except Exception:
+            pass
@@ -0,0 +1,337 @@
+# metrics.py
+#
+# In-process Prometheus-style metrics shared by ingestion, the AI workers
+# and the API.
+#
+# Counters, gauges and histograms follow the prometheus_client shape
+# (METRIC.labels(...).observe(x)) and render() produces the text
+# exposition format, served by the API at /metrics and by standalone
+# processes through serve_metrics(port). Each process keeps its own
+# values; scrape every process (API workers, ai_engine.worker, streaming
+# ingestion) as a separate target.
+#
+# Recording is a dict lookup, a bisect and a lock per call, so the hot
+# loops observe per chunk / per batch, never per row.
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds: from a cached lookup to a slow remote fetch
+LATENCY_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0
+)
+
+RATE_BUCKETS = (10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000)
+
+RATIO_BUCKETS = (0.0, 0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 1.0)
+
+_registry = []
+_registry_lock = threading.Lock()
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+
+    if not pairs:
+        return ""
+
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+# -----------------------------------------------------
+# METRIC TYPES
+# -----------------------------------------------------
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+        self._children = {}
+        self._lock = threading.Lock()
+
+        with _registry_lock:
+            _registry.append(self)
+
+    def labels(self, *values):
+        values = tuple(str(v) for v in values)
+
+        child = self._children.get(values)
+        if child is not None:
+            return child
+
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+
+        with self._lock:
+            return self._children.setdefault(values, self._child())
+
+    def _child(self):
+        raise NotImplementedError
+
+    def _default(self):
+        # Unlabelled metrics record on themselves
+        return self.labels()
+
+    def samples(self):
+        raise NotImplementedError
+
+    def exposed_name(self):
+        return self.name
+
+    def render(self):
+        name = self.exposed_name()
+        lines = [
+            f"# HELP {name} {self.documentation}",
+            f"# TYPE {name} {self.kind}"
+        ]
+
+        for suffix, names, values, extra, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(names, values, extra)} {_format_value(value)}")
+
+        return "\n".join(lines)
+
+
+class _Value:
+    def __init__(self):
+        self.value = 0.0
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.value += amount
+
+    def set(self, value):
+        self.value = float(value)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _child(self):
+        return _Value()
+
+    def inc(self, amount=1):
+        self._default().inc(amount)
+
+    def exposed_name(self):
+        # HELP / TYPE name the _total series, as prometheus_client does
+        return self.name + "_total"
+
+    def samples(self):
+        for values, child in list(self._children.items()):
+            yield "_total", self.labelnames, values, (), child.value
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), function=None):
+        super().__init__(name, documentation, labelnames)
+        self.function = function
+
+    def _child(self):
+        return _Value()
+
+    def set(self, value):
+        self._default().set(value)
+
+    def set_function(self, function):
+        """
+        Evaluated at scrape time instead of on every update.
+        """
+
+        self.function = function
+
+    def samples(self):
+        if self.function is not None:
+            try:
+                value = self.function()
+            except Exception:
+                return
+
+            if value is not None:
+                yield "", (), (), (), value
+            return
+
+        for values, child in list(self._children.items()):
+            yield "", self.labelnames, values, (), child.value
+
+
+class _HistogramValue:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # last one is +Inf
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        position = bisect.bisect_left(self.buckets, value)
+
+        with self.lock:
+            self.counts[position] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value):
+        self._default().observe(value)
+
+    def time(self):
+        return self._default().time()
+
+    def samples(self):
+        for values, child in list(self._children.items()):
+            with child.lock:
+                counts = list(child.counts)
+                total = child.sum
+
+            cumulative = 0
+
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield "_bucket", self.labelnames, values, (("le", _format_value(bound)),), cumulative
+
+            yield "_sum", self.labelnames, values, (), total
+            yield "_count", self.labelnames, values, (), cumulative
+
+
+# -----------------------------------------------------
+# EXPOSITION
+# -----------------------------------------------------
+
+def render():
+    with _registry_lock:
+        metrics = list(_registry)
+
+    return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+
+        body = render().encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_metrics(port, addr="0.0.0.0"):
+    """
+    /metrics for processes without the API (workers, streaming ingestion).
+    """
+
+    server = ThreadingHTTPServer((addr, port), _Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+# -----------------------------------------------------
+# OSNIT METRICS
+# -----------------------------------------------------
+
+COLLECTOR_FETCH_SECONDS = Histogram(
+    "osnit_collector_fetch_seconds",
+    "Time for one collector to fetch a cycle's records",
+    ["source", "status"]
+)
+
+COLLECTOR_RECORDS = Counter(
+    "osnit_collector_records",
+    "Records returned by collectors",
+    ["source"]
+)
+
+INSERT_ROWS = Counter(
+    "osnit_insert_rows",
+    "Records passed to insert_records, by outcome",
+    ["outcome"]   # inserted / near_duplicate / duplicate / empty
+)
+
+INSERT_SECONDS = Histogram(
+    "osnit_insert_seconds",
+    "Duration of one insert_records call"
+)
+
+INSERT_ROWS_PER_SECOND = Histogram(
+    "osnit_insert_rows_per_second",
+    "Records handled per second by one insert_records call",
+    buckets=RATE_BUCKETS
+)
+
+INSERT_DEDUP_RATIO = Histogram(
+    "osnit_insert_dedup_ratio",
+    "Share of one insert_records call's records dropped as exact or near duplicates",
+    buckets=RATIO_BUCKETS
+)
+
+PIPELINE_STAGE_SECONDS = Histogram(
+    "osnit_pipeline_stage_seconds",
+    "Per-chunk time spent in each enrichment stage",
+    ["stage"]   # clean / ner / embed / classify / geo / write / commit
+)
+
+PIPELINE_RECORDS = Counter(
+    "osnit_pipeline_records",
+    "Rows enriched by the AI pipeline"
+)
+
+UNPROCESSED_ROWS = Gauge(
+    "osnit_unprocessed_rows",
+    "raw_osint rows waiting for enrichment"
+)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "osnit_http_request_seconds",
+    "API request latency by route template",
+    ["method", "route", "status"]
+)
@@ -0,0 +1,75 @@
+"""baseline schema (raw_osint, ingestion_logs, alerts)
+
+Databases created before migrations existed already have these tables:
+mark them with `alembic stamp 0001_baseline` instead of upgrading.
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001_baseline"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "raw_osint",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("source", sa.Text, nullable=False),
+        sa.Column("content", sa.Text, nullable=False),
+        sa.Column("url", sa.Text),
+        sa.Column("country", sa.Text),
+        sa.Column("state", sa.Text),
+        sa.Column("geo_lat", sa.Float),
+        sa.Column("geo_lon", sa.Float),
+        sa.Column("content_hash", sa.Text, unique=True),
+        sa.Column("metadata", sa.JSON),
+        sa.Column("keyword_vector", sa.JSON),
+        sa.Column("incident_type", sa.Text),
+        sa.Column("severity", sa.Text),
+        sa.Column("risk_score", sa.Float),
+        sa.Column("confidence", sa.Float),
+        sa.Column("processed", sa.Boolean),
+        sa.Column("collected_at", sa.TIMESTAMP, server_default=sa.func.now())
+    )
+    op.create_index("ix_raw_osint_id", "raw_osint", ["id"])
+
+    op.create_table(
+        "ingestion_logs",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("source", sa.Text),
+        sa.Column("records_fetched", sa.Integer),
+        sa.Column("records_inserted", sa.Integer),
+        sa.Column("status", sa.Text),
+        sa.Column("error_message", sa.Text),
+        sa.Column("run_time", sa.TIMESTAMP, server_default=sa.func.now())
+    )
+    op.create_index("ix_ingestion_logs_id", "ingestion_logs", ["id"])
+
+    op.create_table(
+        "alerts",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("keyword", sa.Text),
+        sa.Column("state", sa.Text),
+        sa.Column("country", sa.Text),
+        sa.Column("spike_ratio", sa.Float),
+        sa.Column("threat_probability", sa.Float),
+        sa.Column("confidence", sa.Float),
+        sa.Column("source_count", sa.Integer),
+        sa.Column("alert_type", sa.Text),
+        sa.Column("created_at", sa.TIMESTAMP, server_default=sa.func.now())
+    )
+    op.create_index("ix_alerts_id", "alerts", ["id"])
+
+
+def downgrade():
+    op.drop_table("alerts")
+    op.drop_table("ingestion_logs")
+    op.drop_table("raw_osint")
@@ -0,0 +1,243 @@
+"""enrichment columns, cache / rollup tables and hot-path indexes
+
+Columns use ADD COLUMN IF NOT EXISTS because some deployments added
+cluster_id / embedding by hand. A hand-added embedding column holds
+JSON float lists; it is rewritten to the float32 bytes the models use
+(rows whose vector cannot be read are queued for re-enrichment), and
+the downgrade turns it back into JSON instead of dropping it. The
+rollup tables are backfilled from the rows already enriched / clustered
+(the same queries as ai_engine.rollups.rebuild_rollups), so the
+/intelligence endpoints report existing data straight away. Indexes
+on raw_osint are built CONCURRENTLY so ingestion keeps writing while
+they build.
+
+Revision ID: 0002_hot_path_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-18
+"""
+
+import json
+
+from alembic import op
+import numpy as np
+import sqlalchemy as sa
+
+
+revision = "0002_hot_path_indexes"
+down_revision = "0001_baseline"
+branch_labels = None
+depends_on = None
+
+
+# raw_osint.embedding is handled separately (see _upgrade_embedding)
+NEW_COLUMNS = [
+    ("raw_osint", "cluster_id", "INTEGER"),
+    ("raw_osint", "summary", "TEXT"),
+    ("ingestion_logs", "duration_seconds", "DOUBLE PRECISION"),
+]
+
+# (name, table, definition) -- keep in sync with models.py
+INDEXES = [
+    ("ix_raw_osint_unprocessed", "raw_osint",
+     "(id) WHERE processed = false"),
+    ("ix_raw_osint_unclustered", "raw_osint",
+     "(id) WHERE cluster_id IS NULL AND embedding IS NOT NULL"),
+    ("ix_raw_osint_collected_at_id", "raw_osint",
+     "(collected_at DESC, id DESC)"),
+    ("ix_raw_osint_source_collected_at_id", "raw_osint",
+     "(source, collected_at DESC, id DESC)"),
+    ("ix_raw_osint_collected_at_brin", "raw_osint",
+     "USING brin (collected_at)"),
+    ("ix_raw_osint_risk_score", "raw_osint",
+     "(risk_score)"),
+    ("ix_raw_osint_cluster_id_risk", "raw_osint",
+     "(cluster_id, risk_score)"),
+    ("ix_raw_osint_geo", "raw_osint",
+     "(id) WHERE geo_lat IS NOT NULL AND geo_lon IS NOT NULL"),
+    ("ix_alerts_created_at", "alerts",
+     "(created_at)"),
+]
+
+
+EMBEDDING_BATCH_SIZE = 5000
+
+
+# -----------------------------------------------------
+# EMBEDDING COLUMN
+# -----------------------------------------------------
+
+def _embedding_type(bind):
+    return bind.execute(sa.text(
+        "SELECT data_type FROM information_schema.columns "
+        "WHERE table_schema = current_schema() "
+        "AND table_name = 'raw_osint' AND column_name = 'embedding'"
+    )).scalar()
+
+
+def _to_bytes(value):
+    # json / jsonb / text hold "[...]", float arrays render as "{...}"
+    try:
+        vector = np.asarray(
+            json.loads(value.replace("{", "[").replace("}", "]")), dtype=np.float32
+        ).reshape(-1)
+    except (TypeError, ValueError):
+        return None
+
+    return vector.tobytes() if vector.size else None
+
+
+def _to_json(value):
+    try:
+        return json.dumps(np.frombuffer(value, dtype=np.float32).tolist())
+    except ValueError:
+        return None
+
+
+def _rewrite_embedding(bind, sql_type, select_expr, convert, set_expr):
+    """
+    Copy raw_osint.embedding into a new column of sql_type, id range by
+    id range, then swap the columns. Rows convert() returns None for
+    lose their vector and go back through enrichment.
+    """
+
+    op.execute(f"ALTER TABLE raw_osint ADD COLUMN embedding_new {sql_type}")
+
+    last_id = 0
+
+    while True:
+        rows = bind.execute(sa.text(
+            f"SELECT id, {select_expr} FROM raw_osint "
+            "WHERE embedding IS NOT NULL AND id > :last_id ORDER BY id LIMIT :limit"
+        ), {"last_id": last_id, "limit": EMBEDDING_BATCH_SIZE}).all()
+
+        if not rows:
+            break
+
+        converted = [{"id": row[0], "value": convert(row[1])} for row in rows]
+        good = [row for row in converted if row["value"] is not None]
+        bad = [{"id": row["id"]} for row in converted if row["value"] is None]
+
+        if good:
+            bind.execute(sa.text(f"UPDATE raw_osint SET embedding_new = {set_expr} WHERE id = :id"), good)
+
+        if bad:
+            bind.execute(sa.text(
+                "UPDATE raw_osint SET processed = false, cluster_id = NULL WHERE id = :id"
+            ), bad)
+
+        last_id = rows[-1][0]
+
+    op.execute("ALTER TABLE raw_osint DROP COLUMN embedding")
+    op.execute("ALTER TABLE raw_osint RENAME COLUMN embedding_new TO embedding")
+
+
+def _upgrade_embedding():
+    bind = op.get_bind()
+    data_type = _embedding_type(bind)
+
+    if data_type is None:
+        op.execute("ALTER TABLE raw_osint ADD COLUMN embedding BYTEA")
+    elif data_type != "bytea":
+        _rewrite_embedding(bind, "BYTEA", "embedding::text", _to_bytes, ":value")
+
+
+def _downgrade_embedding():
+    bind = op.get_bind()
+
+    if _embedding_type(bind) == "bytea":
+        _rewrite_embedding(bind, "JSONB", "embedding", _to_json, "CAST(:value AS jsonb)")
+
+
+# -----------------------------------------------------
+# ROLLUP BACKFILL
+# -----------------------------------------------------
+
+def _backfill_rollups():
+    # Near-duplicates are stored processed but never enriched
+    # (incident_type NULL); the pipeline does not count them either
+    op.execute("""
+        INSERT INTO incident_rollup_hourly
+            (hour, incident_type, severity, source, incident_count, risk_sum, risk_count)
+        SELECT date_trunc('hour', collected_at),
+               incident_type,
+               COALESCE(severity, 'low'),
+               COALESCE(source, 'unknown'),
+               COUNT(*),
+               COALESCE(SUM(risk_score), 0),
+               COUNT(risk_score)
+        FROM raw_osint
+        WHERE processed = true
+          AND incident_type IS NOT NULL
+          AND collected_at IS NOT NULL
+        GROUP BY 1, 2, 3, 4
+    """)
+
+    op.execute("""
+        INSERT INTO cluster_rollup (cluster_id, incident_count)
+        SELECT cluster_id, COUNT(*)
+        FROM raw_osint
+        WHERE cluster_id IS NOT NULL
+        GROUP BY cluster_id
+    """)
+
+
+# -----------------------------------------------------
+# MIGRATION
+# -----------------------------------------------------
+
+def upgrade():
+    for table, column, sql_type in NEW_COLUMNS:
+        op.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} {sql_type}")
+
+    _upgrade_embedding()
+
+    op.create_table(
+        "embedding_cache",
+        sa.Column("content_hash", sa.Text, primary_key=True),
+        sa.Column("embedding", sa.LargeBinary, nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP, server_default=sa.func.now())
+    )
+
+    op.create_table(
+        "incident_rollup_hourly",
+        sa.Column("hour", sa.TIMESTAMP, primary_key=True),
+        sa.Column("incident_type", sa.Text, primary_key=True),
+        sa.Column("severity", sa.Text, primary_key=True),
+        sa.Column("source", sa.Text, primary_key=True),
+        sa.Column("incident_count", sa.Integer, nullable=False),
+        sa.Column("risk_sum", sa.Float, nullable=False),
+        sa.Column("risk_count", sa.Integer, nullable=False)
+    )
+
+    op.create_table(
+        "cluster_rollup",
+        sa.Column("cluster_id", sa.Integer, primary_key=True, autoincrement=False),
+        sa.Column("incident_count", sa.Integer, nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP, server_default=sa.func.now())
+    )
+    op.create_index("ix_cluster_rollup_incident_count", "cluster_rollup", ["incident_count"])
+
+    _backfill_rollups()
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, definition in INDEXES:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} {definition}")
+
+    op.execute("ANALYZE raw_osint")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _, _ in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+    op.drop_table("cluster_rollup")
+    op.drop_table("incident_rollup_hourly")
+    op.drop_table("embedding_cache")
+
+    # Vectors are expensive to recompute: keep them, in the JSON form
+    _downgrade_embedding()
+
+    for table, column, _ in NEW_COLUMNS:
+        op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS {column}")
@@ -0,0 +1,51 @@
+"""alert engine columns, idempotency key and watermark table
+
+alert_engine has always inserted cluster_id / incident_type /
+alert_level / message, which the alerts table never declared.
+
+Revision ID: 0003_alert_engine
+Revises: 0002_hot_path_indexes
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003_alert_engine"
+down_revision = "0002_hot_path_indexes"
+branch_labels = None
+depends_on = None
+
+
+NEW_COLUMNS = [
+    ("alerts", "cluster_id", "INTEGER"),
+    ("alerts", "incident_type", "TEXT"),
+    ("alerts", "alert_level", "TEXT"),
+    ("alerts", "message", "TEXT"),
+    ("alerts", "dedup_key", "TEXT"),
+]
+
+
+def upgrade():
+    for table, column, sql_type in NEW_COLUMNS:
+        op.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} {sql_type}")
+
+    op.execute("CREATE UNIQUE INDEX IF NOT EXISTS ix_alerts_dedup_key ON alerts (dedup_key)")
+    op.create_index("ix_cluster_rollup_updated_at", "cluster_rollup", ["updated_at"])
+
+    op.create_table(
+        "alert_state",
+        sa.Column("name", sa.Text, primary_key=True),
+        sa.Column("last_record_id", sa.Integer, nullable=False),
+        sa.Column("last_run_at", sa.TIMESTAMP)
+    )
+
+
+def downgrade():
+    op.drop_table("alert_state")
+    op.drop_index("ix_cluster_rollup_updated_at", "cluster_rollup")
+    op.execute("DROP INDEX IF EXISTS ix_alerts_dedup_key")
+
+    for table, column, _ in NEW_COLUMNS:
+        op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS {column}")
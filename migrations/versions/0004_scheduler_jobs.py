@@ -0,0 +1,37 @@
+"""per-job scheduler metrics
+
+Revision ID: 0004_scheduler_jobs
+Revises: 0003_alert_engine
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004_scheduler_jobs"
+down_revision = "0003_alert_engine"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "scheduler_jobs",
+        sa.Column("job_name", sa.Text, primary_key=True),
+        sa.Column("owner", sa.Text),
+        sa.Column("run_count", sa.Integer, nullable=False),
+        sa.Column("failure_count", sa.Integer, nullable=False),
+        sa.Column("skipped_count", sa.Integer, nullable=False),
+        sa.Column("last_status", sa.Text),
+        sa.Column("last_error", sa.Text),
+        sa.Column("last_started_at", sa.TIMESTAMP),
+        sa.Column("last_finished_at", sa.TIMESTAMP),
+        sa.Column("last_duration_seconds", sa.Float),
+        sa.Column("last_lag_seconds", sa.Float),
+        sa.Column("next_run_at", sa.TIMESTAMP)
+    )
+
+
+def downgrade():
+    op.drop_table("scheduler_jobs")
@@ -0,0 +1,33 @@
+"""enrichment attempt tracking on raw_osint
+
+Rows whose enrichment keeps failing are counted in enrich_attempts
+(with the last error) and leave the pipeline queue after
+MAX_ENRICH_ATTEMPTS, instead of failing their whole chunk forever.
+
+Revision ID: 0005_enrich_attempts
+Revises: 0004_scheduler_jobs
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005_enrich_attempts"
+down_revision = "0004_scheduler_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Constant default: no table rewrite on Postgres 11+
+    op.add_column(
+        "raw_osint",
+        sa.Column("enrich_attempts", sa.Integer, nullable=False, server_default=sa.text("0"))
+    )
+    op.add_column("raw_osint", sa.Column("enrich_error", sa.Text))
+
+
+def downgrade():
+    op.drop_column("raw_osint", "enrich_error")
+    op.drop_column("raw_osint", "enrich_attempts")
@@ -0,0 +1,29 @@
+"""re-key embedding_cache on the embedded text
+
+The cache used to be keyed on the hash of clean_text(content) while it
+stored the embedding of the raw content, so texts that clean to the same
+string shared whichever raw embedding was cached first. Keys are now the
+hash of the text actually encoded; the old entries are dropped and the
+cache refills as rows are enriched.
+
+Revision ID: 0006_embedding_cache_raw_keys
+Revises: 0005_enrich_attempts
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+
+revision = "0006_embedding_cache_raw_keys"
+down_revision = "0005_enrich_attempts"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("TRUNCATE embedding_cache")
+
+
+def downgrade():
+    # The old keys cannot be rebuilt from the vectors: start empty
+    op.execute("TRUNCATE embedding_cache")
@@ -1,18 +1,62 @@
 # models.py
 
+import json
+
+import numpy as np
 from sqlalchemy import (
+    Index,
     Column,
     Integer,
     Text,
     Float,
     Boolean,
     TIMESTAMP,
-    JSON
+    JSON,
+    LargeBinary,
+    TypeDecorator,
+    text
 )
+from sqlalchemy.orm import synonym
 from sqlalchemy.sql import func
 from database import Base
 
 
+# -----------------------------------------------------
+# EMBEDDING COLUMN TYPE
+# -----------------------------------------------------
+
+def _embedding_bytes(value):
+    if value is None or isinstance(value, bytes):
+        return value
+
+    if isinstance(value, (bytearray, memoryview)):
+        return bytes(value)
+
+    # Legacy JSON float list (already decoded by the driver, or as text)
+    if isinstance(value, str):
+        value = json.loads(value)
+
+    return np.asarray(value, dtype=np.float32).tobytes()
+
+
+class EmbeddingType(TypeDecorator):
+    """
+    float32 bytes in a binary column. Lists are encoded on write, and
+    rows still holding a JSON list (hand-added column not yet migrated
+    by 0002) are read back as the same bytes.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return _embedding_bytes(value)
+
+    def result_processor(self, dialect, coltype):
+        # Bypass LargeBinary's processor, which would call bytes() on a list
+        return _embedding_bytes
+
+
 # -----------------------------------------------------
 # RAW OSINT TABLE
 # -----------------------------------------------------
@@ -32,6 +76,10 @@ class RawOSINT(Base):
     geo_lat = Column(Float)
     geo_lon = Column(Float)
 
+    # Names used by the map endpoint and dashboard
+    latitude = synonym("geo_lat")
+    longitude = synonym("geo_lon")
+
     content_hash = Column(Text, unique=True)
 
     # 🔥 FIXED HERE
@@ -39,15 +87,52 @@ class RawOSINT(Base):
 
     keyword_vector = Column(JSON)
 
+    # float32 bytes (see ai_engine.embedding.encode_embedding)
+    embedding = Column(EmbeddingType)
+
+    cluster_id = Column(Integer)
+
     incident_type = Column(Text)
     severity = Column(Text)
     risk_score = Column(Float)
     confidence = Column(Float)
 
+    summary = Column(Text)
+
     processed = Column(Boolean, default=False)
 
+    # Failed enrichments; at MAX_ENRICH_ATTEMPTS the row leaves the queue
+    enrich_attempts = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    enrich_error = Column(Text)
+
     collected_at = Column(TIMESTAMP, server_default=func.now())
 
+    __table_args__ = (
+        # Keyset pagination for GET /incidents (with and without ?source=)
+        Index("ix_raw_osint_collected_at_id", collected_at.desc(), id.desc()),
+        Index("ix_raw_osint_source_collected_at_id", source, collected_at.desc(), id.desc()),
+
+        # Pipeline queue: only the (few) unprocessed rows are indexed
+        Index("ix_raw_osint_unprocessed", id, postgresql_where=text("processed = false")),
+
+        # Clustering queue: embedded rows still waiting for a cluster
+        Index(
+            "ix_raw_osint_unclustered", id,
+            postgresql_where=text("cluster_id IS NULL AND embedding IS NOT NULL")
+        ),
+
+        # Append-only time column: BRIN for range scans over old data
+        Index("ix_raw_osint_collected_at_brin", collected_at, postgresql_using="brin"),
+
+        # top-threats / alert engine, cluster drill-down, map
+        Index("ix_raw_osint_risk_score", risk_score),
+        Index("ix_raw_osint_cluster_id_risk", cluster_id, risk_score),
+        Index(
+            "ix_raw_osint_geo", id,
+            postgresql_where=text("geo_lat IS NOT NULL AND geo_lon IS NOT NULL")
+        ),
+    )
+
 
 # -----------------------------------------------------
 # INGESTION LOGS TABLE
@@ -64,9 +149,40 @@ class IngestionLog(Base):
     status = Column(Text)
     error_message = Column(Text)
 
+    duration_seconds = Column(Float)
+
     run_time = Column(TIMESTAMP, server_default=func.now())
 
 
+# -----------------------------------------------------
+# SCHEDULER JOB METRICS TABLE
+# -----------------------------------------------------
+
+class SchedulerJob(Base):
+    __tablename__ = "scheduler_jobs"
+
+    # One row per scheduled job, written by whichever process leads
+    job_name = Column(Text, primary_key=True)
+
+    owner = Column(Text)
+
+    run_count = Column(Integer, nullable=False, default=0)
+    failure_count = Column(Integer, nullable=False, default=0)
+    skipped_count = Column(Integer, nullable=False, default=0)
+
+    last_status = Column(Text)
+    last_error = Column(Text)
+
+    last_started_at = Column(TIMESTAMP)
+    last_finished_at = Column(TIMESTAMP)
+    last_duration_seconds = Column(Float)
+
+    # Seconds between the scheduled fire time and the actual start
+    last_lag_seconds = Column(Float)
+
+    next_run_at = Column(TIMESTAMP)
+
+
 # -----------------------------------------------------
 # ALERTS TABLE
 # -----------------------------------------------------
@@ -87,4 +203,69 @@ class Alert(Base):
     source_count = Column(Integer)
     alert_type = Column(Text)
 
+    cluster_id = Column(Integer)
+    incident_type = Column(Text)
+    alert_level = Column(Text)
+    message = Column(Text)
+
+    # rule:subject:window -- one alert per key (see ai_engine.alert_engine)
+    dedup_key = Column(Text, unique=True, index=True)
+
+    created_at = Column(TIMESTAMP, server_default=func.now(), index=True)
+
+
+class AlertState(Base):
+    __tablename__ = "alert_state"
+
+    name = Column(Text, primary_key=True)
+
+    # Every raw_osint row with id <= last_record_id has been evaluated
+    last_record_id = Column(Integer, nullable=False, default=0)
+
+    last_run_at = Column(TIMESTAMP)
+
+
+# -----------------------------------------------------
+# EMBEDDING CACHE TABLE
+# -----------------------------------------------------
+
+class EmbeddingCache(Base):
+    __tablename__ = "embedding_cache"
+
+    # sha256 of the cleaned text
+    content_hash = Column(Text, primary_key=True)
+
+    embedding = Column(LargeBinary, nullable=False)
+
     created_at = Column(TIMESTAMP, server_default=func.now())
+
+
+# -----------------------------------------------------
+# ANALYTICS ROLLUP TABLES
+# -----------------------------------------------------
+
+class IncidentRollup(Base):
+    __tablename__ = "incident_rollup_hourly"
+
+    # date_trunc('hour', collected_at)
+    hour = Column(TIMESTAMP, primary_key=True)
+
+    incident_type = Column(Text, primary_key=True)
+    severity = Column(Text, primary_key=True)
+    source = Column(Text, primary_key=True)
+
+    incident_count = Column(Integer, nullable=False, default=0)
+
+    # Running sums for average risk
+    risk_sum = Column(Float, nullable=False, default=0)
+    risk_count = Column(Integer, nullable=False, default=0)
+
+
+class ClusterRollup(Base):
+    __tablename__ = "cluster_rollup"
+
+    cluster_id = Column(Integer, primary_key=True, autoincrement=False)
+
+    incident_count = Column(Integer, nullable=False, default=0, index=True)
+
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now(), index=True)
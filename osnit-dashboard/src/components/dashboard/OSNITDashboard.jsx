@@ -7,9 +7,8 @@ import {
 // import { MapContainer, TileLayer, CircleMarker, Popup } from "react-leaflet";
 // import "leaflet/dist/leaflet.css";
 
-const INTEL = "http://127.0.0.1:8000/intelligence";
-const INC   = "http://127.0.0.1:8000/incidents";
 const OPS   = "http://127.0.0.1:8000/operations";
+const DASH  = "http://127.0.0.1:8000/dashboard";
 
 const TABS = ["Overview", "Intelligence", "Map", "Explorer", "Operations"];
 
@@ -539,25 +538,23 @@ export default function App() {
   const [loading, setLoading]     = useState(true);
 
   const fetchAll = useCallback(async () => {
-    const r = await Promise.allSettled([
-      axios.get(`${INTEL}/summary`),
-      axios.get(`${INTEL}/trends`),
-      axios.get(`${INTEL}/alerts`),
-      axios.get(`${INTEL}/top-threats`),
-      axios.get(`${INC}/map`),
-      axios.get(`${INTEL}/spikes`),
-      axios.get(`${INC}/?limit=30`),
-      axios.get(`${OPS}/status`),
-    ]);
-    const d = i => r[i].status==="fulfilled" ? r[i].value.data : null;
-    if (d(0)) setSummary(d(0));
-    if (d(1)) setTrends(d(1).hourly_trends||[]);
-    if (d(2)) setAlerts(d(2).alerts||[]);
-    if (d(3)) setThreats(d(3).top_threats||[]);
-    if (d(4)) setMapData(d(4).incidents||[]);
-    if (d(5)) setSpikes(d(5).spikes||[]);
-    if (d(6)) setIncidents(d(6)||[]);
-    if (d(7)) setSchedulerStatus(d(7));
+    // One cached, ETag-validated snapshot instead of eight requests
+    let d = null;
+    try {
+      d = (await axios.get(`${DASH}/snapshot`)).data;
+    } catch (e) {
+      d = null;
+    }
+    if (d) {
+      if (d.summary)     setSummary(d.summary);
+      if (d.trends)      setTrends(d.trends.hourly_trends||[]);
+      if (d.alerts)      setAlerts(d.alerts.alerts||[]);
+      if (d.top_threats) setThreats(d.top_threats.top_threats||[]);
+      if (d.map)         setMapData(d.map.incidents||[]);
+      if (d.spikes)      setSpikes(d.spikes.spikes||[]);
+      if (d.incidents)   setIncidents(d.incidents||[]);
+      if (d.status)      setSchedulerStatus(d.status);
+    }
     setLastUpdate(new Date());
     setLoading(false);
   }, []);
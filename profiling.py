@@ -0,0 +1,126 @@
+# profiling.py
+#
+# Optional sampling profiler for a single API request or job run.
+#
+# A background thread snapshots every thread's stack (sys._current_frames)
+# each SAMPLE_INTERVAL_SECONDS and counts identical stacks. The result is
+# written in the folded format ("thread;outer;...;inner count" per line)
+# that flamegraph.pl, inferno and speedscope render as a flame graph.
+# Nothing runs unless profiling is enabled:
+#
+#   OSNIT_PROFILING=1            allow ?profile=1 / "X-Profile: 1" on API requests
+#   OSNIT_PROFILE_JOBS=ingestion profile every run of these jobs (comma separated)
+#   OSNIT_PROFILE_DIR=profiles   where .folded files are written
+
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+
+PROFILING_ENABLED = os.getenv("OSNIT_PROFILING", "0") == "1"
+
+PROFILE_JOBS = {
+    name.strip()
+    for name in os.getenv("OSNIT_PROFILE_JOBS", "").split(",")
+    if name.strip()
+}
+
+PROFILE_DIR = os.getenv("OSNIT_PROFILE_DIR", "profiles")
+
+SAMPLE_INTERVAL_SECONDS = 0.005
+
+# Deep recursion is cut from the root side; the hot leaf frames are kept
+MAX_STACK_DEPTH = 128
+
+
+def job_profiled(job_name):
+    return job_name in PROFILE_JOBS
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+
+    def __init__(self, interval=SAMPLE_INTERVAL_SECONDS):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        own = threading.get_ident()
+
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+
+                stack = []
+                while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+
+            self.samples += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._sample, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def folded(self):
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+    def write(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.folded())
+
+
+@contextmanager
+def profile(name, enabled=True):
+    """
+    Sample everything running in the process while the block runs and
+    write PROFILE_DIR/<time>-<name>.folded. No-op when not enabled.
+    """
+
+    if not enabled:
+        yield None
+        return
+
+    profiler = SamplingProfiler()
+    profiler.start()
+
+    try:
+        yield profiler
+
+    finally:
+        profiler.stop()
+
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip("_") or "profile"
+        path = os.path.join(PROFILE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{time.time_ns() % 10**9:09d}-{safe_name}.folded")
+
+        try:
+            profiler.write(path)
+            logging.info(f"Profile written: {path} ({profiler.samples} samples)")
+        except OSError as e:
+            logging.error(f"Profile write failed: {e}")